@@ -1,8 +1,8 @@
 import os
-import glob
-import re
 from datetime import datetime
 
+from scripts.esp32.log_index import load_indices, log_files
+
 # Specify the directory containing the log files and the target date
 directory_path = "../../logs"
 target_date_str = "2024-09-01"  # Change this to the desired date
@@ -14,26 +14,15 @@ def get_file_modification_date(file_path):
     return datetime.fromtimestamp(os.path.getmtime(file_path))
 
 
-# Use glob to get all files in the directory
-file_list = glob.glob(os.path.join(directory_path, "*"))
-
-# Regular expression to match "Success" lines in the logs
-success_pattern = re.compile(r"Success: {'success':")
-
-# Initialize counter
-experiment_count = 0
-
-# Process each log file in the directory
-for log_file in file_list:
-    # Get the modification date of the file
-    file_modification_date = get_file_modification_date(log_file)
-
+if __name__ == "__main__":
     # Only process files modified after the specified date
-    if file_modification_date >= target_date:
-        with open(log_file, "r") as file:
-            log_data = file.read()
+    file_list = [
+        log_file
+        for log_file in log_files(directory_path)
+        if get_file_modification_date(log_file) >= target_date
+    ]
 
-        # Count occurrences of the "Success" pattern
-        experiment_count += len(success_pattern.findall(log_data))
+    # Count the "Success" lines, the indices are cached and built in parallel
+    experiment_count = sum(index.success_count for index in load_indices(file_list))
 
-print(f"Total number of experiments after {target_date_str}: {experiment_count}")
+    print(f"Total number of experiments after {target_date_str}: {experiment_count}")
@@ -0,0 +1,229 @@
+import os
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Bump this when the parsing changes, older cache files are parsed again
+INDEX_VERSION = 1
+
+# Patterns of the log messages, see `extract_meta_data` in `plot_all_locations_of_attack.py`
+coord_pattern = re.compile(r"Point2D\((\d+\.\d+), (\d+\.\d+)\)")
+global_coord_pattern = re.compile(r"Moving to < X(\d+\.\d+) Y(\d+\.\d+)>")
+type_pattern = re.compile(r"'type': '(\w+)'")
+type_pattern_old = re.compile(r"'type': <EMPEffect\..*?: '(\w+)'")
+success_pattern = re.compile(r"Success: {'success':")
+position_pattern = re.compile(r"I'm at position (\d+)")
+meta_pattern = re.compile(r"'voltage': (\d+), 'repeat': (\d+), 'type': '(\w+)'")
+
+# Every log record starts with the date, see `setup_logging`
+record_pattern = re.compile(r"\d{4}-\d{2}-\d{2} ")
+movement_strategy_pattern = re.compile(
+    r'"movement_strategy":\s*\{\s*"var":\s*([\d\.]+),\s*"center":\s*\[\s*([\d\.]+),\s*([\d\.]+)\s*\],\s*"iterations":\s*(\d+)\s*\}'
+)
+offset_pattern = re.compile(
+    r'"offset":\s*\{\s*"start":\s*(\d+),\s*"end":\s*(\d+),\s*"step":\s*(\d+)\s*\}'
+)
+voltage_pattern = re.compile(r'"voltage":\s*\{\s*"lower":\s*(\d+),\s*"upper":\s*(\d+)\s*\}')
+repeat_pattern = re.compile(r'"repeat":\s*\{\s*"lower":\s*(\d+),\s*"upper":\s*(\d+)\s*\}')
+
+
+@dataclass
+class Run:
+    # Results and world coordinates of each chip point
+    experiment_results: dict[tuple[float, float], list[str]] = field(default_factory=dict)
+    global_points: dict[tuple[float, float], tuple[float, float]] = field(default_factory=dict)
+    voltage: str | None = None
+    repeat: str | None = None
+
+
+@dataclass
+class LogIndex:
+    path: str
+    mtime: int
+    size: int
+    meta_data: dict = field(default_factory=dict)
+    runs: list[Run] = field(default_factory=list)
+    # Number of attempts with a result type
+    experiment_count: int = 0
+    # Number of "Success" lines, only written by older versions
+    success_count: int = 0
+    # Lowest and highest world coordinates, as (x, y)
+    global_lowest: tuple[float, float] | None = None
+    global_highest: tuple[float, float] | None = None
+
+    def merged_results(self) -> dict[tuple[float, float], list[str]]:
+        """
+        The results of all runs for each point that has world coordinates.
+        """
+        results = {}
+        for run in self.runs:
+            for point in run.global_points:
+                if point in run.experiment_results:
+                    results.setdefault(point, []).extend(run.experiment_results[point])
+        return results
+
+    def global_points(self) -> dict[tuple[float, float], tuple[float, float]]:
+        points = {}
+        for run in self.runs:
+            points.update(run.global_points)
+        return points
+
+
+def extract_meta_data(config: str) -> dict:
+    """
+    The attack parameters from the config of the campaign, which is logged as indented json.
+    """
+    extracted_values = {}
+    if match := movement_strategy_pattern.search(config):
+        extracted_values["movement_strategy"] = {
+            "var": float(match.group(1)),
+            "center": [float(match.group(2)), float(match.group(3))],
+            "iterations": int(match.group(4)),
+        }
+    if match := offset_pattern.search(config):
+        extracted_values["offset"] = {
+            "start": int(match.group(1)),
+            "end": int(match.group(2)),
+            "step": int(match.group(3)),
+        }
+    if match := voltage_pattern.search(config):
+        extracted_values["voltage"] = {"lower": int(match.group(1)), "upper": int(match.group(2))}
+    if match := repeat_pattern.search(config):
+        extracted_values["repeat"] = {"lower": int(match.group(1)), "upper": int(match.group(2))}
+    return extracted_values
+
+
+def parse_log(path: str | Path) -> LogIndex:
+    """
+    Reads the log line by line and runs every pattern once, only on lines that can match.
+    A new run starts whenever the attacker is at position 1 again.
+    """
+    stat = os.stat(path)
+    index = LogIndex(path=str(path), mtime=stat.st_mtime_ns, size=stat.st_size)
+    run = Run()
+    current_point = None
+    # What the current point replaced in the run, to undo it if the point starts a new run
+    point_was_new = False
+    previous_global = None
+    # Lines of the first logged config, the json spans multiple lines
+    config: list[str] | None = None
+    config_done = False
+    lowest_x = lowest_y = highest_x = highest_y = None
+
+    with open(path, "r", errors="replace") as file:
+        for line in file:
+            if config is not None and not config_done:
+                if record_pattern.match(line):
+                    config_done = True
+                else:
+                    config.append(line)
+                    continue
+            if config is None and "Got data:" in line:
+                config = []
+                continue
+
+            if "Moving to" in line and current_point is not None:
+                if match := global_coord_pattern.search(line):
+                    global_x, global_y = float(match.group(1)), float(match.group(2))
+                    run.global_points[current_point] = (global_x, global_y)
+                    lowest_x = global_x if lowest_x is None else min(lowest_x, global_x)
+                    highest_x = global_x if highest_x is None else max(highest_x, global_x)
+                    lowest_y = global_y if lowest_y is None else min(lowest_y, global_y)
+                    highest_y = global_y if highest_y is None else max(highest_y, global_y)
+
+            if "Point2D(" in line:
+                if match := coord_pattern.search(line):
+                    current_point = (float(match.group(1)), float(match.group(2)))
+                    point_was_new = current_point not in run.experiment_results
+                    previous_global = run.global_points.get(current_point)
+                    run.experiment_results.setdefault(current_point, [])
+
+            if "I'm at position" in line:
+                if match := position_pattern.search(line):
+                    earlier = any(point != current_point for point in run.experiment_results)
+                    if int(match.group(1)) == 1 and earlier:
+                        # The point of this position belongs to the new run
+                        global_point = run.global_points.pop(current_point, None)
+                        if previous_global is not None:
+                            run.global_points[current_point] = previous_global
+                        if point_was_new:
+                            run.experiment_results.pop(current_point, None)
+                        index.runs.append(run)
+                        run = Run(experiment_results={current_point: []})
+                        if global_point is not None:
+                            run.global_points[current_point] = global_point
+
+            if "'type': " in line:
+                match = type_pattern.search(line) or type_pattern_old.search(line)
+                if match and current_point is not None:
+                    index.experiment_count += 1
+                    run.experiment_results.setdefault(current_point, []).append(match.group(1))
+                if meta_match := meta_pattern.search(line):
+                    run.voltage, run.repeat = meta_match.group(1), meta_match.group(2)
+
+            if "Success: " in line and success_pattern.search(line):
+                index.success_count += 1
+
+    if run.experiment_results:
+        index.runs.append(run)
+    if config:
+        index.meta_data = extract_meta_data("".join(config))
+    if lowest_x is not None:
+        index.global_lowest = (lowest_x, lowest_y)
+        index.global_highest = (highest_x, highest_y)
+    return index
+
+
+def cache_path(path: str | Path, cache_directory: Path | None = None) -> Path:
+    path = Path(path)
+    cache_directory = cache_directory or path.parent / ".index"
+    return cache_directory / f"{path.name}.pickle"
+
+
+def load_index(path: str | Path, cache_directory: Path | None = None) -> LogIndex:
+    """
+    Returns the cached index of the log, it's parsed again if the file changed since.
+    """
+    stat = os.stat(path)
+    cached = cache_path(path, cache_directory)
+    if cached.is_file():
+        try:
+            with open(cached, "rb") as file:
+                version, index = pickle.load(file)
+            if version == INDEX_VERSION and (index.mtime, index.size) == (
+                stat.st_mtime_ns,
+                stat.st_size,
+            ):
+                return index
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+            pass
+
+    index = parse_log(path)
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    temporary = cached.with_suffix(".tmp")
+    with open(temporary, "wb") as file:
+        pickle.dump((INDEX_VERSION, index), file)
+    temporary.replace(cached)
+    return index
+
+
+def load_indices(
+    paths: list[str | Path], cache_directory: Path | None = None, workers: int | None = None
+) -> list[LogIndex]:
+    """
+    Indexes the logs in parallel, in the order of the paths.
+    """
+    if len(paths) <= 1 or workers == 1:
+        return [load_index(path, cache_directory) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(load_index, paths, [cache_directory] * len(paths)))
+
+
+def log_files(directory: str | Path) -> list[str]:
+    """
+    The log files of the directory, oldest first.
+    """
+    files = [str(path) for path in Path(directory).glob("*.log")]
+    return sorted(files, key=os.path.getmtime)
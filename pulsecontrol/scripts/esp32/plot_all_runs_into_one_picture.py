@@ -1,96 +1,30 @@
 import os
-import glob
-import re
 import matplotlib.pyplot as plt
 import numpy as np
 
+from scripts.esp32.log_index import load_index, log_files
+
 # Specify the directory containing the log files
 directory_path = "../../logs"
 
-# Use glob to get all files in the directory
-file_list = glob.glob(os.path.join(directory_path, "*"))
+# Get all log files in the directory, sorted by modification time
+file_list = log_files(directory_path)
 
 # Check if there are files in the directory
 if file_list:
-    latest_file = max(file_list, key=os.path.getmtime)
+    latest_file = file_list[-1]
     # latest_file = '../../logs/2024-09-14T200928.log'
-    with open(latest_file, "r") as file:
-        log_data = file.read()
+    # The log is parsed once, later calls read the cached index
+    index = load_index(latest_file)
 
     print(f"Latest file '{latest_file}' read successfully.")
 else:
     print("No files found in the directory.")
     exit(1)
 
-# Initialize dictionaries to hold coordinates, results, and meta info
-all_runs_data = []
-current_run_data = {"experiment_results": {}, "global_points": {}, "voltage": None, "repeat": None}
-
-# Regular expressions to match coordinates, positions, and values
-coord_pattern = re.compile(r"Point2D\((\d+\.\d+), (\d+\.\d+)\)")
-global_coord_pattern = re.compile(r"Moving to < X(\d+\.\d+) Y(\d+\.\d+)>")
-type_pattern = re.compile(r"'type': '(\w+)'")
-position_pattern = re.compile(r"I'm at position (\d+)")
-meta_pattern = re.compile(r"'voltage': (\d+), 'repeat': (\d+), 'type': '(\w+)'")
-
-current_point = None
-highest_x = lowest_x = highest_y = lowest_y = None
-global_highest_x = global_highest_y = global_lowest_x = global_lowest_y = None
-first_run = True
-
-
-# Function to reset data for a new run
-def reset_run_data():
-    global highest_x, lowest_x, highest_y, lowest_y
-    highest_x = lowest_x = highest_y = lowest_y = None
-    return {"experiment_results": {}, "global_points": {}, "voltage": None, "repeat": None}
-
-
-# Parse log data to extract coordinates and types
-for line in log_data.split("\n"):
-    global_coord_match = global_coord_pattern.search(line)
-    if global_coord_match and current_point is not None:
-        global_x, global_y = float(global_coord_match.group(1)), float(global_coord_match.group(2))
-        current_run_data["global_points"][current_point] = (global_x, global_y)
-        if global_highest_x is None or global_x > global_highest_x:
-            global_highest_x = global_x
-        if global_lowest_x is None or global_x < global_lowest_x:
-            global_lowest_x = global_x
-        if global_highest_y is None or global_y > global_highest_y:
-            global_highest_y = global_y
-        if global_lowest_y is None or global_y < global_lowest_y:
-            global_lowest_y = global_y
-
-    coord_match = coord_pattern.search(line)
-    if coord_match:
-        x, y = float(coord_match.group(1)), float(coord_match.group(2))
-        current_point = (x, y)
-        if current_point not in current_run_data["experiment_results"]:
-            current_run_data["experiment_results"][current_point] = []
-
-    type_match = type_pattern.search(line)
-    meta_match = meta_pattern.search(line)
-    if type_match and current_point is not None:
-        result_type = type_match.group(1)
-        if current_point in current_run_data["experiment_results"]:
-            current_run_data["experiment_results"][current_point].append(result_type)
-
-    if meta_match:
-        current_run_data["voltage"] = meta_match.group(1)
-        current_run_data["repeat"] = meta_match.group(2)
-
-    position_match = position_pattern.search(line)
-    if position_match:
-        position = int(position_match.group(1))
-        if position == 1 and len(current_run_data["experiment_results"]) > 0:
-            if not first_run:
-                all_runs_data.append(current_run_data)
-            first_run = False
-            current_run_data = reset_run_data()
-            current_run_data["experiment_results"][current_point] = []
-
-if len(current_run_data["experiment_results"]) > 0:
-    all_runs_data.append(current_run_data)
+all_runs_data = index.runs
+global_lowest_x, global_lowest_y = index.global_lowest
+global_highest_x, global_highest_y = index.global_highest
 
 # Define colors for each type
 color_map = {
@@ -159,10 +93,10 @@ for batch_num in range(total_batches):
 
     # Plot each run in the batch
     for (index, run_data), ax in zip(runs_to_plot, axes):
-        global_points = run_data["global_points"]
-        experiment_results = run_data["experiment_results"]
-        voltage = run_data["voltage"]
-        repeat = run_data["repeat"]
+        global_points = run_data.global_points
+        experiment_results = run_data.experiment_results
+        voltage = run_data.voltage
+        repeat = run_data.repeat
 
         # Info message for debugging
         print(f"Plotting Run {run_counter}, Number of Points: {len(global_points)}")
@@ -8,6 +8,21 @@ import numpy as np
 import seaborn as sns
 from pandas import DataFrame
 
+from pulsecontrol.helpers.chip_frame import ChipFrame
+from pulsecontrol.helpers.results import find_results, read_results
+
+
+def effect_names(results: list) -> list[str]:
+    """
+    The effect of each attempt in upper case, older campaigns only stored the names and called
+    reboots resets.
+    """
+    names = []
+    for result in results:
+        name = str(result.get("effect") if isinstance(result, dict) else result).upper()
+        names.append("RESET" if name == "REBOOT" else name)
+    return names
+
 
 def gauss_plot(data, title: str):
     # Create a violin plot
@@ -30,26 +45,6 @@ def gauss_plot(data, title: str):
     ax.set_title(title)
 
 
-def point_to_image_coordinates(chip_rectangle, point: np.ndarray) -> np.ndarray:
-    """
-    The input point represents a fraction in which 1 is the width, height of the chip and 0, 0
-    the upper left corner.
-    """
-    center, size, angle = chip_rectangle
-    center = np.asarray(center)
-    size = np.asarray(size)
-    rotation = cv2.getRotationMatrix2D(center, -angle, 1)
-
-    # Scale the point up to the size of the chip
-    point *= size
-    # shift the points to be centered around the chip
-    point = point + center - size / 2
-
-    # rotate
-    rotated = cv2.transform(np.array([[point]]), rotation)[0][0]
-    return rotated
-
-
 @click.command()
 @click.option("--hist/--no-hist", default=False)
 @click.argument(
@@ -60,8 +55,13 @@ def point_to_image_coordinates(chip_rectangle, point: np.ndarray) -> np.ndarray:
 def main(hist: bool, glitch: Path):
     center_image = sorted(glitch.glob("*.jpg"))[-1]
 
-    with open(Path(glitch, "glitches.json"), "r") as infile:
-        glitches = json.load(infile)
+    results_path = find_results(glitch)
+    if results_path is None:
+        raise click.ClickException(f"There are no results in {glitch}")
+    glitches = [
+        (result["image_coords"], effect_names(result["results"]))
+        for result in read_results(results_path)
+    ]
 
     with open(Path(glitch, "rectangle.json"), "r") as infile:
         rectangle = json.load(infile)[-1]
@@ -75,12 +75,12 @@ def main(hist: bool, glitch: Path):
 
     print(base_image.shape)
 
-    coords = []
+    # All points are converted at once, the transform is built from the rectangle only once
+    frame = ChipFrame.from_rectangle(rectangle)
+    fractions = np.asarray([fraction_pos for fraction_pos, _ in glitches], dtype=float)
+    coords = np.around(frame.to_frame(fractions.reshape(-1, 2))).astype(np.uint32)
     data = []
-    for fraction_pos, _, results in glitches:
-        image_cords = point_to_image_coordinates(rectangle, fraction_pos)
-        image_cords = np.around(image_cords).astype(np.uint32)
-        coords.append(image_cords)
+    for image_cords, (_, results) in zip(coords, glitches):
         if not hist:
             if "SUCCESS" in results or "RESET" in results:
                 if "SUCCESS" in results:
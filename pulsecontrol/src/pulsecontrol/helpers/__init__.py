@@ -5,6 +5,8 @@ from enum import Enum
 from logging import Logger
 from typing import Union, Iterable, Callable
 
+import numpy as np
+
 
 @dataclass(kw_only=True)
 class HasLogger:
@@ -44,6 +46,8 @@ class CameraType(Enum):
 
 
 class FromIter:
+    __slots__ = ()
+
     def __init__(self, *args):
         super().__init__(*args)
 
@@ -55,7 +59,7 @@ class FromIter:
 Operable = Union["Point2D", float, int, tuple[float, float]]
 
 
-@dataclass
+@dataclass(slots=True)
 class Point2D(FromIter):
     x: float
     y: float
@@ -71,11 +75,15 @@ class Point2D(FromIter):
         other: Operable,
         operation: Callable[[float, Union[float, int]], float],
     ) -> "Point2D":
-        match other:
-            case tuple(x, y) | Point2D(x, y):
-                return Point2D(operation(self.x, x), operation(self.y, y))
-            case float() | int() | _:
-                return Point2D(operation(self.x, other), operation(self.y, other))
+        # Checked in order of how often they are used
+        if isinstance(other, (float, int)):
+            return Point2D(operation(self.x, other), operation(self.y, other))
+        if isinstance(other, Point2D):
+            return Point2D(operation(self.x, other.x), operation(self.y, other.y))
+        if isinstance(other, tuple):
+            x, y = other
+            return Point2D(operation(self.x, x), operation(self.y, y))
+        return Point2D(operation(self.x, other), operation(self.y, other))
 
     def __mul__(self, other: Union["Point2D", float, int, tuple[float, float]]) -> "Point2D":
         return self._operation_by_type(other, operation=operator.mul)
@@ -101,6 +109,16 @@ class Point2D(FromIter):
             case _:
                 raise IndexError()
 
+    def __len__(self) -> int:
+        return 2
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        return np.array((self.x, self.y), dtype=dtype)
+
     def __format__(self, format_spec):
         return (
             f"{self.__class__.__name__}("
@@ -108,6 +126,83 @@ class Point2D(FromIter):
         )
 
 
+PointLike = Union["PointArray", Point2D, np.ndarray, float, int, tuple[float, float]]
+
+
+class PointArray:
+    """
+    A batch of points backed by an (N, 2) array, for working with many points without a
+    `Point2D` per point. Supports the same arithmetic as `Point2D`, element wise.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: Iterable | np.ndarray = ()):
+        self.data = np.asarray(data, dtype=float).reshape(-1, 2)
+
+    @classmethod
+    def from_points(cls, points: Iterable[Point2D | tuple[float, float]]) -> "PointArray":
+        return cls([tuple(point) for point in points])
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.data[:, 1]
+
+    def to_list(self) -> list[tuple[float, float]]:
+        return [tuple(point) for point in self.data.tolist()]
+
+    @staticmethod
+    def _operand(other: PointLike):
+        if isinstance(other, PointArray):
+            return other.data
+        if isinstance(other, (Point2D, tuple)):
+            return np.asarray(tuple(other), dtype=float)
+        return other
+
+    def __mul__(self, other: PointLike) -> "PointArray":
+        return PointArray(self.data * self._operand(other))
+
+    def __add__(self, other: PointLike) -> "PointArray":
+        return PointArray(self.data + self._operand(other))
+
+    def __sub__(self, other: PointLike) -> "PointArray":
+        return PointArray(self.data - self._operand(other))
+
+    def __truediv__(self, other: PointLike) -> "PointArray":
+        return PointArray(self.data / self._operand(other))
+
+    def __floordiv__(self, other: PointLike) -> "PointArray":
+        return PointArray(self.data // self._operand(other))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            x, y = self.data[item]
+            return Point2D(float(x), float(y))
+        return PointArray(self.data[item])
+
+    def __iter__(self):
+        for x, y in self.data.tolist():
+            yield Point2D(x, y)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PointArray):
+            return NotImplemented
+        return np.array_equal(self.data, other.data)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        return self.data if dtype is None else self.data.astype(dtype)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.data.tolist()})"
+
+
 Angle = float
 Width = float
 Height = float
@@ -0,0 +1,211 @@
+import json
+import sqlite3
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+from pulsecontrol.helpers import HasLogger
+from pulsecontrol.helpers.result_store import ResultStore
+from pulsecontrol.helpers.results import find_results, read_results
+
+CONFIG_NAME = "config.json"
+NO_EFFECT = "no_effect"
+
+
+@dataclass(kw_only=True)
+class CampaignSummary:
+    """
+    Statistics of the results of a campaign, the ranges are the values that were actually used.
+    """
+
+    positions: int = 0
+    attempts: int = 0
+    effects: dict[str, int] = field(default_factory=dict)
+    voltage: tuple[int, int] | None = None
+    offset: tuple[int, int] | None = None
+    repeat: tuple[int, int] | None = None
+
+    @property
+    def effect_rate(self) -> float:
+        if not self.attempts:
+            return 0.0
+        return 1 - self.effects.get(NO_EFFECT, 0) / self.attempts
+
+    @classmethod
+    def from_results(cls, results: Iterable[dict]) -> "CampaignSummary":
+        """
+        Summarizes results as read by `read_results`, in a single pass.
+        """
+        effects = Counter()
+        ranges: dict[str, tuple[int, int]] = {}
+        positions = attempts = 0
+        for result in results:
+            positions += 1
+            for attack in result["results"]:
+                attempts += 1
+                effects[attack["effect"]] += 1
+                for name in ("voltage", "offset", "repeat"):
+                    value = attack.get(name)
+                    if value is None:
+                        continue
+                    low, high = ranges.get(name, (value, value))
+                    ranges[name] = (min(low, value), max(high, value))
+        return cls(positions=positions, attempts=attempts, effects=dict(effects), **ranges)
+
+
+@dataclass(kw_only=True)
+class CatalogEntry:
+    # Name of the result directory, the start date of the campaign
+    campaign: str
+    directory: str
+    registered: str = field(default_factory=lambda: datetime.now().isoformat())
+    # Class names of the attack and the movement strategy, e.g. `EspAttack` and `Grid`
+    target: str | None = None
+    movement: str | None = None
+    probe_type: str | None = None
+    # Center, size and angle of the chip in world coordinates
+    chip_position: tuple[list[float], list[float], float] | None = None
+    summary: CampaignSummary = field(default_factory=CampaignSummary)
+    config: dict[str, Any] = field(default_factory=dict)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    campaign TEXT PRIMARY KEY,
+    registered TEXT,
+    target TEXT,
+    movement TEXT,
+    probe_type TEXT,
+    attempts INTEGER,
+    effect_rate REAL,
+    voltage_min INTEGER, voltage_max INTEGER,
+    offset_min INTEGER, offset_max INTEGER,
+    -- The whole entry, the columns above are only there for filtering
+    entry TEXT
+);
+CREATE INDEX IF NOT EXISTS campaigns_target ON campaigns (target);
+"""
+
+
+@dataclass(kw_only=True)
+class Catalog(HasLogger):
+    """
+    Index of the campaigns in the results directory. Each campaign is registered when it
+    finishes, listing and filtering only reads the catalog, never the results.
+    """
+
+    path: Path = Path("results", "catalog.sqlite")
+
+    _connection: sqlite3.Connection = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.path)
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self) -> "Catalog":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def register(self, directory: Path, **details) -> CatalogEntry:
+        """
+        Summarizes the results of a campaign directory and adds it to the catalog, an earlier
+        entry of the same campaign is replaced.
+
+        Args:
+            details: Further fields of `CatalogEntry`, e.g. the target.
+        """
+        directory = Path(directory)
+        results = find_results(directory)
+        summary = CampaignSummary.from_results(read_results(results) if results else [])
+        config_path = Path(directory, CONFIG_NAME)
+        config = json.loads(config_path.read_text()) if config_path.is_file() else {}
+        entry = CatalogEntry(
+            campaign=directory.name,
+            directory=str(directory),
+            summary=summary,
+            config=config,
+            **details,
+        )
+        voltage = summary.voltage or (None, None)
+        offset = summary.offset or (None, None)
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO campaigns VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.campaign,
+                    entry.registered,
+                    entry.target,
+                    entry.movement,
+                    entry.probe_type,
+                    summary.attempts,
+                    summary.effect_rate,
+                    *voltage,
+                    *offset,
+                    json.dumps(asdict(entry)),
+                ),
+            )
+        self.log.info("Registered campaign %s, %s attempts", entry.campaign, summary.attempts)
+        return entry
+
+    def scan(self, results: Path = Path("results")) -> list[CatalogEntry]:
+        """
+        Registers the campaign directories that aren't in the catalog yet, e.g. from older versions.
+        """
+        if not results.is_dir():
+            return []
+        known = {row[0] for row in self._connection.execute("SELECT campaign FROM campaigns")}
+        return [
+            self.register(directory)
+            for directory in sorted(results.iterdir())
+            if directory.is_dir() and directory.name not in known and find_results(directory)
+        ]
+
+    def list(
+        self,
+        target: str | None = None,
+        movement: str | None = None,
+        probe_type: str | None = None,
+        voltage: tuple[int, int] | None = None,
+        offset: tuple[int, int] | None = None,
+        min_attempts: int = 0,
+    ) -> list[CatalogEntry]:
+        """
+        Lists the campaigns, oldest first. Ranges select the campaigns that used any value in them.
+        """
+        conditions, parameters = ["attempts >= ?"], [min_attempts]
+        columns = dict(target=target, movement=movement, probe_type=probe_type)
+        for column, value in columns.items():
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        for column, bounds in (("voltage", voltage), ("offset", offset)):
+            if bounds is not None:
+                conditions.append(f"{column}_max >= ? AND {column}_min <= ?")
+                parameters.extend(bounds)
+        rows = self._connection.execute(
+            f"SELECT entry FROM campaigns WHERE {' AND '.join(conditions)} ORDER BY campaign",
+            parameters,
+        )
+        return [self.to_entry(json.loads(row[0])) for row in rows]
+
+    @staticmethod
+    def to_entry(data: dict) -> CatalogEntry:
+        return CatalogEntry(**{**data, "summary": CampaignSummary(**data["summary"])})
+
+    @staticmethod
+    def merge(entries: Iterable[CatalogEntry], store: ResultStore) -> int:
+        """
+        Imports the attempts of the campaigns into one result store, for queries over all of them.
+
+        Returns:
+            The number of imported attempts.
+        """
+        return sum(store.import_campaign(Path(entry.directory)) for entry in entries)
@@ -0,0 +1,48 @@
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+CHECKPOINT_NAME = "checkpoint.json"
+
+
+@dataclass(kw_only=True)
+class Checkpoint:
+    """
+    State of a running campaign, written next to the results so it can be continued after a
+    reset, a reboot or a fault.
+    """
+
+    movement: dict[str, Any]
+    attack: dict[str, Any]
+    # Center, size and angle of the chip in world coordinates
+    chip_position: tuple[list[float], list[float], float]
+    chip_surface_height: float | None
+    # Last attacked position in chip coordinates and its number in the current run
+    point: tuple[float, float] | None = None
+    at_position: int = 0
+    created: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    def save(self, directory: Path):
+        """
+        Replaces the checkpoint in the directory, the old one stays intact if writing fails.
+        """
+        temporary = Path(directory, CHECKPOINT_NAME + ".tmp")
+        with open(temporary, "w") as out:
+            json.dump(asdict(self), out, indent=2)
+        temporary.replace(Path(directory, CHECKPOINT_NAME))
+
+    @classmethod
+    def load(cls, directory: Path) -> "Checkpoint":
+        with open(Path(directory, CHECKPOINT_NAME)) as checkpoint:
+            return cls(**json.load(checkpoint))
+
+
+def latest_checkpoint(results: Path = Path("results")) -> Path | None:
+    """
+    Returns:
+        The newest result directory that contains a checkpoint, the names start with the date.
+    """
+    directories = sorted(path.parent for path in results.glob(f"*/{CHECKPOINT_NAME}"))
+    return directories[-1] if directories else None
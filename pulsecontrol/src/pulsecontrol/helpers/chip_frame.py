@@ -0,0 +1,63 @@
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+
+from pulsecontrol.helpers import Rectangle
+
+
+@dataclass(kw_only=True)
+class ChipFrame:
+    """
+    Converts between chip units and the frame the chip rectangle was measured in, e.g. image
+    pixels or world millimeters. In chip units (0, 0) is the upper left corner of the chip and
+    (1, 1) the lower right one.
+
+    The affine matrices are built once, the conversions take single points or (N, 2) arrays.
+    """
+
+    center: np.ndarray
+    size: np.ndarray
+    # Rotation of the chip in degrees, as returned by `cv2.minAreaRect`
+    angle: float
+
+    _forward: np.ndarray = field(init=False, repr=False)
+    _inverse: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.center = np.asarray(self.center, dtype=float)
+        self.size = np.asarray(self.size, dtype=float)
+        rotation = cv2.getRotationMatrix2D(self.center, -self.angle, 1)
+        # Scale up to the chip size, move the corner to the chip corner, then rotate
+        linear = rotation[:, :2] * self.size
+        offset = rotation[:, :2] @ (self.center - self.size / 2) + rotation[:, 2]
+        self._forward = np.column_stack((linear, offset))
+        self._inverse = cv2.invertAffineTransform(self._forward)
+
+    @classmethod
+    def from_rectangle(cls, rectangle: Rectangle) -> "ChipFrame":
+        center, size, angle = rectangle
+        return cls(center=center, size=size, angle=float(angle))
+
+    @staticmethod
+    def _apply(matrix: np.ndarray, points) -> np.ndarray:
+        points = np.asarray(points, dtype=float)
+        return points @ matrix[:, :2].T + matrix[:, 2]
+
+    def to_frame(self, points) -> np.ndarray:
+        """
+        Chip units to the frame of the rectangle.
+        """
+        return self._apply(self._forward, points)
+
+    def to_chip(self, points) -> np.ndarray:
+        """
+        Frame of the rectangle to chip units.
+        """
+        return self._apply(self._inverse, points)
+
+    def to_other(self, points, other: "ChipFrame") -> np.ndarray:
+        """
+        Converts from this frame to another one of the same chip, e.g. from image to world.
+        """
+        return other.to_frame(self.to_chip(points))
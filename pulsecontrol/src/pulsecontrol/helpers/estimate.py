@@ -0,0 +1,282 @@
+import os
+import re
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import requests
+
+from pulsecontrol.helpers import ConfigurationError, HasLogger
+from pulsecontrol.helpers.config_loader import from_dict_casts
+from pulsecontrol.helpers.results import read_results
+from pulsecontrol.simulator.printer import Kinematics
+from pulsecontrol.strategies.control.moonraker import Moonraker
+from pulsecontrol.strategies.movement.adaptive import Adaptive
+from pulsecontrol.strategies.movement.fix_point import FixPoint
+from pulsecontrol.strategies.movement.gaussian import Gaussian
+from pulsecontrol.strategies.movement.grid import Grid
+from pulsecontrol.strategies.movement.low_discrepancy import LowDiscrepancy
+from pulsecontrol.strategies.movement.ordered import Ordered
+from pulsecontrol.strategies.movement.refine import Refine
+
+# Written by `EmfiAttack.start` for every attempt
+DURATION_PATTERN = re.compile(r"Experiment Duration: ([0-9.eE+-]+)")
+NO_EFFECT = "no_effect"
+
+
+@dataclass(frozen=True)
+class LoggedDurations:
+    """
+    Sum and number of the experiment durations in the complete lines of a log file.
+    """
+
+    mtime: int = 0
+    # Bytes up to the end of the last complete line, the next read continues from here
+    offset: int = 0
+    total: float = 0.0
+    count: int = 0
+
+
+# Kept between requests to `/estimate`, keyed by the path of the log
+_logged_durations: dict[str, LoggedDurations] = {}
+
+
+def logged_durations(path: Path) -> LoggedDurations:
+    """
+    The experiment durations of a log file, cached by the modification time and size.
+    The logs are only appended to, so a log that grew is read from where the last read stopped.
+    """
+    stat = os.stat(path)
+    cached = _logged_durations.get(str(path), LoggedDurations())
+    if stat.st_size < cached.offset or (
+        stat.st_size == cached.offset and stat.st_mtime_ns != cached.mtime
+    ):
+        # Rotated or rewritten
+        cached = LoggedDurations()
+    if stat.st_size == cached.offset:
+        return cached
+
+    offset, total, count = cached.offset, cached.total, cached.count
+    with open(path, "rb") as log:
+        log.seek(offset)
+        for line in log:
+            if not line.endswith(b"\n"):
+                # Still being written
+                break
+            offset += len(line)
+            if b"Experiment Duration" in line:
+                if match := DURATION_PATTERN.search(line.decode(errors="ignore")):
+                    total += float(match[1])
+                    count += 1
+    durations = LoggedDurations(mtime=stat.st_mtime_ns, offset=offset, total=total, count=count)
+    _logged_durations[str(path)] = durations
+    return durations
+
+
+@dataclass(kw_only=True)
+class PhaseTimings:
+    """
+    Durations of the phases of an attack campaign in seconds.
+    The defaults are the sleeps and timeouts in the code, `calibrate` replaces them with
+    measurements.
+    """
+
+    # `EmfiAttack.start` waits for the board before each sweep
+    boot: float = 2.0
+    # `Whisperer.pre_arm` arms the chipshouter and restarts the board for every offset
+    arm: float = 0.05
+    restart: float = 0.05
+    # A single `attack` without an effect, e.g. the serial timeout in `EspAttack`
+    attempt: float = 0.02
+    # `EspAttack.attack` restarts the board and sleeps after every effect
+    recovery: float = 1.05
+    # Share of attempts with an effect
+    effect_rate: float = 0.0
+    # Round trip of a single request to moonraker, every move needs two
+    request: float = 0.02
+    # Chip detection, probing and centering during `/start`
+    survey: float = 60.0
+
+    @property
+    def sweep_attempt(self) -> float:
+        return self.arm + self.restart + self.attempt + self.effect_rate * self.recovery
+
+    def calibrate(
+        self, log_files: Iterable[Path] = (), result_files: Iterable[Path] = ()
+    ) -> "PhaseTimings":
+        """
+        Uses recorded campaigns to replace the defaults.
+        The logged experiment durations already contain the recovery after effects, so the effect
+        rate is only taken from the results if there are no logged durations.
+
+        Args:
+            log_files: Log files written by `setup_logging`.
+            result_files: Result files written by `AdvancedAttacker`, see `read_results`.
+        """
+        durations = [logged_durations(path) for path in log_files]
+        count = sum(logged.count for logged in durations)
+        if count:
+            attempt = sum(logged.total for logged in durations) / count
+            return replace(self, attempt=attempt, effect_rate=0.0)
+
+        effects = [
+            attack["effect"]
+            for path in result_files
+            for position in read_results(path)
+            for attack in position["results"]
+        ]
+        if effects:
+            return replace(self, effect_rate=sum(e != NO_EFFECT for e in effects) / len(effects))
+        return self
+
+
+@dataclass(kw_only=True)
+class Estimate:
+    """
+    Predicted wall clock time in seconds, split by phase.
+    """
+
+    positions: int
+    attempts: int
+    setup: float
+    travel: float
+    attack: float
+
+    @property
+    def total(self) -> float:
+        return self.setup + self.travel + self.attack
+
+    def to_dict(self) -> dict:
+        return dict(
+            positions=self.positions,
+            attempts=self.attempts,
+            setup=self.setup,
+            travel=self.travel,
+            attack=self.attack,
+            total=self.total,
+        )
+
+
+@dataclass(kw_only=True)
+class _Campaign:
+    # Same movement strategies as `AdvancedAttacker`, these don't need any hardware
+    movement_strategy: Adaptive | Refine | Ordered | FixPoint | Gaussian | Grid | LowDiscrepancy
+
+
+@dataclass(kw_only=True)
+class CampaignEstimator(HasLogger):
+    """
+    Predicts the duration of an `AdvancedAttacker` campaign from its config, without loading it.
+    Loading would connect to the hardware.
+    """
+
+    kinematics: Kinematics = field(default_factory=Kinematics)
+    timings: PhaseTimings = field(default_factory=PhaseTimings)
+    # Feed rate in mm/min, `continue_experiment` moves without setting one (klipper default)
+    speed: float = 1500
+    # Size of the chip in mm, the points of the movement strategy are relative to it
+    chip_size: tuple[float, float] = (10.0, 10.0)
+
+    def use_limits(self, limits: Iterable[float]):
+        """
+        Takes the axis limits reported by the printer, e.g. from `Moonraker.get_limits`.
+        """
+        self.kinematics = replace(self.kinematics, axis_maximum=tuple(limits)[:3])
+
+    def query_limits(self, config: dict, timeout: float = 5.0) -> bool:
+        """
+        Uses the axis limits of the printer in the config, if it can be reached.
+
+        Returns:
+            Whether the limits were updated, the defaults are kept otherwise.
+        """
+        endpoint = config.get("printer", {}).get("endpoint")
+        if endpoint is None:
+            return False
+        printer = Moonraker(endpoint=endpoint, connect_timeout=timeout, read_timeout=timeout)
+        try:
+            self.use_limits(printer.get_limits())
+        except (requests.RequestException, KeyError, TypeError, ValueError) as e:
+            self.log.warning("Couldn't get the axis limits from %s: %s", endpoint, e)
+            return False
+        finally:
+            printer.reset()
+        return True
+
+    def points(self, config: dict, positions: int | None = None) -> np.ndarray:
+        """
+        Returns:
+            The chip coordinates of one pass of the movement strategy, as an (N, 2) array.
+        """
+        strategy = from_dict_casts(_Campaign, config).movement_strategy
+        positions = positions or strategy.total_movements
+        if positions is None:
+            raise ConfigurationError("The movement never ends, set the number of positions")
+        try:
+            return strategy.to_array()[:positions]
+        except NotImplementedError:
+            points = [next(strategy).to_tuple() for _ in range(positions)]
+            return np.asarray(points, dtype=float).reshape(-1, 2)
+
+    def travel_time(self, points: np.ndarray) -> float:
+        """
+        Duration of visiting the points in order, starting at the chip center.
+        """
+        world = np.vstack(((0.5, 0.5), points)) * self.chip_size
+        moves = sum(
+            self.kinematics.move_time([*start, 0], [*end, 0], self.speed / 60)
+            for start, end in zip(world[:-1], world[1:])
+        )
+        return moves + len(points) * 2 * self.timings.request
+
+    def setup_time(self) -> float:
+        """
+        Homing and the survey of the chip, the travel assumes the chip is in the middle of the bed.
+        """
+        center = [limit / 2 for limit in self.kinematics.axis_maximum]
+        home = [0.0, 0.0, 0.0]
+        travel = self.kinematics.move_time(home, center, self.speed / 60)
+        homing = sum(self.kinematics.axis_maximum[:2]) / self.kinematics.homing_speed
+        return homing + travel + self.timings.survey
+
+    def estimate(
+        self, config: dict, passes: int = 1, positions: int | None = None, skip_init: bool = False
+    ) -> Estimate:
+        """
+        Predicts the wall clock time of a campaign, `continue_experiment` runs until it's stopped,
+        so the number of passes over all positions has to be given.
+
+        Args:
+            config: The integrator config as sent to `/load/integrator/advanced_attacker`.
+            passes: Number of times the movement strategy is walked.
+            positions: Required for movement strategies that never end.
+            skip_init: Whether `/start` is called with `skip_init`, this skips the survey.
+        """
+        try:
+            attack = config["attack"]
+            offset = attack["whisperer"]["offset"]
+        except KeyError as e:
+            raise ConfigurationError("The config has no attack to estimate") from e
+        points = self.points(config, positions)
+        sweep = len(range(offset["start"], offset["end"], offset["step"]))
+
+        # Every position is attacked `move_after` times, each time with the full offset sweep
+        starts = len(points) * attack.get("move_after", 20)
+        attempts = starts * sweep * passes
+        estimate = Estimate(
+            positions=len(points),
+            attempts=attempts,
+            setup=0.0 if skip_init else self.setup_time(),
+            travel=self.travel_time(points) * passes,
+            attack=starts * passes * self.timings.boot + attempts * self.timings.sweep_attempt,
+        )
+        self.log.info(
+            "Estimated %.0fs for %s positions and %s attempts (travel %.0fs, attack %.0fs)",
+            estimate.total,
+            estimate.positions,
+            estimate.attempts,
+            estimate.travel,
+            estimate.attack,
+        )
+        return estimate
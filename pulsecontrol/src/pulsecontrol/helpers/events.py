@@ -0,0 +1,122 @@
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, ClassVar, Iterable, Iterator
+
+EVENT_LOGGER = "pulsecontrol.events"
+EVENTS_SUFFIX = ".events.jsonl"
+
+
+@dataclass(kw_only=True)
+class Event:
+    """
+    Typed record of something that happened during a campaign, written as one json line.
+    The fields are stable, unlike the wording of the log messages.
+    """
+
+    kind: ClassVar[str]
+    # Unix time
+    time: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"kind": self.kind, **asdict(self)}
+
+
+@dataclass(kw_only=True)
+class Move(Event):
+    kind = "move"
+    # Chip coordinates of the next position and its world coordinates
+    chip: tuple[float, float]
+    world: tuple[float, float]
+    # Number of the position in the current run
+    position: int
+
+
+@dataclass(kw_only=True)
+class Attack(Event):
+    kind = "attack"
+    # A sweep over all offsets starts, counted per position
+    sweep: int
+
+
+@dataclass(kw_only=True)
+class Arm(Event):
+    kind = "arm"
+    offset: int
+    voltage: int
+    repeat: int
+
+
+@dataclass(kw_only=True)
+class Effect(Event):
+    kind = "effect"
+    effect: Any
+    offset: int
+    voltage: int
+    repeat: int
+    duration: float
+
+
+@dataclass(kw_only=True)
+class Overheat(Event):
+    kind = "overheat"
+
+
+@dataclass(kw_only=True)
+class Reset(Event):
+    kind = "reset"
+    # Class name of the strategy that was reset
+    source: str
+
+
+EVENTS: dict[str, type[Event]] = {
+    event.kind: event for event in (Move, Attack, Arm, Effect, Overheat, Reset)
+}
+
+
+def emit(event: Event):
+    """
+    Sends the event to the event log, it's dropped if `setup_logging` didn't add one.
+    """
+    logging.getLogger(EVENT_LOGGER).info(event.kind, extra={"event": event})
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+class EventHandler(logging.FileHandler):
+    """
+    Writes the events sent with `emit` as json lines, other records are ignored.
+    """
+
+    def __init__(self, filename: Path):
+        super().__init__(filename, mode="a", encoding="utf-8")
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.event.to_dict(), default=_default)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return isinstance(getattr(record, "event", None), Event)
+
+
+def read_events(path: Path, kinds: Iterable[str] | None = None) -> Iterator[Event]:
+    """
+    Streams the events of an event log, optionally only the given kinds.
+    Unknown kinds and a truncated last line are skipped.
+    """
+    kinds = set(kinds) if kinds is not None else set(EVENTS)
+    with open(path, encoding="utf-8") as lines:
+        for line in lines:
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            kind = data.pop("kind", None)
+            if kind in kinds and kind in EVENTS:
+                yield EVENTS[kind](**data)
@@ -0,0 +1,63 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from pulsecontrol.helpers import HasLogger
+
+
+@dataclass
+class LatencyCounter:
+    """
+    Accumulates the duration of requests of one kind. All values are in seconds.
+    """
+
+    count: int = 0
+    total: float = 0.0
+    minimum: float = float("inf")
+    maximum: float = 0.0
+
+    def add(self, duration: float):
+        self.count += 1
+        self.total += duration
+        self.minimum = min(self.minimum, duration)
+        self.maximum = max(self.maximum, duration)
+
+    @property
+    def mean(self) -> float:
+        if not self.count:
+            return 0.0
+        return self.total / self.count
+
+    def __format__(self, format_spec):
+        if not self.count:
+            return "no requests"
+        return (
+            f"{self.count} requests, "
+            f"mean {format(self.mean * 1000, format_spec)} ms, "
+            f"min {format(self.minimum * 1000, format_spec)} ms, "
+            f"max {format(self.maximum * 1000, format_spec)} ms"
+        )
+
+
+@dataclass(kw_only=True)
+class LatencyStats(HasLogger):
+    """
+    Per request type latency counters, e.g. one counter for each api endpoint.
+    """
+
+    counters: dict[str, LatencyCounter] = field(default_factory=dict)
+
+    @contextmanager
+    def track(self, name: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.counters.setdefault(name, LatencyCounter()).add(perf_counter() - start)
+
+    def log_summary(self):
+        for name, counter in self.counters.items():
+            self.log.info(f"{name}: {counter:.1f}")
+
+    def clear(self):
+        self.counters.clear()
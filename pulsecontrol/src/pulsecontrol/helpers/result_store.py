@@ -0,0 +1,237 @@
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+import click
+import numpy as np
+
+from pulsecontrol.helpers import HasLogger
+from pulsecontrol.helpers.results import find_results, read_results
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    campaign TEXT NOT NULL,
+    position INTEGER,
+    chip_x REAL, chip_y REAL,
+    world_x REAL, world_y REAL,
+    offset INTEGER, voltage INTEGER, repeat INTEGER,
+    effect TEXT,
+    timestamp REAL
+);
+CREATE INDEX IF NOT EXISTS attempts_campaign ON attempts (campaign);
+CREATE INDEX IF NOT EXISTS attempts_voltage ON attempts (voltage);
+CREATE INDEX IF NOT EXISTS attempts_effect ON attempts (effect);
+-- Spatial index over the world coordinates, shares the ids of `attempts`
+CREATE VIRTUAL TABLE IF NOT EXISTS attempts_world USING rtree (id, x0, x1, y0, y1);
+"""
+
+COLUMNS = ("campaign", "position", "chip_x", "chip_y", "world_x", "world_y")
+ATTACK_COLUMNS = ("offset", "voltage", "repeat", "effect", "timestamp")
+
+
+@dataclass(kw_only=True)
+class CellRates:
+    """
+    Aggregated attempts per cell, the arrays are indexed by cell.
+    """
+
+    cell_size: float
+    # Lower left corner of each cell, in mm
+    x: np.ndarray
+    y: np.ndarray
+    attempts: np.ndarray
+    successes: np.ndarray
+
+    @property
+    def rate(self) -> np.ndarray:
+        return self.successes / self.attempts
+
+
+@dataclass(kw_only=True)
+class ResultStore(HasLogger):
+    """
+    SQLite database with one row per attempt over any number of campaigns, with indices on the
+    campaign, the voltage, the effect and the world position.
+    Analysis queries run in SQL instead of loading every result file.
+    """
+
+    path: Path = Path("results", "results.sqlite")
+
+    _connection: sqlite3.Connection = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._connection = sqlite3.connect(self.path)
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def rows(campaign: str, results: Iterable[dict]) -> Iterable[tuple]:
+        for result in results:
+            location = (
+                campaign,
+                result.get("iteration"),
+                *result["image_coords"],
+                *result["world_coords"],
+            )
+            for attack in result["results"]:
+                yield *location, *(attack.get(column) for column in ATTACK_COLUMNS)
+
+    def add(self, campaign: str, results: Iterable[dict]) -> int:
+        """
+        Adds the attempts of the results, as read by `read_results`.
+
+        Returns:
+            The number of added attempts.
+        """
+        columns = COLUMNS + ATTACK_COLUMNS
+        with self._connection:
+            before = self.count()
+            self._connection.executemany(
+                f"INSERT INTO attempts ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                self.rows(campaign, results),
+            )
+            self._connection.execute(
+                "INSERT INTO attempts_world SELECT id, world_x, world_x, world_y, world_y "
+                "FROM attempts WHERE id > (SELECT coalesce(max(id), 0) FROM attempts_world)"
+            )
+            return self.count() - before
+
+    def import_campaign(self, directory: Path, replace: bool = True) -> int:
+        """
+        Adds the results of a campaign directory, the campaign is named after the directory.
+
+        Args:
+            replace: Removes the attempts from an earlier import of the campaign first.
+        """
+        path = find_results(directory)
+        if path is None:
+            return 0
+        campaign = Path(directory).name
+        if replace:
+            self.remove(campaign)
+        added = self.add(campaign, read_results(path))
+        self.log.info("Imported %s attempts of %s", added, campaign)
+        return added
+
+    def remove(self, campaign: str):
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM attempts_world WHERE id IN "
+                "(SELECT id FROM attempts WHERE campaign = ?)",
+                (campaign,),
+            )
+            self._connection.execute("DELETE FROM attempts WHERE campaign = ?", (campaign,))
+
+    def count(self) -> int:
+        return self._connection.execute("SELECT count(*) FROM attempts").fetchone()[0]
+
+    @staticmethod
+    def where(
+        campaign: str | None = None,
+        voltage: tuple[int, int] | None = None,
+        offset: tuple[int, int] | None = None,
+        area: tuple[float, float, float, float] | None = None,
+    ) -> tuple[str, list]:
+        """
+        Builds the filter of a query, the ranges include both ends.
+        The area (x0, y0, x1, y1) in world coordinates is looked up in the spatial index.
+        """
+        conditions, parameters = ["1"], []
+        if campaign is not None:
+            conditions.append("campaign = ?")
+            parameters.append(campaign)
+        for column, bounds in (("voltage", voltage), ("offset", offset)):
+            if bounds is not None:
+                conditions.append(f"{column} BETWEEN ? AND ?")
+                parameters.extend(bounds)
+        if area is not None:
+            x0, y0, x1, y1 = area
+            conditions.append(
+                "id IN (SELECT id FROM attempts_world "
+                "WHERE x0 >= ? AND x1 <= ? AND y0 >= ? AND y1 <= ?)"
+            )
+            parameters.extend((x0, x1, y0, y1))
+        return " AND ".join(conditions), parameters
+
+    def attempts(self, **filters) -> np.ndarray:
+        """
+        Returns:
+            The matching attempts as a structured array, see `where` for the filters.
+        """
+        condition, parameters = self.where(**filters)
+        columns = COLUMNS + ATTACK_COLUMNS
+        rows = self._connection.execute(
+            f"SELECT {', '.join(columns)} FROM attempts WHERE {condition}", parameters
+        ).fetchall()
+        # Missing values of the numeric columns become nan, so they are all floats
+        rows = [tuple(np.nan if value is None else value for value in row) for row in rows]
+        types = [object, float, float, float, float, float, float, float, float, object, float]
+        return np.array(rows, dtype=list(zip(columns, types)))
+
+    def cell_rates(
+        self,
+        cell_size: float = 0.1,
+        effects: Iterable[str] = ("success",),
+        **filters,
+    ) -> CellRates:
+        """
+        Groups the attempts into square cells of the world coordinates.
+
+        Args:
+            cell_size: Edge length of the cells in mm.
+            effects: The effects (by value) that count as a success.
+            filters: See `where`.
+        """
+        condition, parameters = self.where(**filters)
+        effects = tuple(effects)
+        rows = self._connection.execute(
+            f"""
+            SELECT
+                cast(floor(world_x / ?) AS INTEGER) AS cell_x,
+                cast(floor(world_y / ?) AS INTEGER) AS cell_y,
+                count(*),
+                sum(effect IN ({", ".join("?" * len(effects))}))
+            FROM attempts WHERE {condition}
+            GROUP BY cell_x, cell_y
+            """,
+            [cell_size, cell_size, *effects, *parameters],
+        ).fetchall()
+        cells = np.array(rows, dtype=float).reshape(-1, 4)
+        return CellRates(
+            cell_size=cell_size,
+            x=cells[:, 0] * cell_size,
+            y=cells[:, 1] * cell_size,
+            attempts=cells[:, 2].astype(int),
+            successes=cells[:, 3].astype(int),
+        )
+
+
+@click.command()
+@click.argument("campaigns", nargs=-1, type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--database", default=Path("results", "results.sqlite"), type=click.Path(path_type=Path)
+)
+def main(campaigns: tuple[Path, ...], database: Path):
+    """
+    Imports campaign directories into the result store, defaults to all in `results`.
+    """
+    campaigns = campaigns or tuple(path for path in Path("results").iterdir() if path.is_dir())
+    with ResultStore(path=database) as store:
+        for campaign in campaigns:
+            store.import_campaign(campaign)
+        click.echo(f"{store.count()} attempts in {database}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,17 @@
-from dataclasses import dataclass
-from typing import Any
+import gzip
+import json
+import os
+from dataclasses import asdict, dataclass, field, is_dataclass
+from enum import Enum
+from pathlib import Path
+from time import monotonic
+from typing import IO, Any, Iterator
 
+from pulsecontrol.helpers import HasLogger, PointArray
+
+RESULTS_NAME = "results.jsonl"
+# Written by older versions at the end of the attack
+LEGACY_RESULTS_NAME = "glitches.json"
 
 
 @dataclass
@@ -13,3 +24,138 @@ class AttackResults:
 
     # The results depend on multiple parameters that in turn depend on the device used to inject the fault
     results: list[Any]
+
+
+def json_default(value: Any) -> Any:
+    """
+    `default` for `json.dump`, writes dataclasses as dicts, enums by their value and point arrays
+    as lists of points.
+    """
+    if isinstance(value, PointArray):
+        return value.to_list()
+    if is_dataclass(value):
+        return asdict(value)
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+@dataclass(kw_only=True)
+class ResultWriter(HasLogger):
+    """
+    Appends every result as one json line as soon as it's produced, nothing is kept in memory.
+    Reopening the same directory continues the file.
+    """
+
+    # Seconds between flushes, 0 flushes after every result
+    flush_interval: float = 5.0
+    # Also force the flushed data onto the disk, protects against power loss
+    fsync: bool = False
+    # Write `results.jsonl.gz` instead
+    compress: bool = False
+
+    path: Path | None = field(default=None, init=False)
+    count: int = field(default=0, init=False)
+
+    _file: IO[str] | None = field(default=None, init=False, repr=False)
+    _raw: IO[bytes] | None = field(default=None, init=False, repr=False)
+    _last_flush: float = field(default=0.0, init=False, repr=False)
+
+    def open(self, directory: Path):
+        self.close()
+        self.path = Path(directory, RESULTS_NAME + (".gz" if self.compress else ""))
+        self._raw = open(self.path, "ab")
+        # Compressed lines are only complete inside a complete gzip member, there's nothing to fix
+        if not self.compress and self.path.stat().st_size > 0:
+            self.end_last_line()
+        if self.compress:
+            # Appending adds a new gzip member, readers handle these as one stream
+            self._file = gzip.open(self._raw, "at", encoding="utf-8")
+        else:
+            self._file = open(self._raw.fileno(), "a", encoding="utf-8", closefd=False)
+        self._last_flush = monotonic()
+        self.log.info("Writing results to %s", self.path)
+
+    def end_last_line(self):
+        """
+        Terminates a line that a previous run didn't finish, e.g. after a power loss.
+        Otherwise the next result is appended to it, and both are lost when reading.
+        """
+        with open(self.path, "rb") as existing:
+            existing.seek(-1, os.SEEK_END)
+            if existing.read(1) == b"\n":
+                return
+        self.log.warning("The last result in %s is incomplete", self.path)
+        self._raw.write(b"\n")
+        self._raw.flush()
+
+    def write(self, result: AttackResults | dict):
+        if self._file is None:
+            raise ValueError("The result writer isn't open")
+        self._file.write(json.dumps(result, default=json_default) + "\n")
+        self.count += 1
+        if monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self._file is None:
+            return
+        self._file.flush()
+        self._raw.flush()
+        if self.fsync:
+            os.fsync(self._raw.fileno())
+        self._last_flush = monotonic()
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._raw.close()
+        self._file = None
+        self._raw = None
+
+    def reset(self):
+        self.close()
+        self.count = 0
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_results(path: Path) -> Iterator[dict]:
+    """
+    Reads results written by `ResultWriter` (plain or compressed) or a legacy `glitches.json`.
+    A truncated last line, e.g. after a power loss, is skipped.
+    """
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path) as legacy:
+            yield from json.load(legacy)
+        return
+
+    opener = gzip.open if path.suffix == ".gz" else open
+    try:
+        with opener(path, "rt", encoding="utf-8") as lines:
+            for line in lines:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+    except EOFError:
+        # Compressed stream that was cut off
+        return
+
+
+def find_results(directory: Path) -> Path | None:
+    """
+    Returns:
+        The results file of a campaign directory, if there is one.
+    """
+    for name in (RESULTS_NAME, RESULTS_NAME + ".gz", LEGACY_RESULTS_NAME):
+        if Path(directory, name).is_file():
+            return Path(directory, name)
+    return None
@@ -2,9 +2,12 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
+from pulsecontrol.helpers.events import EVENT_LOGGER, EVENTS_SUFFIX, EventHandler
+
 
 def setup_logging():
-    name = datetime.now().strftime("%Y-%m-%dT%H%M%S.log")
+    date = datetime.now().strftime("%Y-%m-%dT%H%M%S")
+    name = f"{date}.log"
     full_path = Path("logs")
     full_path.mkdir(parents=True, exist_ok=True)
     fh = logging.FileHandler(filename=full_path / name, mode="a")
@@ -16,5 +19,9 @@ def setup_logging():
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         handlers=[fh, ch],
     )
-
-
+    # The structured events go to their own file next to the log, not into the text log
+    events = logging.getLogger(EVENT_LOGGER)
+    events.propagate = False
+    events.setLevel(logging.INFO)
+    if not events.handlers:
+        events.addHandler(EventHandler(full_path / f"{date}{EVENTS_SUFFIX}"))
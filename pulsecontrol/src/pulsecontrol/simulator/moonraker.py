@@ -0,0 +1,170 @@
+import asyncio
+import json
+from contextlib import contextmanager, suppress
+from threading import Thread
+from typing import Iterator
+
+import click
+from aiohttp import WSMsgType, web
+
+from pulsecontrol.simulator.printer import GcodeError, SimulatedPrinter
+
+# Moonraker pushes status updates with this interval
+STATUS_INTERVAL = 0.25
+
+PRINTER = web.AppKey("printer", SimulatedPrinter)
+LOCK = web.AppKey("lock", asyncio.Lock)
+
+
+def parse_query(query: dict[str, str]) -> dict[str, list[str] | None]:
+    """
+    `toolhead=position,homed_axes&idle_timeout` -> {"toolhead": [...], "idle_timeout": None}
+    """
+    return {name: value.split(",") if value else None for name, value in query.items()}
+
+
+async def run_script(app: web.Application, script: str) -> dict:
+    """
+    Runs the script and answers once the printer would have answered.
+    Scripts are executed one after another, like klipper does.
+    """
+    printer = app[PRINTER]
+    async with app[LOCK]:
+        try:
+            done = printer.run_script(script)
+        except GcodeError as error:
+            printer.log.warning("Rejected <%s>: %s", script.replace("\n", "; "), error)
+            return {"error": {"code": 400, "message": str(error)}}
+        if printer.time_scale:
+            await asyncio.sleep(max(0.0, done - printer.now()) * printer.time_scale)
+        printer.advance(done)
+    return {"result": "ok"}
+
+
+async def gcode_script(request: web.Request) -> web.Response:
+    response = await run_script(request.app, request.query.get("script", ""))
+    return web.json_response(response, status=response.get("error", {}).get("code", 200))
+
+
+async def objects_query(request: web.Request) -> web.Response:
+    printer = request.app[PRINTER]
+    status = printer.query(parse_query(request.query))
+    return web.json_response({"result": {"eventtime": printer.now(), "status": status}})
+
+
+async def websocket(request: web.Request) -> web.WebSocketResponse:
+    """
+    json-rpc over websocket, supports the gcode script, object query and subscribe methods.
+    """
+    printer = request.app[PRINTER]
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    subscription: dict[str, list[str] | None] = {}
+
+    async def push_status():
+        while not ws.closed:
+            await asyncio.sleep(STATUS_INTERVAL)
+            if subscription and not ws.closed:
+                params = [printer.query(subscription), printer.now()]
+                await ws.send_json(
+                    dict(jsonrpc="2.0", method="notify_status_update", params=params)
+                )
+
+    async def handle(data: dict):
+        params = data.get("params", {})
+        match data.get("method"):
+            case "printer.gcode.script":
+                response = await run_script(request.app, params.get("script", ""))
+            case "printer.objects.query":
+                status = printer.query(params.get("objects", {}))
+                response = {"result": {"eventtime": printer.now(), "status": status}}
+            case "printer.objects.subscribe":
+                subscription.clear()
+                subscription.update(params.get("objects", {}))
+                status = printer.query(subscription)
+                response = {"result": {"eventtime": printer.now(), "status": status}}
+            case method:
+                response = {"error": {"code": -32601, "message": f"Method not found: {method}"}}
+        if not ws.closed:
+            await ws.send_json(dict(jsonrpc="2.0", id=data.get("id"), **response))
+
+    pusher = asyncio.create_task(push_status())
+    handlers = set()
+    async for message in ws:
+        if message.type != WSMsgType.TEXT:
+            continue
+        # Scripts block until the moves are done, queries have to be answered in the meantime
+        task = asyncio.create_task(handle(json.loads(message.data)))
+        handlers.add(task)
+        task.add_done_callback(handlers.discard)
+    pusher.cancel()
+    for task in [pusher, *handlers]:
+        with suppress(asyncio.CancelledError):
+            await task
+    return ws
+
+
+def create_app(printer: SimulatedPrinter) -> web.Application:
+    app = web.Application()
+    app[PRINTER] = printer
+    app[LOCK] = asyncio.Lock()
+    for method in ("GET", "POST"):
+        app.router.add_route(method, "/printer/gcode/script", gcode_script)
+        app.router.add_route(method, "/printer/objects/query", objects_query)
+    app.router.add_get("/websocket", websocket)
+    return app
+
+
+@contextmanager
+def run_in_thread(
+    printer: SimulatedPrinter, host: str = "127.0.0.1", port: int = 0
+) -> Iterator[str]:
+    """
+    Serves the simulator from a background thread, e.g. for tests.
+
+    Returns:
+        The endpoint to use for the `Moonraker` control strategy.
+    """
+    loop = asyncio.new_event_loop()
+    thread = Thread(target=loop.run_forever, name="moonraker-simulator", daemon=True)
+    thread.start()
+    runner = web.AppRunner(create_app(printer))
+    try:
+        asyncio.run_coroutine_threadsafe(runner.setup(), loop).result()
+        site = web.TCPSite(runner, host, port)
+        asyncio.run_coroutine_threadsafe(site.start(), loop).result()
+        host, port = runner.addresses[0][:2]
+        yield f"http://{host}:{port}"
+    finally:
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=7125, show_default=True)
+@click.option(
+    "--time-scale",
+    default=1.0,
+    show_default=True,
+    help="Wall clock seconds per simulated second, 0 answers immediately.",
+)
+@click.option(
+    "--surface-height",
+    default=5.0,
+    show_default=True,
+    help="Absolute height at which the probe triggers.",
+)
+def main(host: str, port: int, time_scale: float, surface_height: float):
+    """
+    Runs a simulated klipper printer behind a moonraker compatible api, so the control strategies
+    and integrators can be tested without the movement platform.
+    """
+    printer = SimulatedPrinter(time_scale=time_scale, surface_height=surface_height)
+    web.run_app(create_app(printer), host=host, port=port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+from dataclasses import dataclass, field
+from math import dist, sqrt
+from time import monotonic
+
+from pulsecontrol.helpers import HasLogger
+
+AXES = "XYZ"
+
+
+class GcodeError(Exception): ...
+
+
+@dataclass(kw_only=True)
+class Kinematics:
+    """
+    Motion limits, the defaults are the values from `printctl/overlay/config/printer.cfg`.
+    Velocities in mm/s, accelerations in mm/s^2.
+    """
+
+    max_velocity: float = 500
+    max_accel: float = 3000
+    max_z_velocity: float = 5
+    max_z_accel: float = 30
+    homing_speed: float = 50
+    probe_speed: float = 5
+
+    axis_minimum: tuple[float, float, float] = (0, 0, -15)
+    axis_maximum: tuple[float, float, float] = (260, 245, 270)
+
+    # `safe_z_home` moves to this position before homing z
+    home_xy_position: tuple[float, float] = (258, 230)
+
+    def move_time(self, start: list[float], end: list[float], speed: float) -> float:
+        """
+        Duration of a move with a trapezoidal velocity profile, starting and ending at rest.
+        Moves with a z component are limited by the z velocity and acceleration.
+        """
+        distance = dist(start, end)
+        if not distance:
+            return 0.0
+        velocity = min(speed, self.max_velocity)
+        accel = self.max_accel
+        if dz := abs(end[2] - start[2]):
+            velocity = min(velocity, self.max_z_velocity * distance / dz)
+            accel = min(accel, self.max_z_accel * distance / dz)
+
+        # Distance needed to accelerate to full speed and back to zero
+        if distance >= velocity**2 / accel:
+            return distance / velocity + velocity / accel
+        # The move is too short to reach full speed, the profile is a triangle
+        return 2 * sqrt(distance / accel)
+
+
+@dataclass(kw_only=True)
+class SimulatedPrinter(HasLogger):
+    """
+    Models the parts of klipper that pulsecontrol relies on: G0/G1, G4, G28, G90/G91, G92, M400,
+    PROBE and SET_LED.
+
+    Time is simulated: moves are queued and only M400, homing and probing wait for the queue.
+    With a `time_scale` of 1 the simulator runs in real time, 0 answers immediately.
+    The simulated time is available as `clock`.
+    """
+
+    kinematics: Kinematics = field(default_factory=Kinematics)
+    # Absolute height at which the probe triggers
+    surface_height: float = 5.0
+    time_scale: float = 1.0
+
+    position: list[float] = field(default_factory=lambda: [0.0, 0.0, 0.0])
+    # gcode position = position - base
+    base: list[float] = field(default_factory=lambda: [0.0, 0.0, 0.0])
+    absolute: bool = True
+    homed: set[str] = field(default_factory=set)
+    # Feed rate in mm/s, 25mm/s is the klipper default
+    speed: float = 25.0
+    leds: dict[str, float] = field(default_factory=dict)
+
+    # Simulated seconds since the start
+    clock: float = 0.0
+    # Simulated time at which all queued moves are done
+    busy_until: float = 0.0
+    # Sum of the durations of all moves, dwells, homing and probing
+    motion_time: float = 0.0
+    commands: int = 0
+
+    _start: float = field(default_factory=monotonic, repr=False)
+
+    def now(self) -> float:
+        if self.time_scale:
+            self.clock = max(self.clock, (monotonic() - self._start) / self.time_scale)
+        return self.clock
+
+    def advance(self, until: float):
+        """
+        Moves the clock forward, call this after waiting for the response time of `run_script`.
+        """
+        self.clock = max(self.clock, until)
+
+    @property
+    def idle(self) -> bool:
+        return self.busy_until <= self.now()
+
+    def status(self) -> dict[str, dict]:
+        gcode_position = [p - b for p, b in zip(self.position, self.base)]
+        return {
+            "toolhead": {
+                "position": [*self.position, 0.0],
+                "homed_axes": "".join(a for a in "xyz" if a in self.homed),
+                "axis_minimum": [*self.kinematics.axis_minimum, 0.0],
+                "axis_maximum": [*self.kinematics.axis_maximum, 0.0],
+            },
+            "gcode_move": {
+                "position": [*self.position, 0.0],
+                "gcode_position": [*gcode_position, 0.0],
+                "homing_origin": [0.0, 0.0, 0.0, 0.0],
+                "absolute_coordinates": self.absolute,
+            },
+            "idle_timeout": {"state": "Ready" if self.idle else "Printing"},
+        }
+
+    def query(self, objects: dict[str, list[str] | None]) -> dict[str, dict]:
+        status = self.status()
+        result = {}
+        for name, attributes in objects.items():
+            if name not in status:
+                continue
+            values = status[name]
+            result[name] = {k: v for k, v in values.items() if not attributes or k in attributes}
+        return result
+
+    def run_script(self, script: str) -> float:
+        """
+        Executes a gcode script like klipper does: line by line, until the first error.
+
+        Returns:
+            The simulated time at which the response is sent.
+
+        Raises:
+            GcodeError: if a command was rejected. Commands before it were executed.
+        """
+        cursor = self.now()
+        for line in script.splitlines():
+            words = line.split()
+            if not words:
+                continue
+            self.commands += 1
+            command = words[0].upper()
+            match command:
+                case "G90":
+                    self.absolute = True
+                case "G91":
+                    self.absolute = False
+                case "G0" | "G1":
+                    self._move(cursor, self._parse(words[1:]))
+                case "G4":
+                    params = self._parse(words[1:], "P")
+                    self._queue(cursor, params.get("P", 0) / 1000)
+                case "G92":
+                    for axis, value in self._parse(words[1:]).items():
+                        index = AXES.index(axis)
+                        self.base[index] = self.position[index] - value
+                case "M400":
+                    cursor = max(cursor, self.busy_until)
+                case "G28":
+                    cursor = self._home(max(cursor, self.busy_until), words[1:])
+                case "PROBE":
+                    cursor = self._probe(max(cursor, self.busy_until))
+                case "SET_LED":
+                    self._set_led(words[1:])
+                case _:
+                    raise GcodeError(f'Unknown command:"{command}"')
+        return cursor
+
+    @staticmethod
+    def _parse(words: list[str], names: str = AXES + "F") -> dict[str, float]:
+        params = {}
+        for word in words:
+            name = word[0].upper()
+            if name in names:
+                try:
+                    params[name] = float(word[1:])
+                except ValueError:
+                    raise GcodeError(f"Unable to parse '{word}'")
+        return params
+
+    def _queue(self, cursor: float, duration: float):
+        self.busy_until = max(cursor, self.busy_until) + duration
+        self.motion_time += duration
+
+    def _move(self, cursor: float, params: dict[str, float]):
+        if "F" in params:
+            self.speed = params.pop("F") / 60
+        target = list(self.position)
+        for axis, value in params.items():
+            index = AXES.index(axis)
+            target[index] = value + self.base[index] if self.absolute else target[index] + value
+        if target == self.position:
+            return
+
+        moved = {a.lower() for a, p, t in zip(AXES, self.position, target) if p != t}
+        if not moved <= self.homed:
+            raise GcodeError("Must home axis first: %.3f %.3f %.3f [0.000]" % tuple(target))
+        limits = zip(target, self.kinematics.axis_minimum, self.kinematics.axis_maximum)
+        for value, lower, upper in limits:
+            if not lower <= value <= upper:
+                raise GcodeError("Move out of range: %.3f %.3f %.3f [0.000]" % tuple(target))
+
+        self._queue(cursor, self.kinematics.move_time(self.position, target, self.speed))
+        self.position = target
+
+    def _home(self, cursor: float, words: list[str]) -> float:
+        axes = {word[0].upper() for word in words} & set(AXES) or set(AXES)
+        start = cursor
+        for axis in "XY":
+            if axis in axes:
+                index = AXES.index(axis)
+                # Without homing, the distance is unknown, assume the worst case
+                distance = self.position[index]
+                if axis.lower() not in self.homed:
+                    distance = self.kinematics.axis_maximum[index]
+                cursor += distance / self.kinematics.homing_speed
+                self.position[index] = 0.0
+                self.base[index] = 0.0
+                self.homed.add(axis.lower())
+        if "Z" in axes:
+            if not {"x", "y"} <= self.homed:
+                raise GcodeError("Must home X and Y axes first")
+            home = [*self.kinematics.home_xy_position, self.position[2]]
+            cursor += self.kinematics.move_time(self.position, home, self.kinematics.homing_speed)
+            cursor += self.kinematics.axis_maximum[2] / self.kinematics.probe_speed
+            self.position = [*self.kinematics.home_xy_position, 0.0]
+            self.base[2] = 0.0
+            self.homed.add("z")
+        self.motion_time += cursor - start
+        self.busy_until = cursor
+        return cursor
+
+    def _probe(self, cursor: float) -> float:
+        if "z" not in self.homed:
+            raise GcodeError("Must home before probe")
+        if self.position[2] < self.surface_height:
+            raise GcodeError("Probe triggered prior to movement")
+        duration = (self.position[2] - self.surface_height) / self.kinematics.probe_speed
+        self.position[2] = self.surface_height
+        self.motion_time += duration
+        self.busy_until = cursor + duration
+        return self.busy_until
+
+    def _set_led(self, words: list[str]):
+        params = dict(word.split("=", 1) for word in words if "=" in word)
+        try:
+            self.leds[params["LED"]] = float(params.get("WHITE", 0))
+        except (KeyError, ValueError):
+            raise GcodeError("Malformed command 'SET_LED %s'" % " ".join(words))
@@ -1,9 +1,10 @@
 from dataclasses import dataclass
+from typing import ClassVar
 
 import cv2
-import numpy as np
 
 from pulsecontrol.helpers import Rectangle
+from pulsecontrol.strategies.camera.hsv_mask import HsvThresholds
 from pulsecontrol.strategies.camera.pcb_camera import PcbCamera
 
 
@@ -12,20 +13,7 @@ class ESPPcbCamera(PcbCamera):
     # This flag is required to let dacite know which class to load
     esp32: bool
 
-    @staticmethod
-    def get_mask(image: np.ndarray, weakening_factor: float = 1.0):
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-        hue = hsv[..., 0]
-        hue_vals = (60, 120)
-        saturation = hsv[..., 1]
-        saturation_values = (50, 180)
-        value = hsv[..., 2]
-        value_values = (0, 250)
-
-        h = cv2.inRange(hue, *hue_vals)
-        saturation = cv2.inRange(saturation, *saturation_values)
-        value = cv2.inRange(value, *value_values)
-        return h, saturation, value
+    thresholds: ClassVar = HsvThresholds(hue=((60, 120),), saturation=(50, 180), value=(0, 250))
 
     @staticmethod
     def get_approximation(contour):
@@ -0,0 +1,40 @@
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+
+@dataclass(frozen=True, kw_only=True)
+class HsvThresholds:
+    """
+    Inclusive ranges of the OpenCV HSV channels, hue goes from 0 to 179.
+    The hue can have several ranges, e.g. to include the red hues at both ends.
+    """
+
+    hue: tuple[tuple[float, float], ...]
+    saturation: tuple[float, float]
+    value: tuple[float, float]
+
+    def mask(self, hsv: np.ndarray) -> np.ndarray:
+        """
+        The pixels inside all three ranges, each hue range checks all channels in one pass.
+        """
+        mask = None
+        for hue_lower, hue_upper in self.hue:
+            lower = np.array((hue_lower, self.saturation[0], self.value[0]))
+            upper = np.array((hue_upper, self.saturation[1], self.value[1]))
+            in_range = cv2.inRange(hsv, lower, upper)
+            mask = in_range if mask is None else cv2.bitwise_or(mask, in_range, dst=mask)
+        return mask
+
+    def channel_masks(self, hsv: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Separate masks of the hue, saturation and value, to see which channel rejects a pixel.
+        """
+        hue = None
+        for lower, upper in self.hue:
+            in_range = cv2.inRange(hsv[..., 0], lower, upper)
+            hue = in_range if hue is None else cv2.bitwise_or(hue, in_range, dst=hue)
+        saturation = cv2.inRange(hsv[..., 1], *self.saturation)
+        value = cv2.inRange(hsv[..., 2], *self.value)
+        return hue, saturation, value
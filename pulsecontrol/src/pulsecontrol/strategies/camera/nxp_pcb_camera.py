@@ -1,9 +1,10 @@
 from dataclasses import dataclass
+from typing import ClassVar
 
 import cv2
-import numpy as np
 
 from pulsecontrol.helpers import Rectangle
+from pulsecontrol.strategies.camera.hsv_mask import HsvThresholds
 from pulsecontrol.strategies.camera.pcb_camera import PcbCamera
 
 
@@ -11,21 +12,11 @@ from pulsecontrol.strategies.camera.pcb_camera import PcbCamera
 class NxpPcbCamera(PcbCamera):
     nxp: bool
 
-    @staticmethod
-    def get_mask(image: np.ndarray):
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-
-        hue = hsv[..., 0]
-        hue_center = 110
-        saturation = hsv[..., 1]
-        saturation_center = 50
-        value = hsv[..., 2]
-        value_center = 40
-
-        hue = cv2.inRange(hue, hue_center - 15, hue_center + 12)
-        saturation = cv2.inRange(saturation, saturation_center - 18, saturation_center + 14)
-        value = cv2.inRange(value, value_center - 12, value_center + 12)
-        return hue, saturation, value
+    thresholds: ClassVar = HsvThresholds(
+        hue=((95, 122),),  # center 110
+        saturation=(32, 64),  # center 50
+        value=(28, 52),  # center 40
+    )
 
     @staticmethod
     def get_approximation(contour):
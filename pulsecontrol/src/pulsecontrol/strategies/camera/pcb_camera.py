@@ -1,11 +1,12 @@
 from abc import abstractmethod
 from dataclasses import dataclass
-from typing import Generator
+from typing import ClassVar, Generator
 
 import cv2
 import numpy as np
 
 from pulsecontrol.helpers import Rectangle
+from pulsecontrol.strategies.camera.hsv_mask import HsvThresholds
 from pulsecontrol.strategies.camera.strategy import PiCameraWrapper
 
 
@@ -13,22 +14,43 @@ from pulsecontrol.strategies.camera.strategy import PiCameraWrapper
 class PcbCamera(PiCameraWrapper):
     image_rotation: int | None = cv2.ROTATE_90_CLOCKWISE
 
-    @staticmethod
-    @abstractmethod
-    def get_mask(image: np.ndarray, weakening_factor: float = 1.) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
-        raise NotImplementedError()
+    # Finds the candidates on the image scaled down by 2 ** pyramid_levels and only processes the
+    # area around the best ones at full resolution. 0 processes the whole image at full resolution
+    pyramid_levels: int = 0
+    # Number of coarse candidates, closest to the center first, that are refined
+    pyramid_candidates: int = 3
+
+    # Color of the chip, cameras without thresholds override `get_mask` and `combine_and_morph`
+    thresholds: ClassVar[HsvThresholds | None] = None
+
+    @classmethod
+    def get_mask(
+        cls, image: np.ndarray, weakening_factor: float = 1.
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The masks of the hue, saturation and value thresholds, to inspect them separately.
+        """
+        if cls.thresholds is None:
+            raise NotImplementedError()
+        return cls.thresholds.channel_masks(cv2.cvtColor(image, cv2.COLOR_BGR2HSV))
 
     @staticmethod
     def combine_and_morph(h, s, v) -> np.ndarray:
+        # Opening each mask before combining them and opening again gives the same mask,
+        # an opening doesn't change an opened mask
         kernel = np.ones((5, 5), np.uint8)
-        s = cv2.morphologyEx(s, cv2.MORPH_OPEN, kernel)
-        h = cv2.morphologyEx(h, cv2.MORPH_OPEN, kernel)
-        v = cv2.morphologyEx(v, cv2.MORPH_OPEN, kernel)
-
         combined = cv2.bitwise_and(cv2.bitwise_and(h, s), v)
-        combined = cv2.morphologyEx(combined, cv2.MORPH_OPEN, kernel)
         return cv2.morphologyEx(combined, cv2.MORPH_OPEN, kernel)
 
+    def combined_mask(self, image: np.ndarray) -> np.ndarray:
+        """
+        The opened mask of the chip, the same as `combine_and_morph` of the `get_mask` masks.
+        """
+        if self.thresholds is None:
+            return self.combine_and_morph(*self.get_mask(image))
+        mask = self.thresholds.mask(cv2.cvtColor(image, cv2.COLOR_BGR2HSV))
+        return cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((5, 5), np.uint8))
+
     def filter_rectangle(self, rectangle: Rectangle | cv2.typing.RotatedRect) -> bool:
         _, (width, height), angle = rectangle
         ratio = width / height
@@ -53,27 +75,87 @@ class PcbCamera(PiCameraWrapper):
         distance_to_center = np.linalg.norm(np.asarray(rectangle[0]) - np.asarray((*center,)))
         return distance_to_center
 
-    def get_coordinate(self) -> Generator[Rectangle, None, None]:
-        image: np.ndarray = self.get_image()
-        # Image mask
-        masks = self.get_mask(image)
-        combined = self.combine_and_morph(*masks)
-        # contour stuff
+    def find_candidates(
+        self, image: np.ndarray
+    ) -> Generator[tuple[np.ndarray, Rectangle], None, None]:
+        """
+        Yields the approximation and the minimal area rectangle of each contour in the mask,
+        the rectangles aren't filtered yet.
+        """
+        combined = self.combined_mask(image)
         contours, hierarchy = cv2.findContours(combined, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-
-        results = []
         for contour in contours:
             approx = self.get_approximation(contour)
             if self.filter_approximation(approx):
-                min_area = cv2.minAreaRect(approx)
-                if self.filter_rectangle(min_area):
-                    _, (width, height), angle = min_area
-                    # If the square is almost upright, noise in the image processing can cause the angle to be off
-                    # This is a simple heuristic to correct that
-                    new_angle = 90.0 - angle
-                    if 0 < new_angle < angle:
-                        angle = new_angle
-                        width, height = height, width
-                    results.append((min_area[0], (width, height), angle))
+                yield approx, cv2.minAreaRect(approx)
+
+    def coarse_candidates(self, image: np.ndarray) -> list[Rectangle]:
+        """
+        The rectangles found on the downscaled image, in full resolution coordinates.
+        """
+        scale = 2 ** self.pyramid_levels
+        small = cv2.resize(image, None, fx=1 / scale, fy=1 / scale, interpolation=cv2.INTER_AREA)
+        results = []
+        for _, ((x, y), (width, height), angle) in self.find_candidates(small):
+            # Pixel centers of the small image are in the middle of a block of full pixels
+            center = (x + 0.5) * scale - 0.5, (y + 0.5) * scale - 0.5
+            rectangle = center, (width * scale, height * scale), angle
+            if self.filter_rectangle(rectangle):
+                results.append(rectangle)
+        return sorted(results, key=self.sort_chip_candidates)[:self.pyramid_candidates]
+
+    def refine_candidate(self, image: np.ndarray, candidate: Rectangle) -> Rectangle | None:
+        """
+        Finds the candidate again in a window of the full resolution image around it, the corners
+        are refined to sub-pixel accuracy on the edges of the image.
+        """
+        margin = 4 * 2 ** self.pyramid_levels
+        x, y, width, height = cv2.boundingRect(cv2.boxPoints(candidate).astype(np.float32))
+        left, top = max(x - margin, 0), max(y - margin, 0)
+        right = min(x + width + margin, image.shape[1])
+        bottom = min(y + height + margin, image.shape[0])
+        window = image[top:bottom, left:right]
+
+        best, best_distance = None, None
+        for approx, rectangle in self.find_candidates(window):
+            if not self.filter_rectangle(rectangle):
+                continue
+            center = np.asarray(rectangle[0]) + (left, top)
+            distance = np.linalg.norm(center - candidate[0])
+            if best is None or distance < best_distance:
+                best, best_distance = approx, distance
+        if best is None:
+            return None
+
+        gray = cv2.cvtColor(window, cv2.COLOR_BGR2GRAY)
+        corners = best.reshape(-1, 1, 2).astype(np.float32)
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.01)
+        corners = cv2.cornerSubPix(gray, corners, (5, 5), (-1, -1), criteria)
+        rectangle = cv2.minAreaRect(corners + np.float32((left, top)))
+        return rectangle if self.filter_rectangle(rectangle) else None
+
+    @staticmethod
+    def upright(rectangle: Rectangle) -> Rectangle:
+        center, (width, height), angle = rectangle
+        # If the square is almost upright, noise in the image processing can cause the angle to be off
+        # This is a simple heuristic to correct that
+        new_angle = 90.0 - angle
+        if 0 < new_angle < angle:
+            angle = new_angle
+            width, height = height, width
+        return center, (width, height), angle
+
+    def get_coordinate(self) -> Generator[Rectangle, None, None]:
+        image: np.ndarray = self.get_image()
+        if self.pyramid_levels > 0:
+            refined = (self.refine_candidate(image, c) for c in self.coarse_candidates(image))
+            rectangles = [rectangle for rectangle in refined if rectangle is not None]
+        else:
+            rectangles = [
+                rectangle
+                for _, rectangle in self.find_candidates(image)
+                if self.filter_rectangle(rectangle)
+            ]
 
+        results = [self.upright(rectangle) for rectangle in rectangles]
         yield from sorted(results, key=self.sort_chip_candidates)
@@ -1,11 +1,13 @@
 from dataclasses import dataclass, field
+from datetime import datetime
 from enum import Enum
+from pathlib import Path
 
 import cv2
 import numpy as np
 
 from pulsecontrol.helpers import Point2D
-from pulsecontrol.strategies.camera.strategy import PiCameraWrapper
+from pulsecontrol.strategies.camera.strategy import PiCameraWrapper, Window, to_image
 
 try:
     import RPi.GPIO as GPIO
@@ -62,6 +64,12 @@ class ProbeCamera(PiCameraWrapper):
 
     probe_type: Probe
 
+    # Only undistort, rotate and save the pixels of the crop, see `get_window`
+    roi: bool = True
+    # Let libcamera crop the frames to the window with a ScalerCrop, so only the window is read
+    # from the sensor. Assumes the full sensor resolution, `get_image` returns the window too.
+    sensor_crop: bool = False
+
     def crop_image(self, image):
         return image[
                self.crop_upper_edge.y: self.crop_upper_edge.y + self.crop_width,
@@ -69,6 +77,71 @@ class ProbeCamera(PiCameraWrapper):
                ...,
                ]
 
+    def crop_window(self) -> Window:
+        x, y = int(self.crop_upper_edge.x), int(self.crop_upper_edge.y)
+        return x, y, self.crop_width, self.crop_width
+
+    def source_window(self) -> Window:
+        """
+        The part of the frame before the rotation that's needed for the crop, with the pixels
+        the undistortion moves into it. Aligned to even pixels for the sensor.
+        """
+        window = self.sensor_window(self.crop_window())
+        if self.calibration:
+            window, _, _ = self.calibration.window_maps(self.sensor_resolution(), window)
+        x, y, width, height = window
+        left, top = x - x % 2, y - y % 2
+        sensor_width, sensor_height = self.sensor_resolution()
+        right = min(x + width + (x + width) % 2, sensor_width)
+        bottom = min(y + height + (y + height) % 2, sensor_height)
+        return left, top, right - left, bottom - top
+
+    def output_size(self) -> tuple[int, int]:
+        if self.sensor_crop:
+            return self.source_window()[2:]
+        return super().output_size()
+
+    def camera_controls(self) -> dict:
+        camera_controls = super().camera_controls()
+        if self.sensor_crop:
+            camera_controls["ScalerCrop"] = self.source_window()
+        return camera_controls
+
+    def get_window(self) -> np.ndarray:
+        """
+        Captures the same pixels as `crop_image` of `get_image`, but only the window is
+        undistorted, rotated and saved.
+        """
+        window = self.sensor_window(self.crop_window())
+        self.start_camera()
+        frame = self.capture()
+        if not self.streaming:
+            self.stop_camera()
+
+        origin = (0, 0)
+        if self.sensor_crop:
+            source = self.source_window()
+            if frame.shape[1::-1] != source[2:]:
+                self.log.warning("Got a %s frame for the %s crop, scaling it", frame.shape, source)
+                frame = cv2.resize(frame, source[2:])
+            origin = source[:2]
+        if self.calibration:
+            resolution = self.sensor_resolution()
+            image = self.calibration.undistort_window(frame, resolution, window, origin)
+        else:
+            x, y, width, height = window
+            x, y = x - origin[0], y - origin[1]
+            image = frame[y : y + height, x : x + width]
+        if self.image_rotation is not None:
+            image = self.rotate_image(image)
+        to_image(Path("results/", datetime.now().strftime("%Y-%m-%dT%H%M%S-probe.jpg")), image)
+        return image
+
+    def get_image(self) -> np.ndarray:
+        if self.sensor_crop:
+            return self.get_window()
+        return super().get_image()
+
     @staticmethod
     def preprocess_image(image):
         blurred = cv2.GaussianBlur(image, (7, 7), 0)
@@ -130,8 +203,10 @@ class ProbeCamera(PiCameraWrapper):
         return distance_from_camera_position
 
     def get_coordinate(self) -> Point2D:
-        image = self.get_image()
-        image = self.crop_image(image)
+        if self.roi or self.sensor_crop:
+            image = self.get_window()
+        else:
+            image = self.crop_image(self.get_image())
         image = self.preprocess_image(image)
         point = Point2D.from_iter(self.get_best_circle(image))
         self.log.info(f"Got point: {point:.2f}")
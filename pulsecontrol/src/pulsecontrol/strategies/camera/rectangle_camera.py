@@ -1,9 +1,10 @@
 from dataclasses import dataclass
+from typing import ClassVar
 
 import cv2
-import numpy as np
 
 from pulsecontrol.helpers import Rectangle
+from pulsecontrol.strategies.camera.hsv_mask import HsvThresholds
 from pulsecontrol.strategies.camera.pcb_camera import PcbCamera
 
 
@@ -12,21 +13,11 @@ class RectangleCamera(PcbCamera):
     # This is a stub value, only used to let dacite know which camera we selected
     rectangle: bool
 
-    @staticmethod
-    def get_mask(image: np.ndarray):
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-
-        hue = hsv[..., 0]
-        hue_center = 57.5  # 45 <-> 70
-        saturation = hsv[..., 1]
-        saturation_center = 115  # ~ 80 <-> 150
-        value = hsv[..., 2]
-        value_center = 120  # 70 <-> 170
-
-        hue = cv2.inRange(hue, hue_center - 12.5, hue_center + 12.5)
-        saturation = cv2.inRange(saturation, saturation_center - 35, saturation_center + 35)
-        value = cv2.inRange(value, value_center - 50, value_center + 50)
-        return hue, saturation, value
+    thresholds: ClassVar = HsvThresholds(
+        hue=((45, 70),),  # center 57.5
+        saturation=(80, 150),  # center 115
+        value=(70, 170),  # center 120
+    )
 
     @staticmethod
     def get_approximation(contour):
@@ -1,9 +1,10 @@
 from dataclasses import dataclass
+from typing import ClassVar
 
 import cv2
-import numpy as np
 
 from pulsecontrol.helpers import Rectangle
+from pulsecontrol.strategies.camera.hsv_mask import HsvThresholds
 from pulsecontrol.strategies.camera.pcb_camera import PcbCamera
 
 
@@ -11,21 +12,7 @@ from pulsecontrol.strategies.camera.pcb_camera import PcbCamera
 class SimplePcbCamera(PcbCamera):
     simple: bool
 
-    @staticmethod
-    def get_mask(image: np.ndarray):
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-
-        hue = hsv[..., 0]
-        hue_vals = (80, 110)
-        saturation = hsv[..., 1]
-        saturation_values = (190, 250)
-        value = hsv[..., 2]
-        value_values = (45, 85)
-
-        hue = cv2.inRange(hue, *hue_vals)
-        saturation = cv2.inRange(saturation, *saturation_values)
-        value = cv2.inRange(value, *value_values)
-        return hue, saturation, value
+    thresholds: ClassVar = HsvThresholds(hue=((80, 110),), saturation=(190, 250), value=(45, 85))
 
     @staticmethod
     def get_approximation(contour):
@@ -1,9 +1,10 @@
 from dataclasses import dataclass
+from typing import ClassVar
 
 import cv2
-import numpy as np
 
 from pulsecontrol.helpers import Rectangle
+from pulsecontrol.strategies.camera.hsv_mask import HsvThresholds
 from pulsecontrol.strategies.camera.pcb_camera import PcbCamera
 
 
@@ -11,20 +12,9 @@ from pulsecontrol.strategies.camera.pcb_camera import PcbCamera
 class SpcPcbCamera(PcbCamera):
     spc: bool
 
-    @staticmethod
-    def get_mask(image: np.ndarray, weakening_factor: float = 1.):
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-        hue = hsv[..., 0]
-        hue_vals = (60, 120)
-        saturation = hsv[..., 1]
-        saturation_values = (5, 55)
-        value = hsv[..., 2]
-        value_values = (35, 75)
-
-        h = cv2.bitwise_or(cv2.inRange(hue, *hue_vals), cv2.inRange(hue, 0, 0))
-        saturation = cv2.inRange(saturation, *saturation_values)
-        value = cv2.inRange(value, *value_values)
-        return h, saturation, value
+    thresholds: ClassVar = HsvThresholds(
+        hue=((60, 120), (0, 0)), saturation=(5, 55), value=(35, 75)
+    )
 
     @staticmethod
     def get_approximation(contour):
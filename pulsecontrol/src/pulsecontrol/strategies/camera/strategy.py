@@ -1,3 +1,5 @@
+import hashlib
+import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field, InitVar
 from datetime import datetime
@@ -8,20 +10,22 @@ from typing import Iterable, Optional
 import cv2
 import numpy as np
 
-from pulsecontrol.helpers import Point2D, Rectangle, HasLogger
+from pulsecontrol.helpers import Point2D, PointArray, Rectangle, HasLogger
 from pulsecontrol.strategies import Strategy
 
 try:
     from picamera2 import Picamera2
     from libcamera import controls
 except ModuleNotFoundError:
-    import logging
     from unittest.mock import MagicMock
 
     logging.error("Picamera Module not installed, this is OK if not executed on a pi.")
     # This is a stub which allows us to run the code in environments without the picamera module
     Picamera2 = MagicMock()
 
+# Part of an image as (x, y, width, height) in pixels
+Window = tuple[int, int, int, int]
+
 
 def to_image(name: Path, image: np.ndarray):
     name.parent.mkdir(parents=True, exist_ok=True)
@@ -60,17 +64,122 @@ class Focus:
 @dataclass(kw_only=True)
 class Calibration:
     """
-    Stores the calibration matrix and dist-coefficients
+    Stores the calibration matrix and dist-coefficients.
+    Undistortion uses lookup tables that are built once per resolution and saved next to the
+    calibration files, named after a hash of the calibration so they're rebuilt when it changes.
     """
     matrix_path: InitVar[Path]
     distortion_coefficients_path: InitVar[Path]
+    # Fixed point tables are half the size and faster to apply, with a small interpolation error
+    fixed_point: bool = True
 
     matrix: np.ndarray = field(init=False)
     distortion_coefficients: np.ndarray = field(init=False)
 
+    _directory: Path = field(init=False, repr=False)
+    _maps: dict[tuple[int, int], tuple[np.ndarray, np.ndarray]] = field(
+        init=False, repr=False, default_factory=dict
+    )
+    _window_maps: dict[tuple[tuple[int, int], Window], tuple[Window, np.ndarray, np.ndarray]] = (
+        field(init=False, repr=False, default_factory=dict)
+    )
+
     def __post_init__(self, matrix_path: Path, distortion_coefficients_path: Path):
         self.matrix = np.load(matrix_path)
         self.distortion_coefficients = np.load(distortion_coefficients_path)
+        self._directory = Path(matrix_path).parent
+
+    def map_path(self, size: tuple[int, int]) -> Path:
+        digest = hashlib.sha1()
+        for array in (self.matrix, self.distortion_coefficients):
+            digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+        kind = "fixed" if self.fixed_point else "float"
+        width, height = size
+        name = f"undistort-{width}x{height}-{kind}-{digest.hexdigest()[:12]}.npz"
+        return Path(self._directory, name)
+
+    def maps(self, size: tuple[int, int]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The remap tables for images with the given (width, height), loaded from or saved to disk.
+        """
+        size = (int(size[0]), int(size[1]))
+        if size in self._maps:
+            return self._maps[size]
+        path = self.map_path(size)
+        if path.is_file():
+            with np.load(path) as tables:
+                maps = tables["map1"], tables["map2"]
+        else:
+            map_type = cv2.CV_16SC2 if self.fixed_point else cv2.CV_32FC1
+            maps = cv2.initUndistortRectifyMap(
+                self.matrix, self.distortion_coefficients, None, self.matrix, size, map_type
+            )
+            try:
+                # Written to a temporary name first, an interrupted write isn't picked up later
+                temporary = path.with_suffix(".tmp.npz")
+                np.savez(temporary, map1=maps[0], map2=maps[1])
+                temporary.replace(path)
+            except OSError as e:
+                logging.getLogger(__name__).warning("Couldn't cache the undistortion maps: %s", e)
+        self._maps[size] = maps
+        return maps
+
+    def undistort(self, image: np.ndarray) -> np.ndarray:
+        """
+        Same as `cv2.undistort`, with the cached tables.
+        """
+        height, width = image.shape[:2]
+        map1, map2 = self.maps((width, height))
+        return cv2.remap(image, map1, map2, cv2.INTER_LINEAR)
+
+    def window_maps(
+        self, size: tuple[int, int], window: Window
+    ) -> tuple[Window, np.ndarray, np.ndarray]:
+        """
+        The tables for undistorting only a window of an image with the given (width, height).
+
+        Returns:
+            The window of the distorted image the pixels are taken from and the tables,
+            relative to that source window.
+        """
+        key = (int(size[0]), int(size[1])), window
+        if key in self._window_maps:
+            return self._window_maps[key]
+        x, y, width, height = window
+        map1, map2 = self.maps(key[0])
+        map1, map2 = map1[y : y + height, x : x + width], map2[y : y + height, x : x + width]
+        if self.fixed_point:
+            # The integer part of the coordinates, map2 indexes the fraction
+            xs, ys = map1[..., 0], map1[..., 1]
+        else:
+            xs, ys = map1, map2
+        # One more pixel on each side for the interpolation
+        left = int(np.clip(np.floor(xs.min()) - 1, 0, size[0]))
+        top = int(np.clip(np.floor(ys.min()) - 1, 0, size[1]))
+        right = int(np.clip(np.ceil(xs.max()) + 2, left, size[0]))
+        bottom = int(np.clip(np.ceil(ys.max()) + 2, top, size[1]))
+        if self.fixed_point:
+            map1 = map1 - np.array([left, top], dtype=map1.dtype)
+        else:
+            map1, map2 = map1 - left, map2 - top
+        self._window_maps[key] = (left, top, right - left, bottom - top), map1, map2
+        return self._window_maps[key]
+
+    def undistort_window(
+        self, image: np.ndarray, size: tuple[int, int], window: Window, origin=(0, 0)
+    ) -> np.ndarray:
+        """
+        Undistorts only the window of an image with the given (width, height), the same pixels
+        as cropping the result of `undistort`.
+
+        Args:
+            image: The whole image or a part of it that contains the source window.
+            origin: Position of the image part in the whole image.
+        """
+        (left, top, width, height), map1, map2 = self.window_maps(size, window)
+        left, top = left - origin[0], top - origin[1]
+        source = image[top : top + height, left : left + width]
+        return cv2.remap(source, map1, map2, cv2.INTER_LINEAR)
 
 
 @dataclass(kw_only=True)
@@ -85,14 +194,14 @@ class CameraStrategy(Strategy, ABC):
     _autofocus: bool = False
     _area_filter: bool = True
 
-    def normalize_distance(self, difference: Point2D) -> Point2D:
+    def normalize_distance(self, difference: Point2D | PointArray) -> Point2D | PointArray:
         """
         Converts the center position of the chip from camera coordinates to the distance
         from the current position.
         Add this to the current position to get the resulting pcb center in the machines coordinates
         """
-        difference.y *= -1
-        distance_from_camera_position = difference * self.focus.pixel_size
+        # Works for a single `Point2D` and a `PointArray`, the difference isn't changed
+        distance_from_camera_position = difference * (1, -1) * self.focus.pixel_size
         return distance_from_camera_position
 
     @abstractmethod
@@ -136,28 +245,74 @@ class PiCameraWrapper(CameraStrategy, HasLogger, ABC):
 
     calibration: Calibration | None = None
 
+    # Keep the sensor running between captures, the focus is only set for the first capture
+    # and whenever the focus mode changes. Call `reset` to stop the camera.
+    streaming: bool = False
+    # Number of frame buffers while streaming
+    buffer_count: int = 4
+
+    # Focus mode and lens position the running camera is set to, None if it's stopped
+    _focused: tuple[bool, int | None] | None = field(init=False, repr=False, default=None)
+
     @property
     def camera(self) -> Picamera2:
         if self._camera is None:
             self._camera = Picamera2(camera_num=self.index)
-            match self.image_rotation:
-                case cv2.ROTATE_90_CLOCKWISE | cv2.ROTATE_90_COUNTERCLOCKWISE:
-                    res = self.get_resolution()[1], self.get_resolution()[0]
-                case _:
-                    res = self.get_resolution()
+            res = self.sensor_resolution()
             camera_config = self._camera.create_still_configuration(
-                main=dict(size=(*res,), format="RGB888"),
-                buffer_count=1,
+                main=dict(size=self.output_size(), format="RGB888"),
+                buffer_count=self.buffer_count if self.streaming else 1,
+                controls=self.camera_controls(),
             )
             self._camera.configure(camera_config)
+            if self.calibration:
+                # Loads or builds the undistortion tables now instead of on the first capture
+                self.calibration.maps(res)
         return self._camera
 
+    def sensor_resolution(self) -> tuple[int, int]:
+        """
+        The (width, height) of the frames before they are rotated.
+        """
+        width, height = self.get_resolution()
+        match self.image_rotation:
+            case cv2.ROTATE_90_CLOCKWISE | cv2.ROTATE_90_COUNTERCLOCKWISE:
+                return int(height), int(width)
+            case _:
+                return int(width), int(height)
+
+    def sensor_window(self, window: Window) -> Window:
+        """
+        Maps a window of the rotated image to the same pixels of the frame before the rotation.
+        """
+        x, y, width, height = window
+        sensor_width, sensor_height = self.sensor_resolution()
+        match self.image_rotation:
+            case cv2.ROTATE_90_CLOCKWISE:
+                return y, sensor_height - x - width, height, width
+            case cv2.ROTATE_90_COUNTERCLOCKWISE:
+                return sensor_width - y - height, x, height, width
+            case cv2.ROTATE_180:
+                return sensor_width - x - width, sensor_height - y - height, width, height
+            case _:
+                return window
+
+    def output_size(self) -> tuple[int, int]:
+        """
+        The (width, height) of the captured frames.
+        """
+        return self.sensor_resolution()
+
+    def camera_controls(self) -> dict:
+        """
+        Controls that are set whenever the camera starts.
+        """
+        return {}
+
     def rotate_image(self, image: np.ndarray) -> np.ndarray:
         return cv2.rotate(image, self.image_rotation)
 
-    def get_image(self) -> np.ndarray:
-        self.log.info("This is the thing that was called: %s", self.__class__.__name__)
-        self.camera.start(show_preview=False)
+    def set_focus(self):
         self.log.info("Setting controls")
         if not self.get_autofocus():
             self.log.info("Manual Focus mode enabled")
@@ -171,16 +326,65 @@ class PiCameraWrapper(CameraStrategy, HasLogger, ABC):
                 dict(AfMode=controls.AfModeEnum.Auto, AfRange=controls.AfRangeEnum.Macro)
             )
             self.log.info("Waiting for focus")
+            # The lens stays at the found position until the next cycle
             focused = self.camera.autofocus_cycle()
             self.log.info(f"Autofocus success: {focused}")
-        image = self.camera.capture_array("main")
+
+    def start_camera(self):
+        """
+        Starts the camera if needed and sets the focus, this is skipped while streaming with the
+        same focus settings.
+        """
+        focus = (self.get_autofocus(), self.focus.lens_position)
+        if self._focused == focus:
+            return
+        if self._focused is None:
+            self.camera.start(show_preview=False)
+        self.set_focus()
+        self._focused = focus
+
+    def stop_camera(self):
+        if self._focused is not None:
+            self.camera.stop()
+        self._focused = None
+
+    def capture(self) -> np.ndarray:
+        """
+        Captures a frame that was started after this call, older frames from the buffers might
+        show the position before the last move.
+        """
+        request = self.camera.capture_request(flush=True)
+        try:
+            return request.make_array("main")
+        finally:
+            request.release()
+
+    def latest_frame(self) -> np.ndarray:
+        """
+        The next completed frame of the running stream, undistorted and rotated. This blocks
+        until the frame is done, but unlike `capture` it may have started before this call.
+        Only for streaming, when the camera hasn't moved since the last capture.
+        """
+        if not self.streaming or self._focused is None:
+            raise ValueError("The camera isn't streaming, use `get_image`")
+        return self.process_image(self.camera.capture_array("main"))
+
+    def process_image(self, image: np.ndarray) -> np.ndarray:
         if self.calibration:
-            image = cv2.undistort(image, self.calibration.matrix, self.calibration.distortion_coefficients, None)
-        self.camera.stop()
+            image = self.calibration.undistort(image)
         # to_image(Path("results/", datetime.now().strftime("%Y-%m-%dT%H%M%S-pre-rot.jpg")), image)
         self.log.info("The Image rotation is: %s", self.image_rotation)
         if self.image_rotation is not None:
             image = self.rotate_image(image)
+        return image
+
+    def get_image(self) -> np.ndarray:
+        self.log.info("This is the thing that was called: %s", self.__class__.__name__)
+        self.start_camera()
+        image = self.capture()
+        if not self.streaming:
+            self.stop_camera()
+        image = self.process_image(image)
         to_image(Path("results/", datetime.now().strftime("%Y-%m-%dT%H%M%S.jpg")), image)
         return image
 
@@ -188,6 +392,7 @@ class PiCameraWrapper(CameraStrategy, HasLogger, ABC):
         if self._camera is not None:
             self._camera.stop()
         self._camera = None
+        self._focused = None
 
     def get_resolution(self) -> Point2D:
         match self.image_rotation:
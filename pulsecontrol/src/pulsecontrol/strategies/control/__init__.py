@@ -70,3 +70,61 @@ class ControlStrategy(Strategy):
         Get the maximum position for each axis.
         """
         raise NotImplementedError()
+
+
+@dataclass(kw_only=True)
+class AsyncControlStrategy(Strategy):
+    """
+    The awaitable counterpart of `ControlStrategy`, for code that runs in an event loop.
+    """
+
+    strategy: str = "control"
+
+    @abstractmethod
+    async def move_to(self, x: float, y: float):
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def move_rel(self, x: float, y: float, z: float):
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def add_offset(self, x: float, y: float, z: float):
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def home(self):
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def home_x(self):
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def home_y(self):
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def home_xy(self):
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def home_z(self, x: float, y: float):
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def get_homed(self) -> tuple[bool, bool, bool]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def get_limits(self) -> Point3D:
+        raise NotImplementedError()
+
+
+# The implementations depend on the base classes above
+from .moonraker import Moonraker  # noqa: E402
+from .moonraker_websocket import MoonrakerWebsocket  # noqa: E402
+
+# The order matters, dacite picks the first class that fits the config.
+# `async_moonraker.AsyncMoonraker` isn't part of it, the integrators use the synchronous api.
+MoonrakerStrategies = MoonrakerWebsocket | Moonraker
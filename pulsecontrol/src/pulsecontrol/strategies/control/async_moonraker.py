@@ -0,0 +1,193 @@
+import asyncio
+from dataclasses import dataclass, field
+from os import getenv
+
+import aiohttp
+
+from pulsecontrol.helpers import HasLogger, Point3D
+from pulsecontrol.helpers.latency import LatencyStats
+from pulsecontrol.strategies.control import AsyncControlStrategy
+from pulsecontrol.strategies.control.coordinate_frame import CoordinateFrame
+from pulsecontrol.strategies.control.moonraker import (
+    FRAME_QUERY,
+    MotionPlan,
+    check_response,
+    format_move,
+    format_offset,
+    move_script,
+    parse_homed,
+    parse_limits,
+    sync_frame,
+    track_script,
+)
+
+
+@dataclass(kw_only=True)
+class AsyncMoonraker(AsyncControlStrategy, HasLogger):
+    """
+    Asyncio version of `Moonraker`, all moves and queries are awaitable.
+    This allows an integrator to start the next move while it is still busy with other work,
+    e.g. classifying the results of the last attack:
+
+        move = asyncio.create_task(printer.move_to(x, y))
+        results = classify(attack.check_results())
+        await move
+
+    The aiohttp session is bound to the event loop of the first request.
+    This is only for use from code, the integrators can't select it in their config.
+    """
+
+    endpoint: str
+
+    # Same connection and position cache settings as for `Moonraker`
+    pool_size: int = 4
+    keep_alive: bool = True
+    connect_timeout: float = 5.0
+    read_timeout: float | None = None
+    cache_position: bool = True
+
+    latency: LatencyStats = field(default_factory=LatencyStats, init=False, repr=False)
+    frame: CoordinateFrame = field(default_factory=CoordinateFrame, init=False, repr=False)
+    _session: aiohttp.ClientSession | None = field(default=None, init=False, repr=False)
+    _loop: asyncio.AbstractEventLoop | None = field(default=None, init=False, repr=False)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            auth = None
+            if (user := getenv("MOONRAKER_USER")) is not None:
+                auth = aiohttp.BasicAuth(user, getenv("MOONRAKER_PASSWORD", ""))
+            self._loop = asyncio.get_running_loop()
+            self._session = aiohttp.ClientSession(
+                auth=auth,
+                connector=aiohttp.TCPConnector(
+                    limit=self.pool_size, force_close=not self.keep_alive, ssl=False
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    connect=self.connect_timeout, sock_read=self.read_timeout
+                ),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+
+    def reset(self):
+        self.latency.log_summary()
+        self.latency.clear()
+        self.frame.invalidate()
+        if self._session is None:
+            return
+        if self._loop.is_running():
+            try:
+                in_loop = asyncio.get_running_loop() is self._loop
+            except RuntimeError:
+                in_loop = False
+            if in_loop:
+                # Waiting here would block the loop that has to close the session
+                self._loop.create_task(self.close())
+                return
+            future = asyncio.run_coroutine_threadsafe(self.close(), self._loop)
+            try:
+                future.result(timeout=self.connect_timeout)
+            except TimeoutError:
+                future.cancel()
+                self.log.warning("Closing the session timed out")
+                self._session = None
+        elif not self._loop.is_closed():
+            self._loop.run_until_complete(self.close())
+        else:
+            self._session = None
+
+    async def post(self, path: str, **kwargs) -> dict:
+        with self.latency.track(path):
+            async with self.session.post(self.endpoint + path, **kwargs) as response:
+                return await response.json()
+
+    async def send_gcode(self, gcode: str):
+        with track_script(self.frame, gcode):
+            response = await self.post("/printer/gcode/script", params=dict(script=gcode))
+            return check_response(response, self.log)
+
+    async def query_printer(self, query_string: str) -> dict:
+        return await self.post("/printer/objects/query", params=query_string)
+
+    async def query_position(self) -> Point3D:
+        if not (self.cache_position and self.frame.synced):
+            await self.sync_frame()
+        return self.frame.get_position()
+
+    async def sync_frame(self):
+        sync_frame(self.frame, await self.query_printer(FRAME_QUERY))
+
+    async def add_offset(
+        self, x_offset: float = None, y_offset: float = None, z_offset: float = None
+    ):
+        position = await self.query_position()
+        await self.send_gcode(format_offset(position, x_offset, y_offset, z_offset))
+
+    async def wait_for_move_to_finish(self):
+        await self.send_gcode("M400")
+
+    async def probe(self) -> float:
+        current_position = await self.query_position()
+        await self.send_gcode("PROBE")
+        z = (await self.query_position())[-1]
+        await self.move_to(*current_position)
+        return z
+
+    async def move_to(
+        self,
+        x: float = None,
+        y: float = None,
+        z: float = None,
+        *,
+        speed: int | None = None,
+    ):
+        params = format_move(x, y, z, speed)
+        self.log.info("Moving to <%s>", params)
+        await self.send_gcode(move_script(params, absolute=True))
+        await self.wait_for_move_to_finish()
+
+    async def move_rel(
+        self,
+        x: float = None,
+        y: float = None,
+        z: float = None,
+        *,
+        speed: int | None = None,
+    ):
+        params = format_move(x, y, z, speed)
+        self.log.info("Moving by <%s>", params)
+        await self.send_gcode(move_script(params, absolute=False))
+        await self.wait_for_move_to_finish()
+
+    def plan(self) -> MotionPlan:
+        """
+        Starts a motion plan, use it with `async with`.
+        """
+        return MotionPlan(printer=self)
+
+    async def home(self):
+        await self.send_gcode("G28")
+
+    async def home_x(self):
+        await self.send_gcode("G28 X")
+
+    async def home_y(self):
+        await self.send_gcode("G28 Y")
+
+    async def home_xy(self):
+        await self.send_gcode("G28 X Y")
+
+    async def home_z(self, x: float, y: float, speed: int | None = None):
+        await self.move_to(x, y, speed=speed)
+        await self.send_gcode("G28 Z")
+
+    async def get_homed(self) -> tuple[bool, bool, bool]:
+        return parse_homed(await self.query_printer("toolhead=homed_axes"))
+
+    async def get_limits(self) -> Point3D:
+        return parse_limits(await self.query_printer("toolhead=axis_maximum"))
@@ -0,0 +1,115 @@
+from dataclasses import dataclass, field
+
+from pulsecontrol.helpers import Point3D
+
+AXES = "XYZ"
+
+# Commands that don't change any position, offset or mode
+PASSIVE_COMMANDS = {"M400", "G4", "SET_LED"}
+
+
+def unknown() -> list[float | None]:
+    return [None, None, None]
+
+
+@dataclass
+class CoordinateFrame:
+    """
+    Client side copy of the klipper coordinate state, updated from every gcode script that was sent.
+    This way the position is known without asking the printer.
+
+    `position` is the commanded toolhead position, the same value as `toolhead.position`.
+    The gcode coordinates are shifted by the G92 offsets: gcode position = position - base.
+    Values that can't be derived from the gcode (e.g. after homing or probing) are `None`,
+    those require a resync from the printer.
+    """
+
+    position: list[float | None] = field(default_factory=unknown)
+    base: list[float | None] = field(default_factory=unknown)
+    # G90 (True) or G91 (False)
+    absolute: bool | None = None
+
+    @property
+    def synced(self) -> bool:
+        return self.absolute is not None and None not in self.position and None not in self.base
+
+    def invalidate(self):
+        self.position = unknown()
+        self.base = unknown()
+        self.absolute = None
+
+    def sync(
+        self,
+        toolhead_position: list[float],
+        gcode_move_position: list[float],
+        gcode_position: list[float],
+        absolute: bool,
+    ):
+        """
+        Overwrites the state with the `toolhead` and `gcode_move` status of the printer.
+        """
+        self.position = list(toolhead_position[:3])
+        self.base = [p - g for p, g in zip(gcode_move_position[:3], gcode_position[:3])]
+        self.absolute = absolute
+
+    def get_position(self) -> Point3D:
+        x, y, z = self.position
+        return x, y, z
+
+    @staticmethod
+    def parse_axes(words: list[str]) -> dict[int, float | None]:
+        """
+        Maps the axis index to the value of the parameter, e.g. `X1.5` -> {0: 1.5}.
+        Parameters without value (`G28 X`) map to None, other parameters are ignored.
+        """
+        axes = {}
+        for word in words:
+            axis = AXES.find(word[0].upper())
+            if axis >= 0:
+                axes[axis] = float(word[1:]) if word[1:] else None
+        return axes
+
+    def apply(self, script: str):
+        """
+        Updates the state with the effects of a gcode script that the printer accepted.
+        Unknown commands invalidate everything, they might have moved the toolhead.
+        """
+        for line in script.splitlines():
+            words = line.split()
+            if not words:
+                continue
+            command = words[0].upper()
+            match command:
+                case "G90":
+                    self.absolute = True
+                case "G91":
+                    self.absolute = False
+                case "G0" | "G1":
+                    self._move(self.parse_axes(words[1:]))
+                case "G92":
+                    for axis, value in self.parse_axes(words[1:]).items():
+                        if self.position[axis] is None or value is None:
+                            self.base[axis] = None
+                        else:
+                            self.base[axis] = self.position[axis] - value
+                case "G28":
+                    # Homing resets the offsets of the homed axes to the homing origin
+                    for axis in self.parse_axes(words[1:]) or range(len(AXES)):
+                        self.position[axis] = None
+                        self.base[axis] = None
+                case "PROBE":
+                    self.position[2] = None
+                case _ if command in PASSIVE_COMMANDS:
+                    pass
+                case _:
+                    self.invalidate()
+
+    def _move(self, axes: dict[int, float | None]):
+        for axis, value in axes.items():
+            if value is None or self.absolute is None:
+                self.position[axis] = None
+            elif self.absolute:
+                base = self.base[axis]
+                self.position[axis] = None if base is None else value + base
+            elif self.position[axis] is not None:
+                self.position[axis] += value
@@ -1,15 +1,124 @@
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from logging import Logger
 from os import getenv
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from pulsecontrol.helpers import HasLogger, Point3D
+from pulsecontrol.helpers.latency import LatencyStats
 from pulsecontrol.strategies.control import ControlStrategy
+from pulsecontrol.strategies.control.coordinate_frame import CoordinateFrame
 from pulsecontrol.strategies.movement import MovementError
 from requests.auth import HTTPBasicAuth
 from urllib3.exceptions import InsecureRequestWarning
 
 
+def format_move(
+        x: float | None = None,
+        y: float | None = None,
+        z: float | None = None,
+        speed: int | None = None,
+) -> str:
+    """
+    Formats the parameters of a G1 command, axes that are `None` are left out.
+    """
+    params = ""
+    if x is not None:
+        params += f" X{x:.4f}"
+    if y is not None:
+        params += f" Y{y:.4f}"
+    if z is not None:
+        params += f" Z{z:.4f}"
+    if speed is not None:
+        params += f" F{speed}"
+    return params
+
+
+def format_offset(
+        position: Point3D,
+        x_offset: float | None = None,
+        y_offset: float | None = None,
+        z_offset: float | None = None,
+) -> str:
+    """
+    Formats a G92 command that shifts the current gcode position by the offsets.
+    """
+    base = "G92"
+    for axis, current, offset in zip("XYZ", position, (x_offset, y_offset, z_offset)):
+        if offset is not None:
+            base += f" {axis}{current + offset}"
+    return base
+
+
+def move_script(params: str, absolute: bool) -> str:
+    """
+    A G1 move with the parameters from `format_move`, in absolute (G90) or relative (G91) mode.
+    """
+    return ("G90" if absolute else "G91") + "\nG1" + params
+
+
+# The status fields `sync_frame` reads
+FRAME_QUERY = "toolhead=position&gcode_move=position,gcode_position,absolute_coordinates"
+
+
+def sync_frame(frame: CoordinateFrame, response: dict):
+    """
+    Updates the coordinate frame with the response to a `FRAME_QUERY`.
+    """
+    status = response["result"]["status"]
+    frame.sync(
+        status["toolhead"]["position"],
+        status["gcode_move"]["position"],
+        status["gcode_move"]["gcode_position"],
+        status["gcode_move"]["absolute_coordinates"],
+    )
+
+
+@contextmanager
+def track_script(frame: CoordinateFrame, gcode: str):
+    """
+    Applies the gcode script to the coordinate frame if the block sending it succeeds.
+    On an error the script might have been executed partially, so the frame is invalidated.
+    """
+    try:
+        yield
+    except Exception:
+        frame.invalidate()
+        raise
+    frame.apply(gcode)
+
+
+def parse_homed(response: dict) -> tuple[bool, bool, bool]:
+    """
+    The homed axes from the response to a `toolhead=homed_axes` query.
+    """
+    axes = response["result"]["status"]["toolhead"]["homed_axes"]
+    return "x" in axes, "y" in axes, "z" in axes
+
+
+def parse_limits(response: dict) -> Point3D:
+    """
+    The maximum x, y and z from the response to a `toolhead=axis_maximum` query.
+    """
+    return response["result"]["status"]["toolhead"]["axis_maximum"][:-1]
+
+
+def check_response(response: dict, log: Logger) -> bool:
+    """
+    Checks the response to a gcode script, raises a `MovementError` if klipper rejected it.
+    """
+    match response:
+        case {"result": "ok"}:
+            return True
+        case {"error": {"code": code, "message": message}} if code != 200:
+            raise MovementError("Movement Error: %s" % message)
+        case d:
+            log.error("UNKNOWN format: %s", d)
+            raise Exception()
+
+
 @dataclass(kw_only=True)
 class Basic:
     user: str
@@ -26,6 +135,25 @@ class Moonraker(ControlStrategy, HasLogger):
     endpoint: str
     basic_auth: HTTPBasicAuth = None
 
+    # Number of pooled connections to the printer. All requests are sequential, so a few are enough.
+    pool_size: int = 4
+    # Reuse connections between requests, disabling this opens a new connection for every request.
+    keep_alive: bool = True
+    # Timeouts in seconds. Gcode scripts only return once the printer executed them,
+    # so the read timeout has to be longer than the slowest command (e.g. homing). None waits forever.
+    connect_timeout: float = 5.0
+    read_timeout: float | None = None
+
+    # Track the position locally instead of querying it from the printer.
+    # Disable this if something else moves the printer at the same time.
+    cache_position: bool = True
+
+    # Request latencies, grouped by api endpoint
+    latency: LatencyStats = field(default_factory=LatencyStats, init=False, repr=False)
+    # Position, offsets and mode after the last gcode script
+    frame: CoordinateFrame = field(default_factory=CoordinateFrame, init=False, repr=False)
+    _session: requests.Session | None = field(default=None, init=False, repr=False)
+
     def __post_init__(self):
         requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
         self.basic_auth = HTTPBasicAuth(
@@ -33,41 +161,65 @@ class Moonraker(ControlStrategy, HasLogger):
             password=getenv('MOONRAKER_PASSWORD', None)
         )
 
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+            self._session.auth = self.basic_auth
+            self._session.verify = False
+            if not self.keep_alive:
+                self._session.headers["Connection"] = "close"
+        return self._session
+
     def reset(self):
-        pass
+        self.latency.log_summary()
+        self.latency.clear()
+        self.frame.invalidate()
+        if self._session is not None:
+            self._session.close()
+        self._session = None
+
+    def post(self, path: str, **kwargs) -> dict:
+        """
+        Sends a request over the pooled session and records its latency.
+
+        Args:
+            path: The api path, appended to the endpoint.
+            **kwargs: Passed on to `requests.Session.post`.
+        """
+        with self.latency.track(path):
+            return self.session.post(
+                self.endpoint + path,
+                timeout=(self.connect_timeout, self.read_timeout),
+                **kwargs,
+            ).json()
 
     def query_position(self) -> Point3D:
-        x, y, z, _ = self.query_printer("toolhead=position")["result"]["status"]["toolhead"][
-            "position"
-        ]
-        return x, y, z
+        if not (self.cache_position and self.frame.synced):
+            self.sync_frame()
+        return self.frame.get_position()
 
-    def add_offset(self, x_offset: float = None, y_offset: float = None, z_offset: float = None):
-        x, y, z = self.query_position()
-        base = "G92"
-        if x_offset is not None:
-            base += f" X{x + x_offset}"
-        if y_offset is not None:
-            base += f" Y{y + y_offset}"
-        if z_offset is not None:
-            base += f" Z{z + z_offset}"
+    def sync_frame(self):
+        """
+        Updates the coordinate frame with the position, offsets and mode of the printer.
+        """
+        sync_frame(self.frame, self.query_printer(FRAME_QUERY))
 
-        self.send_gcode(base)
+    def add_offset(self, x_offset: float = None, y_offset: float = None, z_offset: float = None):
+        self.send_gcode(format_offset(self.query_position(), x_offset, y_offset, z_offset))
 
     def wait_for_move_to_finish(self):
         self.send_gcode("M400")
 
     def send_gcode(self, gcode: str):
-        response = requests.post(self.endpoint + "/printer/gcode/script?script=%s" % gcode, auth=self.basic_auth,
-                                 verify=False).json()
-        match response:
-            case {"result": "ok"}:
-                return True
-            case {"error": {"code": code, "message": message}} if code != 200:
-                raise MovementError("Movement Error: %s" % message)
-            case d:
-                self.log.error("UNKNOWN format: %s", d)
-                raise Exception()
+        with track_script(self.frame, gcode):
+            return check_response(self.run_script(gcode), self.log)
+
+    def run_script(self, gcode: str) -> dict:
+        return self.post("/printer/gcode/script", params=dict(script=gcode))
 
     def probe(self) -> float:
         current_position = self.query_position()
@@ -77,7 +229,7 @@ class Moonraker(ControlStrategy, HasLogger):
         return z
 
     def query_printer(self, query_string: str) -> dict:
-        return requests.post(self.endpoint + "/printer/objects/query?%s" % query_string, auth=self.basic_auth, verify=False).json()
+        return self.post("/printer/objects/query", params=query_string)
 
     def move_to(
             self,
@@ -87,19 +239,9 @@ class Moonraker(ControlStrategy, HasLogger):
             *,
             speed: int | None = None,
     ):
-        base = "G90\nG1"
-        if x is not None:
-            base += f" X{x:.4f}"
-        if y is not None:
-            base += f" Y{y:.4f}"
-        if z is not None:
-            base += f" Z{z:.4f}"
-        if speed is not None:
-            base += f" F{speed}"
-
-        self.log.info("Moving to <%s>", base[6:])
-
-        self.send_gcode(base)
+        params = format_move(x, y, z, speed)
+        self.log.info("Moving to <%s>", params)
+        self.send_gcode(move_script(params, absolute=True))
         self.wait_for_move_to_finish()
 
     def move_rel(
@@ -110,21 +252,18 @@ class Moonraker(ControlStrategy, HasLogger):
             *,
             speed: int | None = None,
     ):
-        base = "G91\nG1"
-        if x is not None:
-            base += f" X{x:.4f}"
-        if y is not None:
-            base += f" Y{y:.4f}"
-        if z is not None:
-            base += f" Z{z:.4f}"
-        if speed is not None:
-            base += f" F{speed}"
-
-        self.log.info("Moving by <%s>", base[6:])
-
-        self.send_gcode(base)
+        params = format_move(x, y, z, speed)
+        self.log.info("Moving by <%s>", params)
+        self.send_gcode(move_script(params, absolute=False))
         self.wait_for_move_to_finish()
 
+    def plan(self) -> "MotionPlan":
+        """
+        Starts a motion plan, which sends several commands in a single request.
+        Use it as a context manager to execute the plan when leaving the block.
+        """
+        return MotionPlan(printer=self)
+
     def home(self):
         self.send_gcode("G28")
 
@@ -142,12 +281,87 @@ class Moonraker(ControlStrategy, HasLogger):
         self.send_gcode("G28 Z")
 
     def get_homed(self) -> tuple[bool, bool, bool]:
-        axes = self.query_printer(query_string="toolhead=homed_axes")["result"]["status"]["toolhead"]["homed_axes"]
-        x = 'x' in axes
-        y = 'y' in axes
-        z = 'z' in axes
-        return x, y, z
+        return parse_homed(self.query_printer(query_string="toolhead=homed_axes"))
 
     def get_limits(self) -> Point3D:
-        return self.query_printer(query_string="toolhead=axis_maximum")["result"]["status"]["toolhead"]["axis_maximum"][
-               :-1]
+        return parse_limits(self.query_printer(query_string="toolhead=axis_maximum"))
+
+
+@dataclass(kw_only=True)
+class MotionPlan(HasLogger):
+    """
+    Collects moves, LED changes and dwells and sends them to the printer as one gcode script.
+    The script ends with a single M400, so the request returns once every move is done.
+
+    Usage:
+        with printer.plan() as plan:
+            plan.move_to(z=60).move_to(100, 100, speed=3000)
+            plan.set_led("chip_led", 0.1)
+
+    With an `AsyncMoonraker` use `async with` instead.
+    """
+
+    printer: ControlStrategy
+    commands: list[str] = field(default_factory=list)
+
+    def move_to(
+            self,
+            x: float = None,
+            y: float = None,
+            z: float = None,
+            *,
+            speed: int | None = None,
+    ) -> "MotionPlan":
+        params = format_move(x, y, z, speed)
+        self.log.info("Moving to <%s>", params)
+        self.commands.append(move_script(params, absolute=True))
+        return self
+
+    def move_rel(
+            self,
+            x: float = None,
+            y: float = None,
+            z: float = None,
+            *,
+            speed: int | None = None,
+    ) -> "MotionPlan":
+        params = format_move(x, y, z, speed)
+        self.log.info("Moving by <%s>", params)
+        self.commands.append(move_script(params, absolute=False))
+        return self
+
+    def set_led(self, led: str, white: float) -> "MotionPlan":
+        self.commands.append(f"SET_LED LED={led} WHITE={white}")
+        return self
+
+    def dwell(self, seconds: float) -> "MotionPlan":
+        self.commands.append(f"G4 P{seconds * 1000:.0f}")
+        return self
+
+    def send_gcode(self, gcode: str) -> "MotionPlan":
+        self.commands.append(gcode)
+        return self
+
+    def execute(self):
+        """
+        Sends the collected commands. For an `AsyncMoonraker` this returns the coroutine to await.
+        """
+        if not self.commands:
+            return
+        script = "\n".join((*self.commands, "M400"))
+        self.commands.clear()
+        return self.printer.send_gcode(script)
+
+    def __enter__(self) -> "MotionPlan":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.execute()
+
+    async def __aenter__(self) -> "MotionPlan":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None and self.commands:
+            await self.execute()
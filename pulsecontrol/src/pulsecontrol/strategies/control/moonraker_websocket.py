@@ -0,0 +1,205 @@
+import asyncio
+import json
+from dataclasses import dataclass, field
+from itertools import count
+from threading import Condition, Thread
+from typing import Any, Callable, Iterator
+
+import aiohttp
+
+from pulsecontrol.helpers import Point3D
+from pulsecontrol.strategies.control.moonraker import Moonraker
+
+# Printer objects (and their fields) that moonraker pushes to us
+SUBSCRIPTION = {
+    "toolhead": ["position", "homed_axes", "axis_maximum"],
+    "gcode_move": ["gcode_position", "homing_origin", "absolute_coordinates"],
+    "idle_timeout": ["state"],
+}
+
+
+@dataclass(kw_only=True)
+class MoonrakerWebsocket(Moonraker):
+    """
+    Connects to the moonraker websocket json-rpc api.
+    The connection stays open for the whole run and moonraker pushes every change of the subscribed
+    printer objects, so position, homed axes and limits are read from a local mirror.
+
+    The gcode responses arrive before the matching status update, so the first read after a gcode
+    command queries the objects once over the open websocket. All other reads cost nothing.
+    """
+
+    # This flag is required to let dacite know which printer connection to use
+    websocket: bool
+
+    # Wait for klipper to report `idle_timeout.state` as no longer printing, instead of an M400
+    wait_for_idle: bool = False
+    # Time a move has to show up as `Printing`, otherwise it's considered finished already.
+    # Moonraker pushes status updates every 250ms.
+    idle_grace: float = 0.5
+
+    # Local mirror of the subscribed printer objects
+    status: dict[str, dict[str, Any]] = field(default_factory=dict, init=False, repr=False)
+
+    _stale: bool = field(default=True, init=False, repr=False)
+    _status_changed: Condition = field(default_factory=Condition, init=False, repr=False)
+    _loop: asyncio.AbstractEventLoop | None = field(default=None, init=False, repr=False)
+    _thread: Thread | None = field(default=None, init=False, repr=False)
+    _client: aiohttp.ClientSession | None = field(default=None, init=False, repr=False)
+    _ws: aiohttp.ClientWebSocketResponse | None = field(default=None, init=False, repr=False)
+    _pending: dict[int, asyncio.Future] = field(default_factory=dict, init=False, repr=False)
+    _ids: Iterator[int] = field(default_factory=count, init=False, repr=False)
+
+    @property
+    def websocket_url(self) -> str:
+        return self.endpoint.replace("http", "ws", 1) + "/websocket"
+
+    def connect(self):
+        """
+        Opens the websocket and subscribes to the printer objects.
+        Does nothing if it's already connected.
+        The websocket is handled by an event loop in a separate thread.
+        """
+        if self._thread is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = Thread(
+            target=self._loop.run_forever, name="moonraker-websocket", daemon=True
+        )
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._connect(), self._loop).result(self.connect_timeout)
+
+        response = self.rpc("printer.objects.subscribe", objects=SUBSCRIPTION)
+        self.update_status(response["result"]["status"])
+        self._stale = False
+        self.log.info("Subscribed to printer objects: %s", ", ".join(SUBSCRIPTION))
+
+    def reset(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._close(), self._loop).result(self.connect_timeout)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+        self._loop = None
+        self._thread = None
+        self.status.clear()
+        self._stale = True
+        super().reset()
+
+    async def _connect(self):
+        auth = None
+        if self.basic_auth.username is not None:
+            auth = aiohttp.BasicAuth(self.basic_auth.username, self.basic_auth.password or "")
+        self._client = aiohttp.ClientSession(auth=auth)
+        self._ws = await self._client.ws_connect(self.websocket_url, ssl=False)
+        self._loop.create_task(self._receive())
+
+    async def _close(self):
+        if self._ws is not None:
+            await self._ws.close()
+        if self._client is not None:
+            await self._client.close()
+        self._ws = None
+        self._client = None
+
+    async def _receive(self):
+        async for message in self._ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                continue
+            data = json.loads(message.data)
+            match data:
+                case {"id": request_id} if request_id in self._pending:
+                    self._pending[request_id].set_result(data)
+                case {"method": "notify_status_update", "params": [status, *_]}:
+                    self.update_status(status)
+                case {"method": "notify_klippy_disconnected" | "notify_klippy_shutdown" as method}:
+                    self.log.error("Klipper is no longer ready: %s", method)
+
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Websocket to moonraker closed"))
+
+    async def _rpc(self, method: str, params: dict) -> dict:
+        request_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        try:
+            await self._ws.send_json(
+                dict(jsonrpc="2.0", method=method, params=params, id=request_id)
+            )
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    def rpc(self, method: str, **params) -> dict:
+        """
+        Calls a json-rpc method and blocks until the response arrives.
+
+        Returns:
+            The complete response, containing either `result` or `error`.
+        """
+        self.connect()
+        with self.latency.track(method):
+            return asyncio.run_coroutine_threadsafe(self._rpc(method, params), self._loop).result(
+                self.read_timeout
+            )
+
+    def update_status(self, status: dict[str, dict[str, Any]]):
+        """
+        Merges a (partial) status update into the local mirror.
+        """
+        with self._status_changed:
+            for name, values in status.items():
+                self.status.setdefault(name, {}).update(values)
+            self._status_changed.notify_all()
+
+    def wait_for_status(
+        self, name: str, key: str, predicate: Callable[[Any], bool], timeout: float | None = None
+    ) -> bool:
+        """
+        Waits until the mirrored value fulfills the predicate.
+
+        Returns:
+            False if the timeout ran out first.
+        """
+        with self._status_changed:
+            return self._status_changed.wait_for(
+                lambda: predicate(self.status.get(name, {}).get(key)), timeout
+            )
+
+    def get_status(self, name: str, key: str) -> Any:
+        self.connect()
+        if self._stale:
+            response = self.rpc("printer.objects.query", objects=SUBSCRIPTION)
+            self.update_status(response["result"]["status"])
+            self._stale = False
+        return self.status[name][key]
+
+    def run_script(self, gcode: str) -> dict:
+        self._stale = True
+        return self.rpc("printer.gcode.script", script=gcode)
+
+    def wait_for_move_to_finish(self):
+        if not self.wait_for_idle:
+            return super().wait_for_move_to_finish()
+        # Very short moves may be done before moonraker reports them
+        self.wait_for_status("idle_timeout", "state", lambda s: s == "Printing", self.idle_grace)
+        self.wait_for_status("idle_timeout", "state", lambda s: s != "Printing", self.read_timeout)
+
+    def query_printer(self, query_string: str) -> dict:
+        objects = {}
+        for query in query_string.split("&"):
+            name, _, attributes = query.partition("=")
+            objects[name] = attributes.split(",") if attributes else None
+        return self.rpc("printer.objects.query", objects=objects)
+
+    def query_position(self) -> Point3D:
+        x, y, z, _ = self.get_status("toolhead", "position")
+        return x, y, z
+
+    def get_homed(self) -> tuple[bool, bool, bool]:
+        axes = self.get_status("toolhead", "homed_axes")
+        return "x" in axes, "y" in axes, "z" in axes
+
+    def get_limits(self) -> Point3D:
+        return self.get_status("toolhead", "axis_maximum")[:-1]
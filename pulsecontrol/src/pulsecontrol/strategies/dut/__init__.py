@@ -24,7 +24,7 @@ class DutStrategy(Strategy, Generic[Attack, Result]):
         raise NotImplementedError()
 
     @abstractmethod
-    def check_results(self) -> list[Attack[Result]]:
+    def check_results(self) -> list[Attack]:
         """
         Checks communication with the DUT or another device connected to the DUT, and classifies the response as
         """
@@ -37,6 +37,15 @@ class DutStrategy(Strategy, Generic[Attack, Result]):
         """
         raise NotImplementedError()
 
+    def get_state(self) -> dict:
+        """
+        Everything needed to continue the attack after a restart, must be json serializable.
+        """
+        return {}
+
+    def set_state(self, state: dict):
+        pass
+
     @abstractmethod
     def start(self):
         """
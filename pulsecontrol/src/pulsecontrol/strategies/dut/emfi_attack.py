@@ -3,7 +3,7 @@ from abc import ABC
 from dataclasses import dataclass, asdict, field
 from typing import TypeVar, Generic
 
-from pulsecontrol.helpers import HasLogger
+from pulsecontrol.helpers import HasLogger, events
 from pulsecontrol.strategies.dut import DutStrategy
 from pulsecontrol.strategies.tools.chip_whisperer import Whisperer
 
@@ -16,6 +16,8 @@ class Attack(Generic[Effect]):
     offset: int
     voltage: int
     repeat: int
+    # Unix time of the attempt
+    timestamp: float = field(default_factory=time.time)
 
 
 @dataclass(kw_only=True)
@@ -38,6 +40,13 @@ class EmfiAttack(DutStrategy[Attack, Effect], HasLogger, ABC):
         self.whisperer.update()
         self._counter = 0
 
+    def get_state(self) -> dict:
+        return dict(counter=self._counter, whisperer=self.whisperer.get_state())
+
+    def set_state(self, state: dict):
+        self._counter = state["counter"]
+        self.whisperer.set_state(state["whisperer"])
+
     def reset(self):
         self.log.info("Resetting Whisperer")
         super().reset()
@@ -51,6 +60,7 @@ class EmfiAttack(DutStrategy[Attack, Effect], HasLogger, ABC):
         self._counter += 1
 
         self.attacks = []
+        events.emit(events.Attack(sweep=self._counter))
         # If board has been hold in reset, turn it on now
         time.sleep(2)
         # to get notable offset it must be around 24000000 or so
@@ -71,3 +81,12 @@ class EmfiAttack(DutStrategy[Attack, Effect], HasLogger, ABC):
             self.log.info("Success: %s", asdict(result))
             end_time = time.time()
             self.log.info(f"Experiment Duration: {end_time - start_time}")
+            events.emit(
+                events.Effect(
+                    effect=effect,
+                    offset=offset,
+                    voltage=voltage,
+                    repeat=repeat,
+                    duration=end_time - start_time,
+                )
+            )
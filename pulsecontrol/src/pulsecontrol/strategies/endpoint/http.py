@@ -1,11 +1,16 @@
 import json
 import logging
 import threading
+from dataclasses import asdict
+from pathlib import Path
 from threading import Thread
 
 from flask import Flask, Response, request, abort
 
 from pulsecontrol.helpers.config_loader import ConfigLoader, load_integrator
+from pulsecontrol.helpers.catalog import Catalog
+from pulsecontrol.helpers.estimate import CampaignEstimator, PhaseTimings
+from pulsecontrol.helpers.results import find_results
 from pulsecontrol.setup_logging import setup_logging
 from pulsecontrol.strategies.integrator import Integrator
 
@@ -34,9 +39,58 @@ def initialize_strategy(strategy):
     data = request.get_json()
     logger.info("Got data:\n%s", json.dumps(data, indent=2))
     integrator = load_integrator(integrator=strategy, config=data)
+    integrator.save_config(data)
     return Response("Ok")
 
 
+@app.post("/estimate")
+def estimate():
+    """
+    Predicts the duration of an attack campaign, takes the same config as the advanced attacker.
+    The phase timings are calibrated with the logs and results of previous campaigns, the axis
+    limits are taken from the printer in the config.
+    """
+    result_files = filter(None, map(find_results, Path("results").glob("*/")))
+    timings = PhaseTimings().calibrate(
+        log_files=Path("logs").glob("*.log"), result_files=result_files
+    )
+    estimator = CampaignEstimator(timings=timings)
+    # The homing and travel times depend on the size of the printer
+    estimator.query_limits(request.get_json())
+    positions = request.args.get("positions", type=int)
+    prediction = estimator.estimate(
+        request.get_json(),
+        passes=request.args.get("passes", 1, type=int),
+        positions=positions,
+        skip_init=request.args.get("skip_init") is not None,
+    )
+    return prediction.to_dict()
+
+
+@app.get("/catalog")
+def catalog():
+    """
+    Lists the finished campaigns, filtered by `target`, `movement`, `probe_type`, `min_attempts`
+    and the ranges `voltage` and `offset` given as `low,high`.
+    """
+
+    def bounds(name: str) -> tuple[int, int] | None:
+        value = request.args.get(name)
+        return tuple(int(v) for v in value.split(",")) if value else None
+
+    with Catalog() as campaigns:
+        campaigns.scan()
+        entries = campaigns.list(
+            target=request.args.get("target"),
+            movement=request.args.get("movement"),
+            probe_type=request.args.get("probe_type"),
+            voltage=bounds("voltage"),
+            offset=bounds("offset"),
+            min_attempts=request.args.get("min_attempts", 0, type=int),
+        )
+    return [asdict(entry) for entry in entries]
+
+
 @app.route("/continue")
 def continue_experiment():
     """
@@ -85,6 +139,29 @@ def start():
     return Response("Ok")
 
 
+@app.route("/resume")
+def resume():
+    """
+    Continues the last campaign from its checkpoint, load the integrator with the same config first.
+    Use the `directory` parameter to choose a different campaign in `results/`.
+    """
+    global experiment
+    if integrator is None:
+        logger.error("No integrator loaded. Load it with the config of the campaign first.")
+        return abort(400)
+    if experiment is not None and experiment.is_alive():
+        logger.error("An experiment is still running, call /reset first")
+        return abort(400)
+
+    directory = request.args.get("directory")
+    experiment = threading.Thread(
+        target=integrator.resume,
+        kwargs={"directory": Path(directory) if directory else None},
+    )
+    experiment.start()
+    return Response("Ok")
+
+
 @app.route("/reset")
 def reset():
     global config_loader
@@ -53,6 +53,12 @@ class Voltage(HasLogger):
         chip_shouter.voltage = self.current
         self.log.info("Chipshouter set Voltage to: %s" % chip_shouter.voltage)
 
+    def get_state(self) -> dict:
+        return dict(current=self.current)
+
+    def set_state(self, state: dict):
+        self.current = state["current"]
+
 
 @dataclass(kw_only=True)
 class ChipShouter(InjectorStrategy, HasLogger):
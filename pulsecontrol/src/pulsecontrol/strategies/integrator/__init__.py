@@ -1,7 +1,7 @@
 from abc import abstractmethod
 from dataclasses import dataclass
 
-from pulsecontrol.helpers import HasLogger
+from pulsecontrol.helpers import HasLogger, events
 from pulsecontrol.strategies import Strategy
 
 
@@ -17,9 +17,15 @@ class Integrator(Strategy, HasLogger):
 
     def reset(self):
         self.log.info("Called reset on the integrator")
+        events.emit(events.Reset(source=type(self).__name__))
         self._stop_request = True
         super().reset()
 
     @abstractmethod
     def continue_experiment(self):
         raise NotImplementedError()
+
+    def save_config(self, config: dict):
+        """
+        Called with the config the integrator was loaded with, to keep it with the results.
+        """
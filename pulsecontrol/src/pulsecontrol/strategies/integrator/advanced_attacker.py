@@ -1,26 +1,32 @@
 import json
-from dataclasses import field, dataclass, asdict
+from dataclasses import field, dataclass
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from time import sleep
+from time import monotonic, sleep
 
-import cv2
 import numpy as np
 from retry import retry
-from pulsecontrol.helpers import Rectangle, Point2D
+from pulsecontrol.helpers import Rectangle, Point2D, events
 from pulsecontrol.strategies.camera import CameraStrategies
 from pulsecontrol.strategies.camera.probe_camera import ProbeCamera
-from pulsecontrol.strategies.control.moonraker import Moonraker
+from pulsecontrol.strategies.control import MoonrakerStrategies
 from pulsecontrol.strategies.dut.bam_attack import BamAttack
 from pulsecontrol.strategies.dut.esp32 import EspAttack
 from pulsecontrol.strategies.integrator import Integrator
 from pulsecontrol.strategies.movement import MovementError
+from pulsecontrol.strategies.movement.adaptive import Adaptive
 from pulsecontrol.strategies.movement.fix_point import FixPoint
 from pulsecontrol.strategies.movement.gaussian import Gaussian
 from pulsecontrol.strategies.movement.grid import Grid
 from pulsecontrol.strategies.movement.http_wrapper import HttpWrapper as MovementWrapper
-from pulsecontrol.helpers.results import AttackResults
+from pulsecontrol.strategies.movement.low_discrepancy import LowDiscrepancy
+from pulsecontrol.strategies.movement.ordered import Ordered
+from pulsecontrol.strategies.movement.refine import Refine
+from pulsecontrol.helpers.catalog import CONFIG_NAME, Catalog
+from pulsecontrol.helpers.checkpoint import Checkpoint, latest_checkpoint
+from pulsecontrol.helpers.chip_frame import ChipFrame
+from pulsecontrol.helpers.results import AttackResults, ResultWriter
 from pulsecontrol.strategies.injector.chip_shouter import OverheatException
 
 
@@ -56,10 +62,12 @@ class AdvancedAttacker(Integrator):
     pcb_camera: CameraStrategies
 
     # Printer Control
-    printer: Moonraker
+    printer: MoonrakerStrategies
 
-    # Movement
-    movement_strategy: FixPoint | Gaussian | Grid | MovementWrapper
+    # Movement, wrap a strategy in `Ordered` to shorten the travel between the points
+    movement_strategy: (
+        Adaptive | Refine | Ordered | FixPoint | Gaussian | Grid | LowDiscrepancy | MovementWrapper
+    )
 
     # Attack implementation and interaction with the DUT
     attack: EspAttack | BamAttack
@@ -77,12 +85,26 @@ class AdvancedAttacker(Integrator):
     # Absolute height of chip surface
     chip_surface_height: float | None = None
 
+    # Seconds between checkpoints, one is always written when the attack ends
+    checkpoint_interval: float = 60.0
+    # Every result is appended to the output directory as soon as it's available
+    results: ResultWriter = field(default_factory=ResultWriter)
+    # Every finished campaign is registered here
+    catalog_path: Path = Path("results", "catalog.sqlite")
+
     _attack_date: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%dT%H%M%S"))
     _out_path: Path = field(default_factory=Path)
 
     state: SetupState = SetupState.NOT_READY
     temp_store: TmpStore = field(default_factory=TmpStore)
 
+    _last_checkpoint: float = field(default=0.0, repr=False)
+    # Set while the attack loop runs, a `reset` from another thread then only stops the loop
+    _running: bool = field(default=False, repr=False)
+    # Built from `chip_position`, rebuilt when it's replaced
+    _chip_frame: ChipFrame | None = field(default=None, repr=False)
+    _chip_frame_source: tuple | None = field(default=None, repr=False)
+
     def __post_init__(self):
         self._out_path = Path("results", self._attack_date)
         self._out_path.mkdir(parents=True, exist_ok=False)
@@ -151,19 +173,35 @@ class AdvancedAttacker(Integrator):
             "====================================="
         )
 
-    def continue_experiment(self):
-        # move just over the chip
-        self.printer.move_to(z=(self.chip_surface_height + self.glitch_height))
-        successes: list[AttackResults] = []
-        # Test Loop
+    def continue_experiment(self, checkpoint: Checkpoint | None = None):
+        """
+        Runs the attack loop until it's stopped.
+
+        Args:
+            checkpoint: Continues an earlier campaign, see `resume`.
+        """
+        self._running = True
         at_position = 0
         first_loop = True
+        # The interface has to move on the first call
+        next_chip_coordinates = Point2D(0.0, 0.0)
+        world_coords = (0, 0)
         try:
+            # move just over the chip
+            self.printer.move_to(z=(self.chip_surface_height + self.glitch_height))
+            # Appends if the file already exists, e.g. when resuming
+            self.results.open(self._out_path)
+            if checkpoint is not None and checkpoint.point is not None and not self.attack.move():
+                # The last position wasn't finished, continue there
+                next_chip_coordinates = Point2D.from_iter(checkpoint.point)
+                world_coords = self.chip_point_to_world(np.asarray(checkpoint.point))
+                self.printer.move_to(*world_coords)
+                at_position = checkpoint.at_position
+                first_loop = False
+            self._last_checkpoint = monotonic()
+            # Test Loop
             while True and not self._stop_request:
                 while True and not self._stop_request:
-                    # The interface has to move on the first call
-                    next_chip_coordinates = Point2D(0.0, 0.0)
-                    world_coords = (0, 0)
                     if first_loop or self.attack.move():
                         try:
                             next_chip_coordinates: Point2D = next(self.movement_strategy)
@@ -177,31 +215,134 @@ class AdvancedAttacker(Integrator):
                         )
                         self.printer.move_to(*world_coords)
                         at_position = at_position + 1
+                        events.emit(
+                            events.Move(
+                                chip=next_chip_coordinates.to_tuple(),
+                                world=world_coords,
+                                position=at_position,
+                            )
+                        )
                         first_loop = False
                         self.log.info("I'm at position %s", at_position)
 
                     # the chipwhisperer doing the attacking
                     self.attack_with_wiggle()
                     # getting results
-                    successes.append(
-                        AttackResults(
-                            next_chip_coordinates.to_tuple(),
-                            world_coords,
-                            at_position,
-                            results=self.attack.check_results(),
-                        )
+                    result = AttackResults(
+                        next_chip_coordinates.to_tuple(),
+                        world_coords,
+                        at_position,
+                        results=self.attack.check_results(),
                     )
+                    self.results.write(result)
+                    self.movement_strategy.feedback(result)
+                    if monotonic() - self._last_checkpoint > self.checkpoint_interval:
+                        self.save_checkpoint(next_chip_coordinates, at_position)
+                if self._stop_request:
+                    # Stopped mid sweep, the checkpoint continues from here
+                    break
                 at_position = 0
                 self.movement_strategy.reset()
                 self.attack.update()
         finally:
-            with open(Path(self._out_path, "glitches.json"), "w") as results:
-                json.dump(successes, results, indent=2, default=asdict)
+            try:
+                self.save_checkpoint(next_chip_coordinates, at_position)
+                self.results.close()
+                self.register()
+            finally:
+                # The strategies are only reset after their state is in the checkpoint
+                self._running = False
+                self.reset()
+                self.log.info("Attack finished")
+
+    def save_checkpoint(self, point: Point2D, at_position: int):
+        """
+        Writes everything needed to `resume` the campaign to the output directory.
+        The results written so far are flushed first, so the checkpoint never runs ahead of them.
+        """
+        self.results.flush()
+        if self.chip_position is None:
+            return
+        center, size, angle = self.chip_position
+        Checkpoint(
+            movement=self.movement_strategy.get_state(),
+            attack=self.attack.get_state(),
+            chip_position=(np.asarray(center).tolist(), np.asarray(size).tolist(), float(angle)),
+            chip_surface_height=self.chip_surface_height,
+            point=point.to_tuple() if at_position else None,
+            at_position=at_position,
+        ).save(self._out_path)
+        self._last_checkpoint = monotonic()
+        self.log.info("Saved checkpoint at position %s", at_position)
+
+    def save_config(self, config: dict):
+        with open(Path(self._out_path, CONFIG_NAME), "w") as out:
+            json.dump(config, out, indent=2)
+
+    def register(self):
+        """
+        Adds the campaign to the catalog, a failure must not lose the results.
+        """
+        if self.chip_position is None:
+            return
+        center, size, angle = self.chip_position
+        try:
+            with Catalog(path=self.catalog_path) as catalog:
+                catalog.register(
+                    self._out_path,
+                    target=type(self.attack).__name__,
+                    movement=type(self.movement_strategy).__name__,
+                    probe_type=self.probe_camera.probe_type.name,
+                    chip_position=(np.asarray(center).tolist(), np.asarray(size).tolist(), angle),
+                )
+        except Exception as e:
+            self.log.error("Couldn't register the campaign: %s", e)
 
-            self.reset()
-            self.log.info("Attack finished")
+    def resume(self, directory: Path | None = None):
+        """
+        Continues a campaign from its last checkpoint, without surveying the chip again.
+        The results are appended to the ones of the old campaign.
+
+        Args:
+            directory: The output directory of the campaign, defaults to the newest one.
+        """
+        if self.state not in (SetupState.NOT_READY, SetupState.READY):
+            raise ValueError("Device in the wrong state, something went wrong %s", self.state)
+        directory = directory or latest_checkpoint(self._out_path.parent)
+        if directory is None:
+            raise ValueError("There is no checkpoint to resume")
+        checkpoint = Checkpoint.load(directory)
+        self.log.info("Resuming %s from %s", directory, checkpoint.created)
+
+        # Continue in the old directory, the new one only has the config
+        if {path.name for path in self._out_path.iterdir()} <= {CONFIG_NAME}:
+            Path(self._out_path, CONFIG_NAME).unlink(missing_ok=True)
+            self._out_path.rmdir()
+        self._out_path = Path(directory)
+
+        center, size, angle = checkpoint.chip_position
+        self.chip_position = (np.asarray(center), np.asarray(size), angle)
+        self.chip_surface_height = checkpoint.chip_surface_height
+        self.movement_strategy.set_state(checkpoint.movement)
+        self.attack.set_state(checkpoint.attack)
+
+        # The printer might have restarted since
+        try:
+            self.printer.move_rel(z=0.01)
+            self.printer.move_rel(z=-0.01)
+        except MovementError:
+            self.printer.home()
+
+        self.state = SetupState.READY
+        self.continue_experiment(checkpoint)
 
     def reset(self):
+        if self._running:
+            # Called from another thread, e.g. by `/reset`. The loop stops after the current
+            # attempt, saves the checkpoint and resets everything itself.
+            self.log.info("Stopping the attack")
+            self._stop_request = True
+            return
         self.state = SetupState.NOT_READY
         for i in self.__dict__.values():
             try:
@@ -226,11 +367,12 @@ class AdvancedAttacker(Integrator):
             raise ValueError("Could not find probe center")
 
         # adjust (get) to the offset between the probe and the probe mount port in the XY plane
-        self.printer.move_to(x=10, y=0, speed=3000)
-        self.printer.move_to(x=2, z=self.probe_camera.get_focus().at, speed=1000)
-        # Don't set the offset yet, other coordinates will get more complicated otherwise
-        # Turn on the light
-        self.printer.send_gcode("SET_LED LED=probe_led WHITE=1")
+        with self.printer.plan() as plan:
+            plan.move_to(x=10, y=0, speed=3000)
+            plan.move_to(x=2, z=self.probe_camera.get_focus().at, speed=1000)
+            # Don't set the offset yet, other coordinates will get more complicated otherwise
+            # Turn on the light
+            plan.set_led("probe_led", 1)
         try:
             center = retry_circle()
         finally:
@@ -280,36 +422,37 @@ class AdvancedAttacker(Integrator):
         self.log.info("factored distance: %s", factored)
         return factored
 
+    @property
+    def chip_frame(self) -> ChipFrame:
+        """
+        Transform between chip units and world coordinates, cached for the current chip position.
+        """
+        if self._chip_frame is None or self._chip_frame_source is not self.chip_position:
+            self._chip_frame = ChipFrame.from_rectangle(self.chip_position)
+            self._chip_frame_source = self.chip_position
+        return self._chip_frame
+
     def chip_point_to_world(self, point: np.ndarray) -> tuple[float, float]:
         """
         The input point represents a fraction in which 1 is the width, height of the chip and 0, 0
         the upper left corner.
         """
-        center, size, angle = self.chip_position
-        rotation = cv2.getRotationMatrix2D(center, -angle, 1)
-
-        # Scale the point up to the size of the chip
-        point *= size
-        # shift the points to be centered around the chip
-        point = point + center - size / 2
-
-        # rotate
-        rotated = cv2.transform(np.array([[point]]), rotation)[0][0]
-        # noinspection PyTypeChecker
-        return tuple(rotated)
+        x, y = self.chip_frame.to_frame(point)
+        return float(x), float(y)
 
     def find_chip(self) -> Rectangle:
         # get max values for all axes
         max_axes: Point2D = Point2D(*self.printer.get_limits()[:-1])
 
-        # Move PCB Camera to the center to get the best image
-        # This position is relative to the chipshouter mount-point, not the varying probe center
-        self.printer.move_to(z=60)
-        # Move to center, makes seeing the camera offset easier
-        self.printer.move_to(*(max_axes / 2), speed=3000)
-        # Center the camera on the build plate
-        self.printer.move_rel(*(self.pcb_camera.camera_position * -1), speed=3000)
-        self.printer.move_to(z=self.pcb_camera.get_focus().at)
+        with self.printer.plan() as plan:
+            # Move PCB Camera to the center to get the best image
+            # This position is relative to the chipshouter mount-point, not the varying probe center
+            plan.move_to(z=60)
+            # Move to center, makes seeing the camera offset easier
+            plan.move_to(*(max_axes / 2), speed=3000)
+            # Center the camera on the build plate
+            plan.move_rel(*(self.pcb_camera.camera_position * -1), speed=3000)
+            plan.move_to(z=self.pcb_camera.get_focus().at)
 
         ##################################
         # take the image and find the IC.
@@ -321,11 +464,12 @@ class AdvancedAttacker(Integrator):
         center = self.get_rectangle(True)[0]
         distance = self.calculate_chip_offset(Point2D(*center), 0.655)
 
-        # move the touch probe to the position of the probe
-        self.printer.move_rel(*(self.pcb_camera.get_camera_position() - self.touch_position))
+        with self.printer.plan() as plan:
+            # move the touch probe to the position of the probe
+            plan.move_rel(*(self.pcb_camera.get_camera_position() - self.touch_position))
 
-        # move the touch probe to the approximate chip position
-        self.printer.move_rel(*distance)
+            # move the touch probe to the approximate chip position
+            plan.move_rel(*distance)
 
         height = self.printer.probe()
         self.log.info(f"Probed chip height: {height:.2f}")
@@ -339,8 +483,9 @@ class AdvancedAttacker(Integrator):
         self.printer.add_offset(z_offset=-height)
 
         # Move camera back over chip, centered this time and with the correct distance
-        self.printer.move_rel(*(self.touch_position - self.pcb_camera.get_camera_position()))
-        self.printer.move_to(z=self.pcb_camera.get_focus().at)
+        with self.printer.plan() as plan:
+            plan.move_rel(*(self.touch_position - self.pcb_camera.get_camera_position()))
+            plan.move_to(z=self.pcb_camera.get_focus().at)
         # Use autofocus, we don't really need fixed focus at this wide of an angle
         chip_position = self.get_rectangle(True)
         self.log.info(f"Found final chip position: {chip_position}")
@@ -398,9 +543,9 @@ class AdvancedAttacker(Integrator):
         )
         self.log.info(f"Final chip rectangle: {self.chip_position}")
 
-        self.printer.move_to(*self.temp_store.abs_chip_position)
-
-        self.printer.move_to(z=10)
+        with self.printer.plan() as plan:
+            plan.move_to(*self.temp_store.abs_chip_position)
+            plan.move_to(z=10)
 
         self.state = SetupState.READY
 
@@ -410,6 +555,7 @@ class AdvancedAttacker(Integrator):
             self.attack.start()
         except OverheatException:
             self.log.error("Overheat detected, resetting")
+            events.emit(events.Overheat())
             self.sleep_and_wiggle()
             raise
 
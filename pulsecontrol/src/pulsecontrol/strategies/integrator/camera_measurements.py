@@ -8,7 +8,7 @@ import numpy as np
 from pulsecontrol.helpers import HasLogger, Point2D
 from pulsecontrol.strategies.camera import RectangleCamera
 from pulsecontrol.strategies.camera.http_wrapper import HttpWrapperLocal as CameraWrapper
-from pulsecontrol.strategies.control.moonraker import Moonraker
+from pulsecontrol.strategies.control import MoonrakerStrategies
 from pulsecontrol.strategies.integrator import Integrator
 from pulsecontrol.strategies.movement.fix_point import FixPoint
 from pulsecontrol.strategies.movement.gaussian import Gaussian
@@ -46,7 +46,7 @@ class CameraMeasurements(Integrator, HasLogger):
     file_prefix: str
 
     # Printer Control
-    printer: Moonraker
+    printer: MoonrakerStrategies
 
     # Camera
     pcb_camera: CameraWrapper | RectangleCamera
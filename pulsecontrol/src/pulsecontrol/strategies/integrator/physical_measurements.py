@@ -6,7 +6,7 @@ from time import sleep
 from tqdm import tqdm
 
 from pulsecontrol.helpers import HasLogger
-from pulsecontrol.strategies.control.moonraker import Moonraker
+from pulsecontrol.strategies.control import MoonrakerStrategies
 from pulsecontrol.strategies.integrator import Integrator
 from pulsecontrol.strategies.movement.alternating import Alternating
 from pulsecontrol.strategies.movement.homing_mode import HomingMode
@@ -33,7 +33,7 @@ class PhysicalMeasurements(Integrator, HasLogger):
     height: float
 
     # Printer Control
-    printer: Moonraker
+    printer: MoonrakerStrategies
 
     # Movement
     movement_strategy: Alternating | TinySteps | HomingMode
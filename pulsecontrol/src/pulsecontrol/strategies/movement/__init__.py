@@ -2,7 +2,10 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Iterator
 
-from pulsecontrol.helpers import Point2D
+import numpy as np
+
+from pulsecontrol.helpers import Point2D, PointArray
+from pulsecontrol.helpers.results import AttackResults
 from pulsecontrol.strategies import Strategy
 
 
@@ -17,5 +20,39 @@ class MovementStrategy(Iterator[Point2D], Strategy, ABC):
     def is_injection_location(self) -> bool:
         raise NotImplementedError()
 
+    def feedback(self, result: AttackResults):
+        """
+        Called with the results of every attack at the last returned position.
+        Strategies that adapt to the outcomes override this.
+        """
+        pass
+
+    def get_state(self) -> dict:
+        """
+        Everything needed to continue the current run after a restart, must be json serializable.
+        """
+        return {}
+
+    def set_state(self, state: dict):
+        """
+        Continues a run from the output of `get_state`, the next point is the one that would have
+        followed.
+        """
+        pass
+
+    def to_array(self) -> np.ndarray:
+        """
+        Precomputes all points of the current run as an (N, 2) array of chip coordinates.
+        Allows transforming, deduplicating or ordering the whole plan at once.
+        Only strategies with a finite number of points support this.
+        """
+        raise NotImplementedError()
+
+    def to_points(self) -> PointArray:
+        """
+        Same as `to_array`, supports the arithmetic of `Point2D` on all points at once.
+        """
+        return PointArray(self.to_array())
+
 
 class MovementError(Exception): ...
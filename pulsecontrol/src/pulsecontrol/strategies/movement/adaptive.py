@@ -0,0 +1,99 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from pulsecontrol.helpers import HasLogger, Point2D
+from pulsecontrol.helpers.results import AttackResults
+from pulsecontrol.strategies.movement import MovementStrategy
+
+
+@dataclass(kw_only=True)
+class Adaptive(MovementStrategy, HasLogger):
+    """
+    Searches for sensitive regions on the chip with the outcomes of the attacks.
+
+    The chip is split into cells, each cell has a Beta-Bernoulli model of the chance that an attempt
+    there has an effect. The next position is chosen by thompson sampling: draw a chance for every
+    cell from its posterior, then move to a random position in the cell with the highest draw.
+    Cells without attempts are uncertain and get explored, cells with effects get exploited.
+
+    The model is kept when the strategy is reset, so it keeps learning over all runs.
+    """
+
+    # Flag to hint dacite which movement strategy to use
+    adaptive: bool
+
+    cells_x: int = 10
+    cells_y: int = 10
+    # Prior of the beta distribution, the default is uniform
+    alpha: float = 1.0
+    beta: float = 1.0
+    # Effects (by value) that count as a miss, all others are a hit
+    ignored_effects: tuple[str, ...] = ("no_effect",)
+    # The number of positions per run. -1 for infinite.
+    iterations: int = -1
+    seed: int | None = None
+
+    hits: np.ndarray = field(init=False, repr=False)
+    attempts: np.ndarray = field(init=False, repr=False)
+
+    _remaining: int = field(init=False, repr=False)
+    _rng: np.random.Generator = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._rng = np.random.default_rng(self.seed)
+        self.hits = np.zeros((self.cells_y, self.cells_x))
+        self.attempts = np.zeros((self.cells_y, self.cells_x))
+        self._remaining = self.iterations
+        if self.iterations >= 0:
+            self.total_movements = self.iterations
+
+    def is_injection_location(self) -> bool:
+        return True
+
+    def reset(self):
+        self._remaining = self.iterations
+
+    def get_state(self) -> dict:
+        return dict(
+            hits=self.hits.tolist(),
+            attempts=self.attempts.tolist(),
+            remaining=self._remaining,
+            rng=self._rng.bit_generator.state,
+        )
+
+    def set_state(self, state: dict):
+        self.hits = np.asarray(state["hits"], dtype=float)
+        self.attempts = np.asarray(state["attempts"], dtype=float)
+        self._remaining = state["remaining"]
+        self._rng.bit_generator.state = state["rng"]
+
+    def cell(self, point: tuple[float, float]) -> tuple[int, int]:
+        x, y = point
+        column = min(max(int(x * self.cells_x), 0), self.cells_x - 1)
+        row = min(max(int(y * self.cells_y), 0), self.cells_y - 1)
+        return row, column
+
+    def feedback(self, result: AttackResults):
+        row, column = self.cell(result.image_coords)
+        effects = [getattr(attack.effect, "value", attack.effect) for attack in result.results]
+        self.hits[row, column] += sum(effect not in self.ignored_effects for effect in effects)
+        self.attempts[row, column] += len(effects)
+
+    def probability(self) -> np.ndarray:
+        """
+        Returns:
+            The posterior mean of the effect chance for every cell, indexed by row and column.
+        """
+        return (self.alpha + self.hits) / (self.alpha + self.beta + self.attempts)
+
+    def __next__(self) -> Point2D:
+        if self._remaining == 0:
+            raise StopIteration()
+        self._remaining -= 1
+
+        draws = self._rng.beta(self.alpha + self.hits, self.beta + self.attempts - self.hits)
+        row, column = np.unravel_index(np.argmax(draws), draws.shape)
+        self.log.debug("Sampling cell (%s, %s), chance %.3f", column, row, draws[row, column])
+        x, y = self._rng.uniform(size=2)
+        return Point2D((column + x) / self.cells_x, (row + y) / self.cells_y)
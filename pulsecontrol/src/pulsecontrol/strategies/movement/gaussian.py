@@ -5,6 +5,9 @@ import numpy as np
 from pulsecontrol.helpers import Point2D
 from pulsecontrol.strategies.movement import MovementStrategy
 
+# Samples drawn at once when the number of iterations is infinite
+BATCH_SIZE = 1024
+
 
 @dataclass(kw_only=True)
 class Gaussian(MovementStrategy):
@@ -16,25 +19,52 @@ class Gaussian(MovementStrategy):
     center: Point2D
     # The number of samples to take. -1 for infinite.
     iterations: int = -1
-    _original_iterations: int = field(init=False)
+    # Seed for the random number generator, None for a different sequence on every run
+    seed: int | None = None
+
+    _rng: np.random.Generator = field(init=False, repr=False)
+    _plan: np.ndarray = field(init=False, repr=False)
+    _index: int = field(default=0, init=False, repr=False)
 
     def __post_init__(self):
-        self._original_iterations = self.iterations
+        self._rng = np.random.default_rng(self.seed)
+        self.reset()
+
+    def sample(self, count: int) -> np.ndarray:
+        return np.clip(
+            self._rng.normal(loc=self.center.to_tuple(), scale=self.var, size=(count, 2)), 0, 1
+        )
 
     def is_injection_location(self) -> bool:
         return True
 
+    def to_array(self) -> np.ndarray:
+        if self.iterations < 0:
+            raise ValueError("An infinite number of samples can't be precomputed")
+        return self._plan
+
+    def get_state(self) -> dict:
+        return dict(index=self._index, plan=self._plan.tolist(), rng=self._rng.bit_generator.state)
+
+    def set_state(self, state: dict):
+        self._index = state["index"]
+        self._plan = np.asarray(state["plan"], dtype=float).reshape(-1, 2)
+        self._rng.bit_generator.state = state["rng"]
+
     def reset(self):
-        self.iterations = self._original_iterations
+        """
+        Draws the samples for the next run. Resetting doesn't reseed, so every run is different.
+        """
+        self._plan = self.sample(self.iterations if self.iterations >= 0 else BATCH_SIZE)
+        self._index = 0
+        if self.iterations >= 0:
+            self.total_movements = self.iterations
 
     def __next__(self) -> Point2D:
-        if self.iterations == 0:
-            raise StopIteration()
-        self.iterations -= 1
-        return Point2D.from_iter(
-            np.clip(
-                np.random.normal(loc=self.center.to_tuple(), scale=self.var, size=2),
-                0,
-                1,
-            )
-        )
+        if self._index >= len(self._plan):
+            if self.iterations >= 0:
+                raise StopIteration()
+            self._plan = self.sample(BATCH_SIZE)
+            self._index = 0
+        self._index += 1
+        return Point2D.from_iter(self._plan[self._index - 1].tolist())
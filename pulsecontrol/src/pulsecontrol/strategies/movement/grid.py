@@ -1,10 +1,22 @@
 from dataclasses import dataclass, field
-from math import isclose
+
+import numpy as np
 
 from pulsecontrol.helpers import Point2D
 from pulsecontrol.strategies.movement import MovementStrategy
 
 
+def grid_axis(steps: float, offset: float) -> np.ndarray:
+    """
+    Positions along one axis: every `1 / (steps + 1)`, starting one step after `offset`
+    and ending before `1 - offset`.
+    """
+    distance = 1 / (steps + 1)
+    # Tolerance for positions that only miss the end because of rounding errors
+    count = int(np.floor((1 - 2 * offset) / distance - 1e-9))
+    return offset + distance * np.arange(1, max(count, 0) + 1)
+
+
 @dataclass(kw_only=True)
 class Grid(MovementStrategy):
     def is_injection_location(self) -> bool:
@@ -19,24 +31,31 @@ class Grid(MovementStrategy):
     offset_x: float = 0.0
     offset_y: float = 0.0
 
-    position: Point2D = field(init=False)
+    _plan: np.ndarray = field(init=False, repr=False)
+    _index: int = field(default=0, init=False, repr=False)
 
     def __post_init__(self):
-        # this inits pos_x and pos_y
-        self.reset()
+        # Row by row, x changes fastest
+        xs = grid_axis(self.step_x, self.offset_x)
+        ys = grid_axis(self.step_y, self.offset_y)
+        y, x = np.meshgrid(ys, xs, indexing="ij")
+        self._plan = np.column_stack((x.ravel(), y.ravel()))
+        self.total_movements = len(self._plan)
+
+    def to_array(self) -> np.ndarray:
+        return self._plan
 
     def __next__(self) -> Point2D:
-        self.position.x += 1 / (self.step_x + 1)
-        if isclose(self.position.x, 1 - self.offset_x):
-            self.position.x = self.offset_x + 1 / (self.step_x + 1)
+        if self._index >= len(self._plan):
+            raise StopIteration()
+        self._index += 1
+        return Point2D.from_iter(self._plan[self._index - 1].tolist())
 
-            self.position.y += 1 / (self.step_y + 1)
-            if isclose(self.position.y, (1 - self.offset_y)):
-                raise StopIteration()
+    def get_state(self) -> dict:
+        return dict(index=self._index)
 
-        return self.position
+    def set_state(self, state: dict):
+        self._index = state["index"]
 
     def reset(self):
-        self.position = Point2D(self.offset_x, self.offset_y + 1 / (self.step_y + 1))
-        # self.pos_x = self.offset_x
-        # self.pos_y = self.offset_y + 1 / (self.step_y + 1)  # x also starts there
+        self._index = 0
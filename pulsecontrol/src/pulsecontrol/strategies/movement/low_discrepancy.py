@@ -0,0 +1,189 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+
+import numpy as np
+
+from pulsecontrol.helpers import ConfigurationError, Point2D
+from pulsecontrol.strategies.movement import MovementStrategy
+
+BATCH_SIZE = 1024
+# Give up if this many batches in a row are excluded
+MAX_EMPTY_BATCHES = 64
+# Bits of the sobol points
+SOBOL_BITS = 32
+
+
+class Sequence(Enum):
+    SOBOL = "sobol"
+    HALTON = "halton"
+
+
+def sobol_directions(bits: int = SOBOL_BITS) -> np.ndarray:
+    """
+    Direction numbers of the first two sobol dimensions, scaled to integers with `bits` bits.
+    The first dimension is the van der corput sequence, the second uses the polynomial x + 1.
+    """
+    m = [1]
+    for _ in range(bits - 1):
+        m.append((m[-1] << 1) ^ m[-1])
+    first = [1 << (bits - 1 - k) for k in range(bits)]
+    second = [m[k] << (bits - 1 - k) for k in range(bits)]
+    return np.array([first, second], dtype=np.uint64)
+
+
+def sobol(indices: np.ndarray, shift: np.ndarray) -> np.ndarray:
+    """
+    Points of the sobol sequence at the given indices, scrambled by a random digital shift.
+    """
+    directions = sobol_directions()
+    points = np.zeros((len(indices), 2), dtype=np.uint64)
+    indices = indices.astype(np.uint64)
+    for bit in range(SOBOL_BITS):
+        is_set = ((indices >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+        points[is_set] ^= directions[:, bit]
+    return (points ^ shift) / float(1 << SOBOL_BITS)
+
+
+def radical_inverse(indices: np.ndarray, base: int, permutation: np.ndarray) -> np.ndarray:
+    """
+    Mirrors the digits of the indices at the decimal point, the digits are scrambled by the
+    permutation. The permutation keeps zero in place, so the number of digits doesn't matter.
+    """
+    result = np.zeros(len(indices))
+    remaining = indices.copy()
+    scale = 1.0 / base
+    while remaining.any():
+        remaining, digit = np.divmod(remaining, base)
+        result += permutation[digit] * scale
+        scale /= base
+    return result
+
+
+def halton(indices: np.ndarray, permutations: list[np.ndarray]) -> np.ndarray:
+    return np.column_stack(
+        [radical_inverse(indices, base, p) for base, p in zip((2, 3), permutations)]
+    )
+
+
+@dataclass(kw_only=True)
+class LowDiscrepancy(MovementStrategy):
+    """
+    Covers the chip evenly with a scrambled sobol or halton sequence. Every prefix of the sequence
+    is spread out, so stopping early still leaves no large holes.
+
+    The points only depend on the seed and the index, set `start_index` to the `index` of a
+    stopped campaign to continue it without repeating positions.
+    """
+
+    # Also hints dacite which movement strategy to use
+    sequence: Sequence
+    seed: int = 0
+    start_index: int = 0
+    # The number of positions per run. -1 for infinite.
+    iterations: int = -1
+
+    # Sub rectangle of the chip to cover, as upper left and lower right corner
+    lower: Point2D = field(default_factory=lambda: Point2D(0.0, 0.0))
+    upper: Point2D = field(default_factory=lambda: Point2D(1.0, 1.0))
+    # Areas to skip, as (x0, y0, x1, y1) in chip coordinates
+    exclude: list[tuple[float, float, float, float]] = field(default_factory=list)
+    # Boolean .npy array over the whole chip (rows are y), true marks positions to skip
+    mask_path: Path | None = None
+
+    # Sequence index of the next candidate, skipped points count too
+    index: int = field(init=False)
+
+    _mask: np.ndarray | None = field(default=None, init=False, repr=False)
+    _shift: np.ndarray = field(init=False, repr=False)
+    _permutations: list[np.ndarray] = field(init=False, repr=False)
+    _buffer: np.ndarray = field(init=False, repr=False)
+    _remaining: int = field(init=False, repr=False)
+
+    def __post_init__(self):
+        if self.mask_path is not None:
+            self._mask = np.load(self.mask_path).astype(bool)
+            if self._mask.all():
+                raise ConfigurationError("The mask excludes the whole chip")
+        rng = np.random.default_rng(self.seed)
+        self._shift = rng.integers(0, 1 << SOBOL_BITS, size=2, dtype=np.uint64)
+        # Zero stays in place, the other digits are shuffled
+        self._permutations = [
+            np.concatenate(([0], 1 + rng.permutation(base - 1))) for base in (2, 3)
+        ]
+        if self.iterations >= 0:
+            self.total_movements = self.iterations
+        self.reset()
+
+    def is_injection_location(self) -> bool:
+        return True
+
+    def reset(self):
+        self.index = self.start_index
+        self._buffer = np.empty((0, 2))
+        self._remaining = self.iterations
+
+    def get_state(self) -> dict:
+        return dict(index=self.index, remaining=self._remaining)
+
+    def set_state(self, state: dict):
+        self.index = state["index"]
+        self._remaining = state["remaining"]
+        self._buffer = np.empty((0, 2))
+
+    def points(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Returns:
+            The points at the given sequence indices, scaled to the sub rectangle.
+        """
+        match self.sequence:
+            case Sequence.SOBOL:
+                unit = sobol(indices, self._shift)
+            case Sequence.HALTON:
+                unit = halton(indices, self._permutations)
+        lower, upper = np.asarray(self.lower.to_tuple()), np.asarray(self.upper.to_tuple())
+        return lower + unit * (upper - lower)
+
+    def allowed(self, points: np.ndarray) -> np.ndarray:
+        keep = np.ones(len(points), dtype=bool)
+        for x0, y0, x1, y1 in self.exclude:
+            inside = (points[:, 0] >= x0) & (points[:, 0] <= x1)
+            keep &= ~(inside & (points[:, 1] >= y0) & (points[:, 1] <= y1))
+        if self._mask is not None:
+            rows, columns = self._mask.shape
+            row = np.clip((points[:, 1] * rows).astype(int), 0, rows - 1)
+            column = np.clip((points[:, 0] * columns).astype(int), 0, columns - 1)
+            keep &= ~self._mask[row, column]
+        return keep
+
+    def _fill(self):
+        indices = np.arange(self.index, self.index + BATCH_SIZE)
+        points = self.points(indices)
+        keep = self.allowed(points)
+        # Remember the sequence index of each kept point, to know where to resume
+        self._buffer = np.column_stack((points[keep], indices[keep]))
+
+    def to_array(self) -> np.ndarray:
+        if self.iterations < 0:
+            raise ValueError("An infinite number of points can't be precomputed")
+        state = self.index, self._buffer, self._remaining
+        points = np.array([point.to_tuple() for point in self]).reshape(-1, 2)
+        self.index, self._buffer, self._remaining = state
+        return points
+
+    def __next__(self) -> Point2D:
+        if self._remaining == 0:
+            raise StopIteration()
+        for _ in range(MAX_EMPTY_BATCHES):
+            if len(self._buffer):
+                break
+            self._fill()
+            if not len(self._buffer):
+                self.index += BATCH_SIZE
+        else:
+            raise ConfigurationError("The exclusions cover the whole area")
+        x, y, index = self._buffer[0]
+        self._buffer = self._buffer[1:]
+        self._remaining -= 1
+        self.index = int(index) + 1
+        return Point2D(float(x), float(y))
@@ -0,0 +1,204 @@
+from dataclasses import dataclass, field
+from enum import Enum
+
+import numpy as np
+
+from pulsecontrol.helpers import ConfigurationError, Point2D
+from pulsecontrol.helpers.results import AttackResults
+from pulsecontrol.strategies.movement import MovementStrategy
+from pulsecontrol.strategies.movement.gaussian import Gaussian
+from pulsecontrol.strategies.movement.grid import Grid
+
+# Side length of the hilbert curve grid, as a power of two
+HILBERT_ORDER = 16
+
+
+class Order(Enum):
+    # Keep the order of the wrapped strategy
+    NONE = "none"
+    # Row by row, every other row reversed. Ideal for grids.
+    SERPENTINE = "serpentine"
+    # Follow a hilbert curve, keeps neighbouring points close for any point set.
+    HILBERT = "hilbert"
+    # Always move to the closest point that is left, then improve the path with 2-opt.
+    NEAREST = "nearest"
+
+
+def path_length(points: np.ndarray) -> float:
+    return float(np.linalg.norm(np.diff(points, axis=0), axis=1).sum())
+
+
+def serpentine(points: np.ndarray, row_tolerance: float = 1e-6) -> np.ndarray:
+    """
+    Returns:
+        The indices of the points, sorted by row and alternating the direction of x in each row.
+    """
+    rows = np.round(points[:, 1] / row_tolerance).astype(np.int64)
+    _, row = np.unique(rows, return_inverse=True)
+    # Odd rows are sorted by descending x
+    x = np.where(row % 2, -points[:, 0], points[:, 0])
+    return np.lexsort((x, row))
+
+
+def hilbert(points: np.ndarray) -> np.ndarray:
+    """
+    Returns:
+        The indices of the points, sorted by their distance along a hilbert curve over the
+        bounding box of the points.
+    """
+    side = 1 << HILBERT_ORDER
+    low = points.min(axis=0)
+    extent = np.ptp(points, axis=0).max() or 1.0
+    cells = np.minimum(((points - low) / extent * side).astype(np.int64), side - 1)
+    x, y = cells[:, 0].copy(), cells[:, 1].copy()
+
+    distance = np.zeros(len(points), dtype=np.int64)
+    s = side >> 1
+    while s:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        distance += s * s * ((3 * rx) ^ ry)
+        # Rotate the quadrant, so the curve stays continuous
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(~ry, y, x), np.where(~ry, x, y)
+        s >>= 1
+    return np.argsort(distance, kind="stable")
+
+
+def nearest_neighbour(points: np.ndarray, start: np.ndarray) -> np.ndarray:
+    """
+    Returns:
+        The indices of the points, starting with the closest point to `start` and then always
+        continuing with the closest unvisited point.
+    """
+    remaining = np.ones(len(points), dtype=bool)
+    order = np.empty(len(points), dtype=np.int64)
+    current = start
+    for i in range(len(points)):
+        distances = np.einsum("ij,ij->i", points - current, points - current)
+        distances[~remaining] = np.inf
+        order[i] = nearest = np.argmin(distances)
+        remaining[nearest] = False
+        current = points[nearest]
+    return order
+
+
+def two_opt(points: np.ndarray, order: np.ndarray, start: np.ndarray, passes: int) -> np.ndarray:
+    """
+    Reverses segments of the path as long as that makes it shorter.
+    Each pass checks all pairs of edges once, the checks for one edge are vectorized.
+
+    Returns:
+        The improved order, the path still begins at `start` but the end is free.
+    """
+    order = order.copy()
+    for _ in range(passes):
+        improved = False
+        for i in range(len(order) - 1):
+            path = np.vstack((start, points[order]))
+            # Edge i runs from path[i] to path[i + 1], compare it with all edges after it.
+            # The last point has no outgoing edge, moving it only removes the edge before it.
+            a, b = path[i], path[i + 1]
+            c, d = path[i + 2 :], np.vstack((path[i + 3 :], path[-1:]))
+            before = np.linalg.norm(b - a) + np.linalg.norm(d - c, axis=1)
+            after = np.linalg.norm(c - a, axis=1) + np.linalg.norm(d - b, axis=1)
+            # Reversing up to the end of the path only replaces the edge a-b with a-c
+            before[-1], after[-1] = np.linalg.norm(b - a), np.linalg.norm(c[-1] - a)
+            gain = before - after
+            j = int(np.argmax(gain))
+            if gain[j] > 1e-12:
+                order[i : i + j + 2] = order[i : i + j + 2][::-1]
+                improved = True
+        if not improved:
+            break
+    return order
+
+
+@dataclass(kw_only=True)
+class Ordered(MovementStrategy):
+    """
+    Takes the precomputed points of a finite movement strategy and reorders them to shorten the travel
+    between the injection locations. The injection locations themselves stay the same.
+
+    Every reset takes the points again (e.g. new samples for `Gaussian`) and the new path starts
+    at the last point of the previous one.
+    """
+
+    # The strategy that generates the points, it has to end
+    points: Grid | Gaussian
+    order: Order = Order.NEAREST
+    # Limit for the 2-opt improvement of the nearest neighbour path, 0 disables it
+    two_opt_passes: int = 2
+    # Visit points that occur multiple times only once, e.g. samples clipped to the chip edge
+    deduplicate: bool = False
+    # Starting point of the first path, the setup leaves the probe over the chip center
+    start: Point2D = field(default_factory=lambda: Point2D(0.5, 0.5))
+
+    _path: np.ndarray = field(init=False, repr=False)
+    _index: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.points.total_movements is None:
+            raise ConfigurationError("Only movement strategies that end can be ordered")
+        self._path = self.plan(np.asarray(self.start.to_tuple(), dtype=float))
+
+    def plan(self, start: np.ndarray) -> np.ndarray:
+        """
+        Returns:
+            All points of the wrapped strategy, as an (N, 2) array in travel order.
+        """
+        points = self.points.to_array()
+        if self.deduplicate:
+            points = np.unique(points, axis=0)
+        self.total_movements = len(points)
+        if len(points) < 2:
+            return points
+
+        match self.order:
+            case Order.NONE:
+                return points
+            case Order.SERPENTINE:
+                path = points[serpentine(points)]
+            case Order.HILBERT:
+                path = points[hilbert(points)]
+            case Order.NEAREST:
+                order = nearest_neighbour(points, start)
+                if self.two_opt_passes:
+                    order = two_opt(points, order, start, self.two_opt_passes)
+                return points[order]
+
+        # Fixed orders can be walked in both directions, begin at the closer end
+        if np.linalg.norm(path[-1] - start) < np.linalg.norm(path[0] - start):
+            path = path[::-1]
+        return path
+
+    def to_array(self) -> np.ndarray:
+        return self._path
+
+    def get_state(self) -> dict:
+        return dict(index=self._index, path=self._path.tolist(), points=self.points.get_state())
+
+    def set_state(self, state: dict):
+        self._index = state["index"]
+        self._path = np.asarray(state["path"], dtype=float).reshape(-1, 2)
+        self.points.set_state(state["points"])
+
+    def feedback(self, result: AttackResults):
+        self.points.feedback(result)
+
+    def is_injection_location(self) -> bool:
+        return True
+
+    def reset(self):
+        last = self._path[self._index - 1] if self._index else self.start.to_tuple()
+        self.points.reset()
+        self._path = self.plan(np.asarray(last, dtype=float))
+        self._index = 0
+
+    def __next__(self) -> Point2D:
+        if self._index >= len(self._path):
+            raise StopIteration()
+        self._index += 1
+        return Point2D.from_iter(self._path[self._index - 1].tolist())
@@ -0,0 +1,114 @@
+from collections import deque
+from dataclasses import asdict, dataclass, field
+
+from pulsecontrol.helpers import HasLogger, Point2D
+from pulsecontrol.helpers.results import AttackResults
+from pulsecontrol.strategies.movement import MovementStrategy
+
+
+@dataclass
+class Cell:
+    # Upper left corner and size, in chip coordinates
+    x: float
+    y: float
+    width: float
+    height: float
+    hits: int = 0
+
+    @property
+    def center(self) -> Point2D:
+        return Point2D(self.x + self.width / 2, self.y + self.height / 2)
+
+    def split(self, parts: int) -> list["Cell"]:
+        width, height = self.width / parts, self.height / parts
+        return [
+            Cell(self.x + column * width, self.y + row * height, width, height)
+            for row in range(parts)
+            for column in range(parts)
+        ]
+
+
+@dataclass(kw_only=True)
+class Refine(MovementStrategy, HasLogger):
+    """
+    Coarse to fine scan: starts with a coarse grid of cells and attacks the center of each.
+    Once all cells of a level are done, only the cells with an effect are split and scanned again,
+    until the cells would get smaller than `min_step`.
+    """
+
+    # Flag to hint dacite which movement strategy to use
+    refine: bool
+
+    # Number of cells in each dimension of the first level
+    coarse_x: int = 4
+    coarse_y: int = 4
+    # Cells are split into parts x parts smaller cells
+    parts: int = 2
+    # Smallest cell size, relative to the chip size
+    min_step: float = 0.02
+    # Effects (by value) that mark a cell for refinement
+    refine_effects: tuple[str, ...] = ("success", "reboot", "error")
+
+    level: int = field(default=0, init=False)
+    _queue: deque[Cell] = field(default_factory=deque, init=False, repr=False)
+    _done: list[Cell] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self):
+        self.reset()
+
+    def is_injection_location(self) -> bool:
+        return True
+
+    def reset(self):
+        self.level = 0
+        self._done = []
+        self._queue = deque(
+            Cell(column / self.coarse_x, row / self.coarse_y, 1 / self.coarse_x, 1 / self.coarse_y)
+            for row in range(self.coarse_y)
+            for column in range(self.coarse_x)
+        )
+
+    def get_state(self) -> dict:
+        return dict(
+            level=self.level,
+            queue=[asdict(cell) for cell in self._queue],
+            done=[asdict(cell) for cell in self._done],
+        )
+
+    def set_state(self, state: dict):
+        self.level = state["level"]
+        self._queue = deque(Cell(**cell) for cell in state["queue"])
+        self._done = [Cell(**cell) for cell in state["done"]]
+
+    def feedback(self, result: AttackResults):
+        if not self._done:
+            return
+        effects = [getattr(attack.effect, "value", attack.effect) for attack in result.results]
+        self._done[-1].hits += sum(effect in self.refine_effects for effect in effects)
+
+    def refine_level(self):
+        """
+        Queues the sub cells of all cells of the finished level that had an effect.
+        """
+        hot = [cell for cell in self._done if cell.hits]
+        self._done = []
+        if min(self.cell_size(hot)) / self.parts < self.min_step:
+            return
+        self.level += 1
+        self._queue.extend(child for cell in hot for child in cell.split(self.parts))
+        self.log.info("Refining %s cells, level %s", len(hot), self.level)
+
+    @staticmethod
+    def cell_size(cells: list[Cell]) -> tuple[float, float]:
+        if not cells:
+            return 0.0, 0.0
+        return cells[0].width, cells[0].height
+
+    def __next__(self) -> Point2D:
+        if not self._queue:
+            self.refine_level()
+        if not self._queue:
+            raise StopIteration()
+        cell = self._queue.popleft()
+        self._done.append(cell)
+        return cell.center
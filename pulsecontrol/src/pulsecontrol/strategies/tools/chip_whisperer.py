@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+import random
 from random import randint
 from time import sleep
 from typing import Literal, Generator, Iterator, Callable
@@ -12,7 +13,7 @@ from chipwhisperer.capture.scopes.cwhardware.ChipWhispererGlitch import GlitchSe
 from chipwhisperer.capture.targets import SimpleSerial
 from pulsecontrol.strategies.injector.chip_shouter import ChipShouter
 
-from pulsecontrol.helpers import HasLogger
+from pulsecontrol.helpers import HasLogger, events
 
 
 @dataclass(kw_only=True)
@@ -22,15 +23,35 @@ class Offset:
     step: int
 
     _current: Iterator[int] = None
+    # Offsets of the current sweep that were already returned
+    _consumed: int = 0
+    # Offsets to skip in the next sweep, set when resuming an interrupted sweep
+    _skip: int = 0
 
     def __iter__(self):
-        self._current = iter(range(self.start, self.end, self.step))
+        self._current = iter(range(self.start + self._skip * self.step, self.end, self.step))
+        self._consumed = self._skip
+        self._skip = 0
         return self
 
     def __next__(self):
         if self._current is None:
             raise StopIteration
-        return next(self._current)
+        try:
+            offset = next(self._current)
+        except StopIteration:
+            # The sweep is complete, the next one starts at the beginning
+            self._consumed = 0
+            raise
+        self._consumed += 1
+        return offset
+
+    def get_state(self) -> dict:
+        # The last returned offset might not have been attacked yet, repeat it
+        return dict(consumed=max(self._consumed - 1, 0))
+
+    def set_state(self, state: dict):
+        self._skip = state["consumed"]
 
 
 @dataclass(kw_only=True)
@@ -45,6 +66,12 @@ class Range:
     def update(self):
         self.current = randint(self.lower, self.upper)
 
+    def get_state(self) -> dict:
+        return dict(current=self.current)
+
+    def set_state(self, state: dict):
+        self.current = state["current"]
+
 
 @dataclass(kw_only=True)
 class Glitch(HasLogger):
@@ -204,12 +231,14 @@ class Whisperer(HasLogger):
         sleep(0.05)
         self.scope.io.nrst = self.board_on_pin_state
 
-    def pre_arm(self) -> Generator[(int, int, int), None, None]:
+    def pre_arm(self) -> Generator[tuple[int, int, int], None, None]:
         for offset in self.offset:
             self.chipshouter.arm()
             self.restart_board()
             self.scope.glitch.ext_offset = offset
-            yield offset, self.chipshouter.voltage.current, self.glitch.repeat.current
+            voltage, repeat = self.chipshouter.voltage.current, self.glitch.repeat.current
+            events.emit(events.Arm(offset=offset, voltage=voltage, repeat=repeat))
+            yield offset, voltage, repeat
 
     def wait_for_probe_attachment(self):
         while not self.chipshouter.probe_attached():
@@ -221,6 +250,28 @@ class Whisperer(HasLogger):
         self.chipshouter.update()
         self.glitch.update(self.scope.glitch)
 
+    def get_state(self) -> dict:
+        """
+        Sweep position and the current random parameters, including the state of the generator
+        that draws the next ones.
+        """
+        return dict(
+            offset=self.offset.get_state(),
+            repeat=self.glitch.repeat.get_state(),
+            voltage=self.chipshouter.voltage.get_state() if self.chipshouter else None,
+            random=random.getstate(),
+        )
+
+    def set_state(self, state: dict):
+        self.offset.set_state(state["offset"])
+        self.glitch.repeat.set_state(state["repeat"])
+        self.scope.glitch.repeat = self.glitch.repeat.current
+        if self.chipshouter is not None and state["voltage"] is not None:
+            self.chipshouter.voltage.set_state(state["voltage"])
+            self.chipshouter.chipshouter.voltage = self.chipshouter.voltage.current
+        version, internal, gauss = state["random"]
+        random.setstate((version, tuple(internal), gauss))
+
     def reset(self):
         self.log.info("Resetting Whisperer")
         self.chipshouter.disarm()
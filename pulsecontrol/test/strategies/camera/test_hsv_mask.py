@@ -0,0 +1,67 @@
+import cv2
+import numpy as np
+import pytest
+
+from pulsecontrol.strategies.camera import (
+    ESPPcbCamera,
+    GenericPcbCamera,
+    NxpPcbCamera,
+    RectangleCamera,
+    SimplePcbCamera,
+    SpcPcbCamera,
+)
+
+# The masks as each camera built them before, as hue ranges, saturation and value
+REFERENCE = [
+    (SpcPcbCamera(spc=True), [(60, 120), (0, 0)], (5, 55), (35, 75)),
+    (ESPPcbCamera(esp32=True), [(60, 120)], (50, 180), (0, 250)),
+    (
+        RectangleCamera(rectangle=True),
+        [(57.5 - 12.5, 57.5 + 12.5)],
+        (115 - 35, 115 + 35),
+        (120 - 50, 120 + 50),
+    ),
+    (NxpPcbCamera(nxp=True), [(110 - 15, 110 + 12)], (50 - 18, 50 + 14), (40 - 12, 40 + 12)),
+    (SimplePcbCamera(simple=True), [(80, 110)], (190, 250), (45, 85)),
+    (GenericPcbCamera(generic=True), [(90 - 10, 90 + 6)], (56 - 12, 56 + 12), (63 - 10, 63 + 10)),
+]
+
+
+def reference_mask(image, hue_ranges, saturation_range, value_range):
+    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+    hue = np.zeros(hsv.shape[:2], np.uint8)
+    for lower, upper in hue_ranges:
+        hue = cv2.bitwise_or(hue, cv2.inRange(hsv[..., 0], lower, upper))
+    saturation = cv2.inRange(hsv[..., 1], *saturation_range)
+    value = cv2.inRange(hsv[..., 2], *value_range)
+
+    kernel = np.ones((5, 5), np.uint8)
+    masks = [cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel) for mask in (hue, saturation, value)]
+    combined = cv2.bitwise_and(cv2.bitwise_and(masks[0], masks[1]), masks[2])
+    combined = cv2.morphologyEx(combined, cv2.MORPH_OPEN, kernel)
+    return cv2.morphologyEx(combined, cv2.MORPH_OPEN, kernel)
+
+
+@pytest.mark.parametrize("camera, hue_ranges, saturation_range, value_range", REFERENCE)
+def test_fused_mask(camera, hue_ranges, saturation_range, value_range):
+    rng = np.random.default_rng(0)
+    # Blocks of colors around the thresholds, mixed with noise
+    hsv = np.stack(
+        [
+            rng.choice([bound for hue_range in hue_ranges for bound in hue_range], (30, 40)),
+            rng.choice(saturation_range, (30, 40)),
+            rng.choice(value_range, (30, 40)),
+        ],
+        axis=-1,
+    )
+    hsv = hsv + rng.integers(-2, 3, hsv.shape)
+    hsv = np.clip(hsv, 0, (179, 255, 255)).astype(np.uint8)
+    hsv = cv2.resize(hsv, (400, 300), interpolation=cv2.INTER_NEAREST)
+    image = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+    image[rng.random(image.shape[:2]) < 0.05] = rng.integers(0, 255, 3, dtype=np.uint8)
+
+    expected = reference_mask(image, hue_ranges, saturation_range, value_range)
+    assert expected.any()
+    mask = camera.combined_mask(image)
+    assert np.array_equal(mask, expected)
+    assert np.array_equal(camera.combine_and_morph(*camera.get_mask(image)), expected)
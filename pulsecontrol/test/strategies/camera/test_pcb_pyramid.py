@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+import pytest
+from pytest_mock import MockerFixture
+
+from pulsecontrol.strategies.camera import ESPPcbCamera
+from pulsecontrol.strategies.camera.strategy import Focus
+
+
+@pytest.fixture()
+def chip_image() -> np.ndarray:
+    image = np.zeros((900, 1200, 3), dtype=np.uint8)
+    color = cv2.cvtColor(np.uint8([[[90, 120, 200]]]), cv2.COLOR_HSV2BGR)[0, 0]
+    corners = cv2.boxPoints(((610.3, 420.7), (150, 150), 20)).round().astype(np.int32)
+    cv2.fillPoly(image, [corners], color.tolist())
+    return image
+
+
+@pytest.mark.parametrize("levels", [2, 3])
+def test_pyramid_matches_full_resolution(mocker: MockerFixture, chip_image, levels):
+    camera = ESPPcbCamera(esp32=True, focus=Focus(at=10, pixel_size=0.1))
+    mocker.patch.object(camera, "get_image", return_value=chip_image)
+    mocker.patch.object(camera, "get_resolution", return_value=np.array((1200, 900)))
+
+    (center, size, angle), *_ = camera.get_coordinate()
+    camera.pyramid_levels = levels
+    (pyramid_center, pyramid_size, pyramid_angle), *_ = camera.get_coordinate()
+
+    assert np.allclose(pyramid_center, (610.3, 420.7), atol=1)
+    assert np.allclose(pyramid_center, center, atol=1)
+    assert np.allclose(pyramid_size, size, atol=2)
+    assert pyramid_angle == pytest.approx(angle, abs=1)
+
+
+def test_pyramid_without_chip(mocker: MockerFixture):
+    camera = ESPPcbCamera(esp32=True, focus=Focus(at=10, pixel_size=0.1), pyramid_levels=2)
+    mocker.patch.object(camera, "get_image", return_value=np.zeros((900, 1200, 3), np.uint8))
+
+    assert list(camera.get_coordinate()) == []
@@ -0,0 +1,157 @@
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+import pytest
+from pytest_mock import MockerFixture
+
+from pulsecontrol.strategies.camera import strategy
+from pulsecontrol.strategies.camera.strategy import Calibration, Focus, PiCameraWrapper
+
+
+@dataclass(kw_only=True)
+class FakeCamera(PiCameraWrapper):
+    def get_coordinate(self):
+        raise NotImplementedError()
+
+
+@pytest.fixture()
+def camera(mocker: MockerFixture, tmp_path, monkeypatch) -> FakeCamera:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(strategy, "controls", mocker.MagicMock(), raising=False)
+    mocker.patch.object(strategy, "sleep")
+    picamera = mocker.MagicMock()
+    request = picamera.capture_request.return_value
+    request.make_array.return_value = np.zeros((4, 6, 3), dtype=np.uint8)
+    return FakeCamera(_camera=picamera, focus=Focus(at=10, pixel_size=0.1, lens_position=5))
+
+
+def test_single_capture(camera):
+    camera.get_image()
+    camera.get_image()
+
+    assert camera.camera.start.call_count == 2
+    assert camera.camera.stop.call_count == 2
+    assert camera.camera.set_controls.call_count == 2
+
+
+def test_streaming(camera):
+    camera.streaming = True
+    for _ in range(3):
+        assert camera.get_image().shape == (4, 6, 3)
+    camera.camera.capture_request.assert_called_with(flush=True)
+    assert camera.camera.start.call_count == 1
+    assert camera.camera.stop.call_count == 0
+    assert camera.camera.set_controls.call_count == 1
+
+    # Changing the focus mode refocuses without restarting the stream
+    camera.set_autofocus(True)
+    camera.get_image()
+    assert camera.camera.start.call_count == 1
+    camera.camera.autofocus_cycle.assert_called_once()
+
+    camera.latest_frame()
+    camera.camera.capture_array.assert_called_once_with("main")
+    camera.stop_camera()
+    with pytest.raises(ValueError):
+        camera.latest_frame()
+
+
+@pytest.fixture()
+def calibration_files(tmp_path) -> tuple:
+    matrix = np.array([[300.0, 0, 64], [0, 300.0, 48], [0, 0, 1]])
+    np.save(tmp_path / "matrix.npy", matrix)
+    np.save(tmp_path / "dist.npy", np.array([[-0.3, 0.1, 0.001, 0.001, 0.0]]))
+    return tmp_path / "matrix.npy", tmp_path / "dist.npy"
+
+
+@pytest.mark.parametrize("fixed_point", [True, False])
+def test_undistort_maps(calibration_files, fixed_point):
+    matrix_path, dist_path = calibration_files
+    calibration = Calibration(
+        matrix_path=matrix_path, distortion_coefficients_path=dist_path, fixed_point=fixed_point
+    )
+    image = np.random.default_rng(0).integers(0, 255, size=(96, 128, 3), dtype=np.uint8)
+
+    expected = cv2.undistort(image, calibration.matrix, calibration.distortion_coefficients)
+    difference = np.abs(calibration.undistort(image).astype(int) - expected)
+    assert np.median(difference) <= 1
+
+    # The tables are saved next to the calibration and used by the next instance
+    assert len(list(matrix_path.parent.glob("undistort-128x96-*.npz"))) == 1
+    cached = Calibration(
+        matrix_path=matrix_path, distortion_coefficients_path=dist_path, fixed_point=fixed_point
+    )
+    assert np.array_equal(cached.maps((128, 96))[0], calibration.maps((128, 96))[0])
+
+
+@pytest.mark.parametrize(
+    "rotation",
+    [None, cv2.ROTATE_90_CLOCKWISE, cv2.ROTATE_90_COUNTERCLOCKWISE, cv2.ROTATE_180],
+)
+def test_sensor_window(camera, rotation):
+    camera.image_rotation = rotation
+    width, height = camera.sensor_resolution()
+    frame = np.arange(width * height).reshape(height, width)
+    rotated = frame if rotation is None else cv2.rotate(frame.astype(np.int32), rotation)
+
+    x, y, w, h = camera.sensor_window((100, 300, 40, 70))
+    expected = rotated[300:370, 100:140]
+    window = frame[y : y + h, x : x + w]
+    assert np.array_equal(window if rotation is None else cv2.rotate(window, rotation), expected)
+
+
+@pytest.mark.parametrize("fixed_point", [True, False])
+def test_undistort_window(calibration_files, fixed_point):
+    matrix_path, dist_path = calibration_files
+    calibration = Calibration(
+        matrix_path=matrix_path, distortion_coefficients_path=dist_path, fixed_point=fixed_point
+    )
+    image = np.random.default_rng(0).integers(0, 255, size=(96, 128, 3), dtype=np.uint8)
+    expected = calibration.undistort(image)
+
+    for window in [(10, 20, 30, 40), (0, 0, 128, 96), (100, 70, 28, 26)]:
+        x, y, width, height = window
+        undistorted = calibration.undistort_window(image, (128, 96), window)
+        assert np.array_equal(undistorted, expected[y : y + height, x : x + width])
+
+        # Only the source window of the image is needed
+        (left, top, w, h), _, _ = calibration.window_maps((128, 96), window)
+        part = image[top : top + h, left : left + w]
+        undistorted = calibration.undistort_window(part, (128, 96), window, origin=(left, top))
+        assert np.array_equal(undistorted, expected[y : y + height, x : x + width])
+
+
+@pytest.mark.parametrize("sensor_crop", [False, True])
+def test_probe_window(mocker: MockerFixture, tmp_path, monkeypatch, calibration_files, sensor_crop):
+    from pulsecontrol.helpers import Point2D
+    from pulsecontrol.strategies.camera.probe_camera import Probe, ProbeCamera
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(strategy, "controls", mocker.MagicMock(), raising=False)
+    mocker.patch.object(strategy, "sleep")
+    matrix_path, dist_path = calibration_files
+    frame = np.random.default_rng(0).integers(0, 255, size=(96, 128, 3), dtype=np.uint8)
+    picamera = mocker.MagicMock()
+    request = picamera.capture_request.return_value
+    request.make_array.return_value = frame
+
+    probe = ProbeCamera(
+        _camera=picamera,
+        focus=Focus(at=10, pixel_size=0.1, lens_position=5),
+        probe_type=Probe.SMALL,
+        calibration=Calibration(matrix_path=matrix_path, distortion_coefficients_path=dist_path),
+        crop_upper_edge=Point2D(30, 50),
+        crop_width=40,
+    )
+    probe.get_resolution = lambda: Point2D(96, 128)
+    expected = probe.crop_image(probe.get_image())
+
+    probe.sensor_crop = sensor_crop
+    if sensor_crop:
+        left, top, width, height = probe.source_window()
+        assert probe.output_size() == (width, height)
+        assert probe.camera_controls() == dict(ScalerCrop=(left, top, width, height))
+        request.make_array.return_value = frame[top : top + height, left : left + width]
+    assert np.array_equal(probe.get_window(), expected)
+    assert len(list(tmp_path.glob("results/*-probe.jpg"))) == 1
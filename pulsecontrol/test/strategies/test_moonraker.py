@@ -0,0 +1,268 @@
+import asyncio
+import json
+from threading import Thread
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pulsecontrol.strategies.control.async_moonraker import AsyncMoonraker
+from pulsecontrol.strategies.control.coordinate_frame import CoordinateFrame
+from pulsecontrol.strategies.control.moonraker import Moonraker
+from pulsecontrol.strategies.control.moonraker_websocket import MoonrakerWebsocket
+from pulsecontrol.strategies.movement import MovementError
+
+ENDPOINT = "http://printer"
+
+
+@pytest.fixture()
+def moonraker() -> Moonraker:
+    return Moonraker(endpoint=ENDPOINT)
+
+
+def test_session_is_reused(requests_mock, moonraker):
+    requests_mock.post(ENDPOINT + "/printer/gcode/script", json={"result": "ok"})
+
+    moonraker.move_to(1, 2)
+    moonraker.home()
+
+    assert moonraker.session is moonraker.session
+    assert requests_mock.call_count == 3
+    assert requests_mock.request_history[0].qs["script"] == ["g90\ng1 x1.0000 y2.0000"]
+    assert moonraker.latency.counters["/printer/gcode/script"].count == 3
+
+
+def printer_status(position: list[float], gcode_position: list[float] | None = None) -> dict:
+    return {
+        "result": {
+            "status": {
+                "toolhead": {"position": [*position, 0.0]},
+                "gcode_move": {
+                    "position": [*position, 0.0],
+                    "gcode_position": [*(gcode_position or position), 0.0],
+                    "absolute_coordinates": True,
+                },
+            }
+        }
+    }
+
+
+def test_query_position(requests_mock, moonraker):
+    requests_mock.post(ENDPOINT + "/printer/objects/query", json=printer_status([1.0, 2.0, 3.0]))
+
+    assert moonraker.query_position() == (1.0, 2.0, 3.0)
+    assert moonraker.latency.counters["/printer/objects/query"].count == 1
+
+
+def test_cached_position(requests_mock, moonraker):
+    query = requests_mock.post(
+        ENDPOINT + "/printer/objects/query",
+        json=printer_status([10.0, 20.0, 30.0], [10.0, 20.0, 25.0]),
+    )
+    requests_mock.post(ENDPOINT + "/printer/gcode/script", json={"result": "ok"})
+
+    moonraker.query_position()
+    moonraker.move_rel(1, 1)
+    moonraker.move_to(z=5)
+    moonraker.add_offset(z_offset=-2)
+    moonraker.move_to(z=0)
+
+    assert query.call_count == 1
+    assert requests_mock.request_history[-3].qs["script"] == ["g92 z8.0"]
+    # After the G92, gcode z=0 is at toolhead z=2
+    assert moonraker.query_position() == (11.0, 21.0, 2.0)
+    assert query.call_count == 1
+
+    moonraker.send_gcode("PROBE")
+    moonraker.query_position()
+    assert query.call_count == 2
+
+
+def test_frame_homing_and_unknown_commands():
+    frame = CoordinateFrame()
+    frame.sync([1, 2, 3, 0], [1, 2, 3, 0], [1, 2, 3, 0], True)
+    frame.apply("G28 X")
+    assert frame.position == [None, 2, 3]
+    assert not frame.synced
+
+    frame.sync([1, 2, 3, 0], [1, 2, 3, 0], [1, 2, 3, 0], True)
+    frame.apply("SET_LED LED=chip_led WHITE=0.1\nM400")
+    assert frame.synced
+    frame.apply("SET_GCODE_OFFSET Z=0.1")
+    assert not frame.synced
+
+
+def test_movement_error(requests_mock, moonraker):
+    requests_mock.post(
+        ENDPOINT + "/printer/gcode/script",
+        json={"error": {"code": 400, "message": "Move out of range"}},
+    )
+
+    with pytest.raises(MovementError):
+        moonraker.move_rel(z=-100)
+
+
+def test_reset_closes_session(requests_mock, moonraker):
+    requests_mock.post(ENDPOINT + "/printer/gcode/script", json={"result": "ok"})
+    session = moonraker.session
+    moonraker.home()
+
+    moonraker.reset()
+
+    assert moonraker.latency.counters == {}
+    assert moonraker.session is not session
+
+
+@pytest.fixture()
+def websocket_printer():
+    """
+    Minimal moonraker websocket, every gcode script moves the toolhead by one millimeter in x.
+    """
+    status = {
+        "toolhead": {
+            "position": [0.0, 0.0, 0.0, 0.0],
+            "homed_axes": "xy",
+            "axis_maximum": [1, 2, 3, 0],
+        },
+        "gcode_move": {},
+        "idle_timeout": {"state": "Ready"},
+    }
+
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for message in ws:
+            data = json.loads(message.data)
+            match data["method"]:
+                case "printer.gcode.script":
+                    status["toolhead"]["position"][0] += 1
+                    await ws.send_json(dict(jsonrpc="2.0", result="ok", id=data["id"]))
+                case _:
+                    await ws.send_json(
+                        dict(jsonrpc="2.0", result=dict(status=status), id=data["id"])
+                    )
+        return ws
+
+    loop = asyncio.new_event_loop()
+    thread = Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    app = web.Application()
+    app.router.add_get("/websocket", handler)
+    runner = web.AppRunner(app)
+    asyncio.run_coroutine_threadsafe(runner.setup(), loop).result()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    asyncio.run_coroutine_threadsafe(site.start(), loop).result()
+    port = runner.addresses[0][1]
+
+    printer = MoonrakerWebsocket(endpoint=f"http://127.0.0.1:{port}", websocket=True)
+    yield printer
+    printer.reset()
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def test_websocket_mirror(websocket_printer):
+    assert websocket_printer.get_homed() == (True, True, False)
+    assert websocket_printer.get_limits() == [1, 2, 3]
+    assert websocket_printer.query_position() == (0.0, 0.0, 0.0)
+    # Reads without a command in between don't ask the printer
+    websocket_printer.query_position()
+    assert "printer.objects.query" not in websocket_printer.latency.counters
+
+    websocket_printer.move_to(1, 0)
+
+    assert websocket_printer.query_position() == (2.0, 0.0, 0.0)
+    assert websocket_printer.latency.counters["printer.gcode.script"].count == 2
+    assert websocket_printer.latency.counters["printer.objects.query"].count == 1
+
+
+def test_websocket_status_update(websocket_printer):
+    websocket_printer.connect()
+    websocket_printer.update_status({"idle_timeout": {"state": "Printing"}})
+
+    assert not websocket_printer.wait_for_status(
+        "idle_timeout", "state", lambda s: s != "Printing", timeout=0.01
+    )
+    assert websocket_printer.status["toolhead"]["homed_axes"] == "xy"
+
+
+def test_motion_plan_single_request(requests_mock, moonraker):
+    requests_mock.post(ENDPOINT + "/printer/gcode/script", json={"result": "ok"})
+
+    with moonraker.plan() as plan:
+        plan.move_to(z=60).move_rel(1, 2, speed=3000)
+        plan.set_led("probe_led", 1)
+        plan.dwell(0.5)
+
+    assert requests_mock.call_count == 1
+    assert requests_mock.request_history[0].qs["script"] == [
+        "g90\ng1 z60.0000\ng91\ng1 x1.0000 y2.0000 f3000\n"
+        "set_led led=probe_led white=1\ng4 p500\nm400"
+    ]
+    assert plan.commands == []
+
+
+def test_motion_plan_not_sent_on_error(requests_mock, moonraker):
+    requests_mock.post(ENDPOINT + "/printer/gcode/script", json={"result": "ok"})
+
+    with pytest.raises(ValueError):
+        with moonraker.plan() as plan:
+            plan.move_to(z=60)
+            raise ValueError()
+
+    assert requests_mock.call_count == 0
+
+
+def test_async_moves_overlap():
+    async def script(request):
+        await asyncio.sleep(0.05)
+        return web.json_response({"result": "ok"})
+
+    async def run():
+        app = web.Application()
+        app.router.add_post("/printer/gcode/script", script)
+        async with TestServer(app) as server:
+            printer = AsyncMoonraker(endpoint=str(server.make_url("")).rstrip("/"))
+            move = asyncio.create_task(printer.move_to(1, 2))
+            # Other work can run while the printer moves
+            await asyncio.sleep(0)
+            assert not move.done()
+            await move
+
+            async with printer.plan() as plan:
+                plan.move_to(z=1).move_rel(x=1)
+            await printer.close()
+            return printer.latency.counters["/printer/gcode/script"].count
+
+    assert asyncio.run(run()) == 3
+
+
+def test_async_reset_from_another_thread():
+    async def script(request):
+        return web.json_response({"result": "ok"})
+
+    async def start_server() -> TestServer:
+        app = web.Application()
+        app.router.add_post("/printer/gcode/script", script)
+        server = TestServer(app)
+        await server.start_server()
+        return server
+
+    loop = asyncio.new_event_loop()
+    thread = Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        server = asyncio.run_coroutine_threadsafe(start_server(), loop).result(5)
+        printer = AsyncMoonraker(endpoint=str(server.make_url("")).rstrip("/"))
+        asyncio.run_coroutine_threadsafe(printer.move_to(1, 2), loop).result(5)
+        session = printer.session
+
+        # The session is closed on its loop before reset returns
+        printer.reset()
+        assert session.closed
+        assert printer._session is None
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
@@ -1,3 +1,6 @@
+import json
+from types import SimpleNamespace
+
 import numpy as np
 import pytest
 from matplotlib import pyplot as plt
@@ -5,10 +8,15 @@ from matplotlib.patches import Rectangle
 from more_itertools import take
 from pytest import approx
 
-from pulsecontrol.helpers import Point2D
+from pulsecontrol.helpers import Point2D, PointArray
+from pulsecontrol.helpers.results import AttackResults
+from pulsecontrol.strategies.movement.adaptive import Adaptive
 from pulsecontrol.strategies.movement.fix_point import FixPoint
 from pulsecontrol.strategies.movement.gaussian import Gaussian
 from pulsecontrol.strategies.movement.grid import Grid
+from pulsecontrol.strategies.movement.low_discrepancy import LowDiscrepancy, Sequence
+from pulsecontrol.strategies.movement.ordered import Order, Ordered, path_length, two_opt
+from pulsecontrol.strategies.movement.refine import Refine
 
 
 def test_grid():
@@ -61,3 +69,170 @@ def test_fix_point_movement():
     for x, y in take(20, fix_point):
         assert 0.321 == approx(x)
         assert 0.5543 == approx(y)
+
+
+def test_ordered_grid():
+    grid = Ordered(points=Grid(step_x=3, step_y=4), order=Order.SERPENTINE)
+    points = np.array([p.to_tuple() for p in grid])
+
+    assert len(points) == grid.total_movements == 12
+    # Only steps to direct neighbours: two steps in each of the four rows and three row changes
+    assert path_length(points) == approx(4 * 2 / 4 + 3 / 5)
+
+
+@pytest.mark.parametrize("order", [Order.NEAREST, Order.HILBERT])
+def test_ordered_gaussian_is_shorter(order):
+    gaussian = Gaussian(var=0.3, center=Point2D(0.5, 0.5), iterations=200, seed=0)
+    original = gaussian.to_array()
+    ordered = Ordered(points=gaussian, order=order)
+    points = np.array([p.to_tuple() for p in ordered])
+
+    assert sorted(map(tuple, points)) == sorted(map(tuple, original))
+    assert path_length(points) < path_length(original) / 4
+
+
+def test_two_opt_removes_crossing():
+    points = np.array([[0, 0], [1, 1], [1, 0], [0, 1]], dtype=float)
+    order = two_opt(points, np.arange(4), np.array([0.0, 0.0]), passes=2)
+
+    assert path_length(points[order]) == approx(3)
+
+
+def test_ordered_reset_continues_at_last_point():
+    ordered = Ordered(points=Grid(step_x=3, step_y=3), order=Order.SERPENTINE)
+    last = list(ordered)[-1]
+    ordered.reset()
+
+    assert next(ordered) == last
+
+
+def test_grid_plan():
+    grid = Grid(step_x=3, step_y=4, offset_x=0.25)
+    plan = grid.to_array()
+
+    assert plan.shape == (grid.total_movements, 2) == (4, 2)
+    assert plan[:, 0] == approx([0.5] * 4)
+    assert plan[:, 1] == approx([0.2, 0.4, 0.6, 0.8])
+    # Iterating returns the same points, as separate objects
+    points = list(grid)
+    assert [p.to_tuple() for p in points] == [tuple(p) for p in plan.tolist()]
+    assert points[0] is not points[1]
+
+
+def test_gaussian_seed():
+    first = Gaussian(var=0.1, center=Point2D(0.5, 0.5), iterations=50, seed=42)
+    second = Gaussian(var=0.1, center=Point2D(0.5, 0.5), iterations=50, seed=42)
+
+    assert first.to_array() == approx(second.to_array())
+    assert [p.to_tuple() for p in first] == [tuple(p) for p in second.to_array().tolist()]
+    first.reset()
+    # A new run draws new samples
+    assert first.to_array() != approx(second.to_array())
+
+
+def test_gaussian_infinite():
+    gaussian = Gaussian(var=0.1, center=Point2D(0.5, 0.5), seed=1)
+
+    assert len(take(3000, gaussian)) == 3000
+    with pytest.raises(ValueError):
+        gaussian.to_array()
+
+
+def test_adaptive_moves_to_hotspot():
+    adaptive = Adaptive(adaptive=True, cells_x=4, cells_y=4, seed=0)
+    # Stand-ins for `Attack`, the effects are enums with these values
+    hit = SimpleNamespace(effect="reboot")
+    miss = SimpleNamespace(effect="no_effect")
+
+    for point in take(200, adaptive):
+        x, y = point.to_tuple()
+        # The hotspot is in the lower right cell
+        results = [hit] * 5 if x > 0.75 and y > 0.75 else [miss] * 5
+        adaptive.feedback(AttackResults(point.to_tuple(), (0, 0), 1, results=results))
+
+    assert adaptive.probability()[3, 3] > 0.8
+    assert np.unravel_index(np.argmax(adaptive.probability()), (4, 4)) == (3, 3)
+    later = [p.to_tuple() for p in take(50, adaptive)]
+    assert sum(x > 0.75 and y > 0.75 for x, y in later) > 40
+
+
+def test_refine_only_splits_cells_with_effects():
+    refine = Refine(refine=True, coarse_x=4, coarse_y=4, min_step=0.05)
+    levels = []
+    for point in refine:
+        x, y = point.to_tuple()
+        levels.append(refine.level)
+        # Small hotspot in the upper left corner
+        effect = "reboot" if x < 0.15 and y < 0.15 else "no_effect"
+        refine.feedback(AttackResults(point.to_tuple(), (0, 0), 1, [SimpleNamespace(effect=effect)]))
+
+    # 16 coarse cells, then 4 cells of each following level, down to 1/16 of the chip
+    assert levels == [0] * 16 + [1] * 4 + [2] * 4
+    assert point.to_tuple() == approx((3 / 32, 3 / 32))
+
+
+@pytest.mark.parametrize("sequence", [Sequence.SOBOL, Sequence.HALTON])
+def test_low_discrepancy_covers_evenly(sequence):
+    points = LowDiscrepancy(sequence=sequence, iterations=256, seed=3).to_array()
+
+    # Every cell of a 4x4 grid gets close to the same share
+    counts, _, _ = np.histogram2d(points[:, 0], points[:, 1], bins=4, range=[[0, 1], [0, 1]])
+    assert counts.min() >= 12 and counts.max() <= 20
+
+
+def test_low_discrepancy_resume_and_exclusion():
+    full = LowDiscrepancy(sequence=Sequence.SOBOL, iterations=100, exclude=[(0, 0, 0.5, 0.5)])
+    points = list(full)
+    assert not any(x <= 0.5 and y <= 0.5 for x, y in (p.to_tuple() for p in points))
+
+    first = LowDiscrepancy(sequence=Sequence.SOBOL, iterations=40, exclude=[(0, 0, 0.5, 0.5)])
+    head = list(first)
+    rest = LowDiscrepancy(
+        sequence=Sequence.SOBOL, iterations=60, exclude=[(0, 0, 0.5, 0.5)], start_index=first.index
+    )
+    assert head + list(rest) == points
+
+
+@pytest.mark.parametrize(
+    "create",
+    [
+        lambda: Grid(step_x=3, step_y=3),
+        lambda: Gaussian(var=0.2, center=Point2D(0.5, 0.5), iterations=20, seed=1),
+        lambda: Ordered(points=Grid(step_x=4, step_y=4)),
+        lambda: LowDiscrepancy(sequence=Sequence.HALTON, iterations=20),
+        lambda: Adaptive(adaptive=True, iterations=20, seed=1),
+        lambda: Refine(refine=True),
+    ],
+)
+def test_movement_state_round_trip(create):
+    original = create()
+    take(5, original)
+    state = json.loads(json.dumps(original.get_state()))
+    expected = [p.to_tuple() for p in take(10, original)]
+
+    restored = create()
+    restored.set_state(state)
+    assert [p.to_tuple() for p in take(10, restored)] == expected
+
+
+def test_point_arithmetic():
+    point = Point2D(1.0, 2.0)
+
+    assert point * 2 == Point2D(2.0, 4.0)
+    assert point - (1, 1) == Point2D(0.0, 1.0)
+    assert point / Point2D(2.0, 4.0) == Point2D(0.5, 0.5)
+    assert tuple(point) == (1.0, 2.0)
+    assert np.asarray(point).tolist() == [1.0, 2.0]
+    assert not hasattr(point, "__dict__")
+
+
+def test_point_array():
+    points = Grid(step_x=3, step_y=4).to_points()
+
+    assert len(points) == 12
+    assert points[0] == Point2D(*points.data[0])
+    shifted = points * (2, 4) - Point2D(1.0, 1.0)
+    assert shifted.data == approx(points.data * (2, 4) - 1)
+    assert [point.to_tuple() for point in shifted] == shifted.to_list()
+    assert PointArray.from_points(list(points)) == points
+    assert shifted[1:].x == approx(shifted.data[1:, 0])
@@ -0,0 +1,78 @@
+import threading
+
+import numpy as np
+import pytest
+from pytest_mock import MockerFixture
+
+from pulsecontrol.helpers.checkpoint import Checkpoint
+from pulsecontrol.helpers.results import RESULTS_NAME, read_results
+from pulsecontrol.strategies.camera.probe_camera import Probe
+from pulsecontrol.strategies.integrator.advanced_attacker import AdvancedAttacker
+from pulsecontrol.strategies.movement.low_discrepancy import LowDiscrepancy, Sequence
+
+
+@pytest.fixture()
+def attacker(mocker: MockerFixture, tmp_path, monkeypatch) -> AdvancedAttacker:
+    monkeypatch.chdir(tmp_path)
+    attack = mocker.MagicMock()
+    attack.move.return_value = True
+    attack.get_state.return_value = {}
+    return AdvancedAttacker(
+        probe_camera=mocker.MagicMock(probe_type=Probe.SMALL),
+        pcb_camera=mocker.MagicMock(),
+        printer=mocker.MagicMock(),
+        movement_strategy=LowDiscrepancy(sequence=Sequence.SOBOL),
+        attack=attack,
+        glitch_height=1.0,
+        probe_height=2.0,
+        chip_position=(np.array((100.0, 100.0)), np.array((5.0, 5.0)), 0.0),
+        chip_surface_height=3.0,
+    )
+
+
+def test_reset_from_another_thread(attacker):
+    attempts = 0
+
+    def check_results():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 10:
+            # Like `/reset`, while the attack loop is running
+            reset = threading.Thread(target=attacker.reset)
+            reset.start()
+            reset.join()
+        return [{"effect": "none"}]
+
+    attacker.attack.check_results.side_effect = check_results
+    experiment = threading.Thread(target=attacker.continue_experiment)
+    experiment.start()
+    experiment.join(10)
+    assert not experiment.is_alive()
+
+    # The attempt during the reset is written and the checkpoint continues after it
+    directory = attacker._out_path
+    assert len(list(read_results(directory / RESULTS_NAME))) == 10
+    checkpoint = Checkpoint.load(directory)
+    assert checkpoint.movement["index"] == 10
+    assert checkpoint.at_position == 10
+
+    # Everything is reset after the checkpoint was written
+    assert attacker.movement_strategy.index == 0
+    assert attacker.results.path is None or attacker.results.count == 0
+
+    # Resuming continues with the next point of the sweep
+    resumed = LowDiscrepancy(sequence=Sequence.SOBOL)
+    resumed.set_state(checkpoint.movement)
+    expected = LowDiscrepancy(sequence=Sequence.SOBOL)
+    assert next(resumed) == [next(expected) for _ in range(11)][-1]
+
+
+def test_stop_before_the_survey(attacker):
+    # Nothing to save or register, the original error isn't hidden
+    attacker.chip_position = None
+    attacker.printer.move_to.side_effect = RuntimeError("printer offline")
+
+    with pytest.raises(RuntimeError, match="printer offline"):
+        attacker.continue_experiment()
+    assert attacker.movement_strategy.index == 0
+    attacker.attack.reset.assert_called()
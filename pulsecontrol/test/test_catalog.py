@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from pulsecontrol.helpers.catalog import CONFIG_NAME, Catalog
+from pulsecontrol.helpers.result_store import ResultStore
+from pulsecontrol.helpers.results import ResultWriter
+
+
+def campaign(results, name: str, voltages: list[int], effect: str = "no_effect"):
+    directory = results / name
+    directory.mkdir()
+    (directory / CONFIG_NAME).write_text(json.dumps({"glitch_height": 0.8}))
+    with ResultWriter() as writer:
+        writer.open(directory)
+        attacks = [
+            {"effect": effect, "offset": 100, "voltage": voltage, "repeat": 1}
+            for voltage in voltages
+        ]
+        writer.write(
+            {"image_coords": [0, 0], "world_coords": [1, 1], "iteration": 1, "results": attacks}
+        )
+    return directory
+
+
+@pytest.fixture()
+def catalog(tmp_path):
+    results = tmp_path / "results"
+    results.mkdir()
+    with Catalog(path=results / "catalog.sqlite") as catalog:
+        catalog.register(campaign(results, "2024-01-01", [150, 200], "reboot"), target="EspAttack")
+        catalog.register(campaign(results, "2024-02-01", [400, 500]), target="BamAttack")
+        yield catalog
+
+
+def test_register(catalog):
+    entry = catalog.list(target="EspAttack")[0]
+
+    assert entry.campaign == "2024-01-01"
+    assert entry.config == {"glitch_height": 0.8}
+    assert entry.summary.attempts == 2
+    assert entry.summary.effect_rate == 1.0
+    assert entry.summary.voltage == [150, 200]
+
+
+def test_list_ranges(catalog):
+    assert [e.campaign for e in catalog.list()] == ["2024-01-01", "2024-02-01"]
+    assert [e.campaign for e in catalog.list(voltage=(190, 300))] == ["2024-01-01"]
+    assert [e.campaign for e in catalog.list(voltage=(300, 350))] == []
+    assert catalog.list(min_attempts=3) == []
+
+
+def test_scan_and_merge(catalog, tmp_path):
+    results = tmp_path / "results"
+    campaign(results, "2023-12-01", [300])
+    (results / "empty").mkdir()
+
+    assert [e.campaign for e in catalog.scan(results)] == ["2023-12-01"]
+    assert catalog.scan(results) == []
+    with ResultStore(path=tmp_path / "merged.sqlite") as store:
+        assert catalog.merge(catalog.list(offset=(100, 100)), store) == 5
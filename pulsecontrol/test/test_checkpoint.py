@@ -0,0 +1,51 @@
+import json
+from enum import Enum
+
+from pulsecontrol.helpers.checkpoint import Checkpoint, latest_checkpoint
+from pulsecontrol.helpers.results import AttackResults, json_default
+
+
+def test_checkpoint_round_trip(tmp_path):
+    checkpoint = Checkpoint(
+        movement={"index": 3},
+        attack={"counter": 1},
+        chip_position=([100.0, 120.0], [4.0, 5.0], 1.5),
+        chip_surface_height=2.5,
+        point=(0.25, 0.5),
+        at_position=3,
+    )
+    checkpoint.save(tmp_path)
+
+    loaded = Checkpoint.load(tmp_path)
+    assert loaded.movement == {"index": 3}
+    assert loaded.point == [0.25, 0.5]
+    assert loaded.chip_surface_height == 2.5
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_latest_checkpoint(tmp_path):
+    assert latest_checkpoint(tmp_path) is None
+    for name in ("2024-01-02T100000", "2024-03-01T100000", "2024-02-01T100000"):
+        (tmp_path / name).mkdir()
+        Checkpoint(
+            movement={}, attack={}, chip_position=([], [], 0), chip_surface_height=None
+        ).save(tmp_path / name)
+    (tmp_path / "2024-04-01T100000").mkdir()
+
+    assert latest_checkpoint(tmp_path) == tmp_path / "2024-03-01T100000"
+
+
+def test_results_with_enums():
+    class Effect(Enum):
+        REBOOT = "reboot"
+
+    results = [AttackResults((0.5, 0.5), (1.0, 2.0), 1, results=[{"effect": Effect.REBOOT}])]
+
+    assert json.loads(json.dumps(results, default=json_default)) == [
+        {
+            "image_coords": [0.5, 0.5],
+            "world_coords": [1.0, 2.0],
+            "iteration": 1,
+            "results": [{"effect": "reboot"}],
+        }
+    ]
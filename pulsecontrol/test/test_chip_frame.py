@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+import pytest
+
+from pulsecontrol.helpers.chip_frame import ChipFrame
+
+RECTANGLE = ((100.0, 120.0), (4.0, 5.0), 30.0)
+
+
+def transform_point(rectangle, point: np.ndarray) -> np.ndarray:
+    # The transform `AdvancedAttacker` used per point
+    center, size, angle = (np.asarray(rectangle[0]), np.asarray(rectangle[1]), rectangle[2])
+    rotation = cv2.getRotationMatrix2D(center, -angle, 1)
+    point = point * size + center - size / 2
+    return cv2.transform(np.array([[point]]), rotation)[0][0]
+
+
+def test_matches_rotation():
+    points = np.random.default_rng(0).uniform(size=(20, 2))
+    frame = ChipFrame.from_rectangle(RECTANGLE)
+
+    expected = [transform_point(RECTANGLE, point) for point in points]
+    assert frame.to_frame(points) == pytest.approx(np.asarray(expected))
+    assert frame.to_frame(points[0]).shape == (2,)
+    assert frame.to_frame((0.5, 0.5)) == pytest.approx(RECTANGLE[0])
+
+
+def test_round_trip():
+    points = np.random.default_rng(1).uniform(size=(20, 2))
+    frame = ChipFrame.from_rectangle(RECTANGLE)
+
+    assert frame.to_chip(frame.to_frame(points)) == pytest.approx(points)
+
+
+def test_image_to_world():
+    image = ChipFrame.from_rectangle(((1200, 800), (400, 500), 30.0))
+    world = ChipFrame.from_rectangle(RECTANGLE)
+    corners = np.array([(0, 0), (1, 0), (1, 1), (0, 1)], dtype=float)
+
+    assert image.to_other(image.to_frame(corners), world) == pytest.approx(world.to_frame(corners))
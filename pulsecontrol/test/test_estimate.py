@@ -0,0 +1,101 @@
+import json
+
+import pytest
+import requests
+from pytest import approx
+
+from pulsecontrol.helpers import ConfigurationError
+from pulsecontrol.helpers.estimate import CampaignEstimator, PhaseTimings, logged_durations
+
+
+@pytest.fixture()
+def config() -> dict:
+    return {
+        "movement_strategy": {"step_x": 3, "step_y": 4},
+        "attack": {
+            "esp": True,
+            "move_after": 2,
+            "whisperer": {"offset": {"start": 100, "end": 120, "step": 2}},
+        },
+    }
+
+
+def test_estimate_attack(config):
+    timings = PhaseTimings(boot=2, arm=0, restart=0, attempt=0.5, request=0, survey=0)
+    estimate = CampaignEstimator(timings=timings).estimate(config, passes=2, skip_init=True)
+
+    assert estimate.positions == 12
+    # 12 positions, 2 starts each, 10 offsets per start
+    assert estimate.attempts == 12 * 2 * 10 * 2
+    assert estimate.attack == approx(2 * 12 * 2 * (2 + 10 * 0.5))
+    assert estimate.setup == 0
+    assert estimate.travel > 0
+    assert estimate.total == approx(estimate.attack + estimate.travel)
+
+
+def test_ordered_travel_is_shorter(config):
+    estimator = CampaignEstimator()
+    plain = estimator.estimate(config)
+    config["movement_strategy"] = {"points": config["movement_strategy"], "order": "serpentine"}
+    ordered = estimator.estimate(config)
+
+    assert ordered.positions == plain.positions
+    assert ordered.travel < plain.travel
+
+
+def test_endless_movement(config):
+    config["movement_strategy"] = {"position": [0.5, 0.5]}
+
+    with pytest.raises(ConfigurationError):
+        CampaignEstimator().estimate(config)
+    assert CampaignEstimator().estimate(config, positions=5).positions == 5
+
+
+def test_calibrate(tmp_path):
+    results = tmp_path / "glitches.json"
+    attacks = [{"effect": "no_effect"}] * 3 + [{"effect": "reboot"}]
+    results.write_text(json.dumps([{"results": attacks}]))
+    log = tmp_path / "run.log"
+    log.write_text("Experiment Duration: 0.25\n...\nExperiment Duration: 0.75\n")
+
+    assert PhaseTimings().calibrate(result_files=[results]).effect_rate == 0.25
+    calibrated = PhaseTimings().calibrate(log_files=[log], result_files=[results])
+    assert calibrated.attempt == 0.5
+    assert calibrated.effect_rate == 0
+
+
+def test_logged_durations(tmp_path):
+    log = tmp_path / "run.log"
+    log.write_text("Experiment Duration: 0.25\nExperiment Duration: 0.5")
+    first = logged_durations(log)
+    assert (first.count, first.total) == (1, 0.25)
+    # Only the rest of the file is read, including the line that was incomplete before
+    with open(log, "a") as file:
+        file.write("\nExperiment Duration: 0.75\n")
+    assert (logged_durations(log).count, logged_durations(log).total) == (3, 1.5)
+
+    log.write_text("Experiment Duration: 1.0\n")
+    assert logged_durations(log).total == 1.0
+
+
+def test_printer_limits(requests_mock, config):
+    status = {"result": {"status": {"toolhead": {"axis_maximum": [520, 490, 270, 0]}}}}
+    requests_mock.post("http://printer/printer/objects/query", json=status)
+    config["printer"] = {"endpoint": "http://printer"}
+    estimator = CampaignEstimator()
+    default = estimator.setup_time()
+
+    assert estimator.query_limits(config)
+    assert estimator.kinematics.axis_maximum == (520, 490, 270)
+    # Homing the larger printer takes longer
+    assert estimator.setup_time() > default
+
+
+def test_unreachable_printer(requests_mock, config):
+    requests_mock.post("http://printer/printer/objects/query", exc=requests.ConnectionError)
+    config["printer"] = {"endpoint": "http://printer"}
+    estimator = CampaignEstimator()
+
+    assert not estimator.query_limits(config)
+    assert estimator.kinematics.axis_maximum == CampaignEstimator().kinematics.axis_maximum
+    assert not CampaignEstimator().query_limits({})
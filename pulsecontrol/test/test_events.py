@@ -0,0 +1,47 @@
+import logging
+from enum import Enum
+
+import pytest
+
+from pulsecontrol.helpers import events
+from pulsecontrol.helpers.events import EVENT_LOGGER, EventHandler, read_events
+
+
+class Effect(Enum):
+    REBOOT = "reboot"
+
+
+@pytest.fixture()
+def event_log(tmp_path):
+    path = tmp_path / "run.events.jsonl"
+    handler = EventHandler(path)
+    logger = logging.getLogger(EVENT_LOGGER)
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    yield path
+    logger.removeHandler(handler)
+    handler.close()
+
+
+def test_round_trip(event_log):
+    events.emit(events.Move(chip=(0.5, 0.5), world=(100.0, 120.0), position=1))
+    events.emit(events.Arm(offset=100, voltage=300, repeat=2))
+    events.emit(events.Effect(effect=Effect.REBOOT, offset=100, voltage=300, repeat=2, duration=1))
+    # Plain log records don't end up in the event log
+    logging.getLogger(EVENT_LOGGER).info("not an event")
+    events.emit(events.Reset(source="AdvancedAttacker"))
+
+    read = list(read_events(event_log))
+    assert [event.kind for event in read] == ["move", "arm", "effect", "reset"]
+    assert read[0].position == 1
+    assert read[2].effect == "reboot"
+
+
+def test_filter_kinds(event_log):
+    events.emit(events.Attack(sweep=1))
+    events.emit(events.Overheat())
+    with open(event_log, "a") as log:
+        log.write('{"kind": "unknown"}\n{"kind": "attack", "sw')
+
+    assert [event.kind for event in read_events(event_log, kinds=["overheat"])] == ["overheat"]
+    assert len(list(read_events(event_log))) == 2
@@ -0,0 +1,86 @@
+import json
+
+import numpy as np
+import pytest
+
+from pulsecontrol.helpers.result_store import ResultStore
+from pulsecontrol.helpers.results import ResultWriter
+
+
+def attack(effect: str, voltage: int) -> dict:
+    return {"effect": effect, "offset": 100, "voltage": voltage, "repeat": 1, "timestamp": 1.0}
+
+
+@pytest.fixture()
+def store(tmp_path):
+    campaign = tmp_path / "2024-01-01T100000"
+    campaign.mkdir()
+    with ResultWriter() as writer:
+        writer.open(campaign)
+        # Two cells of 0.1 mm, the first only has successes at high voltages
+        writer.write(
+            {
+                "image_coords": [0.1, 0.1],
+                "world_coords": [10.01, 20.01],
+                "iteration": 1,
+                "results": [attack("success", 450), attack("no_effect", 300)],
+            }
+        )
+        writer.write(
+            {
+                "image_coords": [0.9, 0.9],
+                "world_coords": [10.15, 20.01],
+                "iteration": 2,
+                "results": [attack("no_effect", 450), attack("reboot", 450)],
+            }
+        )
+    with ResultStore(path=tmp_path / "results.sqlite") as result_store:
+        result_store.import_campaign(campaign)
+        yield result_store
+
+
+def test_import_replaces(store, tmp_path):
+    assert store.count() == 4
+    assert store.import_campaign(tmp_path / "2024-01-01T100000") == 4
+    assert store.count() == 4
+
+
+def test_cell_rates(store):
+    rates = store.cell_rates(0.1, voltage=(400, 1000))
+
+    assert rates.x == pytest.approx([10.0, 10.1])
+    assert rates.attempts.tolist() == [1, 2]
+    assert rates.rate.tolist() == [1.0, 0.0]
+    assert store.cell_rates(0.1, effects=("reboot",)).successes.tolist() == [0, 1]
+
+
+def test_area(store):
+    attempts = store.attempts(area=(10.1, 20.0, 10.2, 20.1))
+
+    assert attempts["effect"].tolist() == ["no_effect", "reboot"]
+    assert np.all(attempts["world_x"] == 10.15)
+    assert len(store.attempts(area=(0, 0, 1, 1))) == 0
+
+
+def test_legacy_campaign(store, tmp_path):
+    legacy = tmp_path / "2023-01-01T100000"
+    legacy.mkdir()
+    # Older results have no timestamps
+    attempt = {"effect": "reboot", "offset": 1, "voltage": 300, "repeat": 1}
+    results = [
+        {"image_coords": [0, 0], "world_coords": [0, 0], "iteration": 1, "results": [attempt]}
+    ]
+    (legacy / "glitches.json").write_text(json.dumps(results))
+
+    assert store.import_campaign(legacy) == 1
+    assert np.isnan(store.attempts(campaign=legacy.name)["timestamp"]).all()
+    assert store.import_campaign(tmp_path / "missing") == 0
+
+
+def test_missing_values(store):
+    result = {"image_coords": [0, 0], "world_coords": [0, 0], "results": [{"effect": "reboot"}]}
+
+    assert store.add("manual", [result]) == 1
+    attempts = store.attempts(campaign="manual")
+    assert np.isnan(attempts["position"]).all()
+    assert np.isnan(attempts["voltage"]).all()
@@ -0,0 +1,72 @@
+import gzip
+import json
+
+from pulsecontrol.helpers.results import (
+    AttackResults,
+    ResultWriter,
+    find_results,
+    read_results,
+)
+
+
+def result(iteration: int) -> AttackResults:
+    return AttackResults((0.5, 0.5), (1.0, 2.0), iteration, results=[{"effect": "no_effect"}])
+
+
+def test_append_and_read(tmp_path):
+    with ResultWriter(flush_interval=0) as writer:
+        writer.open(tmp_path)
+        writer.write(result(1))
+        writer.write(result(2))
+    # Resuming continues the same file
+    with ResultWriter() as writer:
+        writer.open(tmp_path)
+        writer.write(result(3))
+
+    assert find_results(tmp_path) == tmp_path / "results.jsonl"
+    assert [r["iteration"] for r in read_results(writer.path)] == [1, 2, 3]
+
+
+def test_flush_interval(tmp_path):
+    writer = ResultWriter(flush_interval=3600)
+    writer.open(tmp_path)
+    writer.write(result(1))
+    assert writer.path.read_text() == ""
+    writer.flush()
+    assert len(writer.path.read_text().splitlines()) == 1
+    writer.close()
+
+
+def test_compressed(tmp_path):
+    for iteration in (1, 2):
+        with ResultWriter(compress=True) as writer:
+            writer.open(tmp_path)
+            writer.write(result(iteration))
+
+    assert find_results(tmp_path) == tmp_path / "results.jsonl.gz"
+    assert [r["iteration"] for r in read_results(writer.path)] == [1, 2]
+
+
+def test_truncated_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text(json.dumps({"iteration": 1}) + '\n{"iteration": ')
+    assert list(read_results(path)) == [{"iteration": 1}]
+
+    compressed = tmp_path / "results.jsonl.gz"
+    compressed.write_bytes(gzip.compress(path.read_bytes())[:-10])
+    assert list(read_results(compressed)) == [{"iteration": 1}]
+
+
+def test_resume_after_truncated_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text(json.dumps({"iteration": 1}) + '\n{"iteration": ')
+    with ResultWriter() as writer:
+        writer.open(tmp_path)
+        writer.write(result(2))
+
+    assert [r["iteration"] for r in read_results(path)] == [1, 2]
+
+
+def test_legacy_results(tmp_path):
+    (tmp_path / "glitches.json").write_text(json.dumps([{"iteration": 1}]))
+    assert list(read_results(find_results(tmp_path))) == [{"iteration": 1}]
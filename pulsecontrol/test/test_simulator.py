@@ -0,0 +1,69 @@
+import pytest
+
+from pulsecontrol.simulator.moonraker import run_in_thread
+from pulsecontrol.simulator.printer import Kinematics, SimulatedPrinter
+from pulsecontrol.strategies.control.moonraker import Moonraker
+from pulsecontrol.strategies.control.moonraker_websocket import MoonrakerWebsocket
+from pulsecontrol.strategies.movement import MovementError
+
+
+def test_move_time():
+    kinematics = Kinematics(max_velocity=100, max_accel=1000)
+
+    # 10mm accelerating, 80mm at full speed, 10mm decelerating
+    assert kinematics.move_time([0, 0, 0], [100, 0, 0], 100) == pytest.approx(1.1)
+    # Too short to reach full speed
+    assert kinematics.move_time([0, 0, 0], [10, 0, 0], 100) == pytest.approx(0.2)
+    # z is limited to 5mm/s
+    assert kinematics.move_time([0, 0, 0], [0, 0, 10], 100) == pytest.approx(10 / 5 + 5 / 30)
+
+
+def test_printer_clock():
+    printer = SimulatedPrinter(time_scale=0)
+    printer.advance(printer.run_script("G28"))
+    start = printer.clock
+
+    # Moves are queued, the response is sent right away
+    assert printer.run_script("G1 X100 F6000") == start
+    assert printer.run_script("M400") > start
+    # Homing z moves to the safe_z_home position first
+    assert printer.status()["toolhead"]["position"] == [100, 230, 0, 0]
+
+
+@pytest.fixture()
+def simulator() -> SimulatedPrinter:
+    return SimulatedPrinter(time_scale=0, surface_height=5)
+
+
+def test_moonraker(simulator):
+    with run_in_thread(simulator) as endpoint:
+        printer = Moonraker(endpoint=endpoint, cache_position=False)
+        with pytest.raises(MovementError):
+            printer.move_to(10, 10)
+
+        printer.home()
+        assert printer.get_homed() == (True, True, True)
+        printer.move_to(20, 30, 15)
+        assert printer.probe() == 5
+        assert printer.query_position() == (20, 30, 15)
+
+        printer.add_offset(z_offset=-5)
+        printer.move_to(z=0)
+        assert simulator.position == [20, 30, 5]
+
+        with pytest.raises(MovementError):
+            printer.move_rel(z=-100)
+        printer.reset()
+
+    assert simulator.motion_time > 0
+
+
+def test_moonraker_websocket(simulator):
+    with run_in_thread(simulator) as endpoint:
+        printer = MoonrakerWebsocket(endpoint=endpoint, websocket=True)
+        printer.home()
+        printer.move_to(20, 30, 15)
+
+        assert printer.query_position() == (20, 30, 15)
+        assert printer.get_limits() == [260, 245, 270]
+        printer.reset()